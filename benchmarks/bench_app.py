@@ -0,0 +1,140 @@
+"""
+App benchmark suite: drives every page and the quote workflow headlessly with
+Streamlit's AppTest against catalogs of 84, 10k and 100k tests, and reports
+rerun latency per page plus the instrumented stage timings from kelp_profiling.
+
+Each catalog size runs in its own process (fresh caches, its own temporary
+KELP_DATA_DIR, synthetic catalog with a fixed seed), so numbers are comparable
+run to run. Save a baseline and compare later runs against it:
+
+    python -m benchmarks.bench_app --json baseline.json
+    python -m benchmarks.bench_app --baseline baseline.json
+
+Run from the repo root:  python -m benchmarks.bench_app [--sizes 84,10000,100000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = str(ROOT / "kelp_app.py")
+SIZES = (84, 10_000, 100_000)
+REPEAT = 5
+STAGES = ('init_session_state', 'render_sidebar', 'get_metrics', 'render_dashboard', 'render_catalog', 'render_price_editor',
+          'render_quote_builder', 'render_quote_generator', 'render_quote_history', 'render_settings', 'generate_pdf_quote')
+
+
+def _ms(action):
+    t0 = time.perf_counter()
+    action()
+    return (time.perf_counter() - t0) * 1000
+
+
+def run_size(repeat):
+    """Drive the app in this process; returns {'first_run_ms', 'pages', 'actions', 'stages'}"""
+    from streamlit.testing.v1 import AppTest
+    from kelp_profiling import get_profiler
+
+    at = AppTest.from_file(APP, default_timeout=600)
+    result = {'first_run_ms': _ms(at.run), 'pages': {}, 'actions': {}}
+    nav = at.sidebar.radio[0]
+    for option in nav.options:
+        page = option.split(" ", 1)[1]
+        switch = _ms(lambda: at.sidebar.radio[0].set_value(option).run())
+        reruns = [_ms(at.run) for _ in range(repeat)]
+        assert not at.exception, (page, at.exception)
+        result['pages'][page] = {'switch_ms': switch, 'rerun_p50_ms': statistics.median(reruns)}
+
+    at.sidebar.radio[0].set_value("📝 Quote Generator").run()
+    actions = {'add to cart': [], 'search keystroke': [], 'generate PDF (render)': [], 'generate PDF (cached)': []}
+    for i in range(repeat):
+        add = [b for b in at.button if b.label == "➕ Add"][i % 3]
+        actions['add to cart'].append(_ms(lambda: add.click().run()))
+        actions['search keystroke'].append(_ms(lambda: at.text_input(key="qb_search").set_value("nitr"[:1 + i % 4]).run()))
+        at.text_input(key="qb_search").set_value("").run()
+        generate = lambda: [b for b in at.button if 'Generate' in b.label][0].click().run()
+        actions['generate PDF (render)'].append(_ms(generate))
+        actions['generate PDF (cached)'].append(_ms(generate))
+        assert not at.exception, at.exception
+    result['actions'] = {name: statistics.median(ms) for name, ms in actions.items()}
+
+    stats = get_profiler().stats().set_index('stage')
+    result['stages'] = {name: stats.loc[name, 'p50_ms'] for name in STAGES if name in stats.index}
+    return result
+
+
+def _child(size, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, KELP_DATA_DIR=tmp, PYTHONPATH=str(ROOT))
+        env.pop("KELP_CATALOG", None)
+        if size != 84:
+            from kelp_catalog import write_catalog
+            from benchmarks.synthetic import make_catalog
+
+            env["KELP_CATALOG"] = str(Path(tmp) / f"catalog_{size}.parquet")
+            write_catalog(make_catalog(size), env["KELP_CATALOG"])
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_app", "--child", "--repeat", str(repeat)],
+                             cwd=ROOT, env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(f"{size:,}-test run failed:\n{out.stderr[-3000:]}")
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _table(title, rows, sizes, baseline=None):
+    print(f"\n{title:<30}" + "".join(f"{f'{s:,} tests':>16}" for s in sizes))
+    for name, values in rows.items():
+        cells = []
+        for s in sizes:
+            v = values.get(s)
+            old = (baseline or {}).get(name, {}).get(str(s))
+            cell = "-" if v is None else f"{v:,.1f}"
+            if v is not None and old:
+                cell += f" ({v / old - 1:+.0%})"
+            cells.append(f"{cell:>16}")
+        print(f"{name:<30}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="catalog sizes, comma-separated")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="reruns per page / interactions per action")
+    parser.add_argument("--json", help="write results here (a baseline for --baseline)")
+    parser.add_argument("--baseline", help="results from an earlier --json run to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(args.repeat)))
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = {}
+    for size in sizes:
+        t0 = time.perf_counter()
+        results[size] = _child(size, args.repeat)
+        print(f"{size:>9,} tests done in {time.perf_counter() - t0:.0f} s", file=sys.stderr)
+
+    tables = {
+        'first run (ms)': {'cold start': {s: r['first_run_ms'] for s, r in results.items()}},
+        'page rerun p50 (ms)': {p: {s: r['pages'][p]['rerun_p50_ms'] for s, r in results.items()} for p in results[sizes[0]]['pages']},
+        'page switch (ms)': {p: {s: r['pages'][p]['switch_ms'] for s, r in results.items()} for p in results[sizes[0]]['pages']},
+        'quote actions p50 (ms)': {a: {s: r['actions'][a] for s, r in results.items()} for a in results[sizes[0]]['actions']},
+        'stage p50 (ms)': {st: {s: r['stages'].get(st) for s, r in results.items()} for st in STAGES},
+    }
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+    for title, rows in tables.items():
+        _table(title, rows, sizes, baseline.get(title))
+    if args.json:
+        flat = {title: {name: {str(s): v for s, v in values.items()} for name, values in rows.items()} for title, rows in tables.items()}
+        Path(args.json).write_text(json.dumps(flat, indent=2))
+
+
+if __name__ == "__main__":
+    main()
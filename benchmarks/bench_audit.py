@@ -0,0 +1,42 @@
+"""
+Audit store benchmark: sustained append rate and paged query latency.
+
+Run from the repo root:  python -m benchmarks.bench_audit
+"""
+
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from kelp_audit import AuditStore
+
+
+def main(n_entries=200_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AuditStore(Path(tmp) / "audit.sqlite3")
+        start = datetime(2025, 1, 1)
+
+        t0 = time.perf_counter()
+        for i in range(n_entries):
+            store.append("Price Updated", f"Test {i % 5000}: $10.00 → $11.00", test_id=i % 5000, timestamp=(start + timedelta(seconds=i)).isoformat())
+        store.flush()
+        elapsed = time.perf_counter() - t0
+        print(f"single appends: {n_entries:,} in {elapsed:.2f}s = {n_entries / elapsed * 60:,.0f} entries/min")
+
+        batch = [((start + timedelta(days=30, seconds=i)).isoformat(), "Price Updated", i % 5000, "bulk", "KELP") for i in range(n_entries)]
+        t0 = time.perf_counter()
+        store.append_many(batch)
+        store.flush()
+        elapsed = time.perf_counter() - t0
+        print(f"bulk batch:     {n_entries:,} in {elapsed:.2f}s = {n_entries / elapsed * 60:,.0f} entries/min")
+
+        for label, kwargs in [("newest page", {}), ("deep page", {'page': 1000}), ("by test id", {'test_id': 1234}), ("by action", {'action': "Price Updated", 'page': 10}), ("since", {'since': (start + timedelta(days=32)).isoformat()})]:
+            t0 = time.perf_counter()
+            rows = store.page(page_size=50, **kwargs)
+            print(f"{label:>12}: {len(rows)} rows in {(time.perf_counter() - t0) * 1000:.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
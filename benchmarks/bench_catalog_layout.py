@@ -0,0 +1,69 @@
+"""
+Catalog layout benchmark: object-dtype frame vs the typed columnar schema.
+Reports memory footprint, filter speed and Parquet round-trip at 1x-1000x
+the 84-test catalog.
+
+Run from the repo root:  python -m benchmarks.bench_catalog_layout
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from kelp_catalog import CATEGORICAL_COLUMNS, MONEY_COLUMNS, read_catalog, typed_catalog, write_catalog
+from benchmarks.synthetic import make_catalog
+
+
+def as_object_frame(df):
+    """The pre-schema layout: every string column object dtype"""
+    out = df.copy()
+    for c in CATEGORICAL_COLUMNS:
+        out[c] = out[c].astype(object)
+    return out
+
+
+def run_filters(df):
+    a = df['category'] == "METALS"
+    b = df['water_type'] == "Potable"
+    c = df['method_group'].isin(["EPA 537/1633A (PFAS LC-MS/MS)", "Field Services"])
+    return int((a & b).sum() + c.sum())
+
+
+def best_ms(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    print(f"{'rows':>8} {'object MB':>10} {'typed MB':>9} {'object filt ms':>15} {'typed filt ms':>14} {'parquet KB':>11} {'read ms':>8} {'read cents ms':>14}")
+    for mult in [1, 10, 100, 1000]:
+        n = 84 * mult
+        typed = typed_catalog(make_catalog(n))
+        obj = as_object_frame(typed)
+        assert run_filters(obj) == run_filters(typed)
+
+        mem_obj = obj.memory_usage(deep=True).sum() / 1e6
+        mem_typed = typed.memory_usage(deep=True).sum() / 1e6
+        f_obj = best_ms(lambda: run_filters(obj))
+        f_typed = best_ms(lambda: run_filters(typed))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "catalog.parquet"
+            write_catalog(typed, path)
+            size_kb = path.stat().st_size / 1024
+            t_read = best_ms(lambda: read_catalog(path))
+            t_cents = best_ms(lambda: read_catalog(path, cents=True))
+            back = read_catalog(path)
+            assert np.array_equal(back[MONEY_COLUMNS].to_numpy(), typed[MONEY_COLUMNS].to_numpy())
+
+        print(f"{n:>8} {mem_obj:10.2f} {mem_typed:9.2f} {f_obj:15.3f} {f_typed:14.3f} {size_kb:11.1f} {t_read:8.2f} {t_cents:14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Cost sheet import benchmark: streams multi-lab CSV and XLSX sheets through the
+validator and rollup, reporting throughput and peak traced memory. Peak memory
+should track the chunk size, not the sheet size.
+
+Run from the repo root:  python -m benchmarks.bench_cost_import
+"""
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from kelp_catalog import read_catalog
+from kelp_costs import COMPONENT_COLUMNS, ROLLUP_COLUMNS, import_cost_sheet, rollup_costs
+from benchmarks.synthetic import make_catalog
+
+
+def make_sheet(n_rows, seed=0):
+    """Synthetic cost sheet with a consistent rollup, a few corrupted cells and hand-edited totals"""
+    df = make_catalog(n_rows, seed)
+    df[ROLLUP_COLUMNS] = rollup_costs(df[COMPONENT_COLUMNS], df['price']).round({'margin_percent': 2}).to_numpy()
+    df = df.astype({'standards': object})
+    rng = np.random.default_rng(seed)
+    bad = rng.choice(n_rows, max(1, n_rows // 1000), replace=False)
+    df.loc[bad, 'standards'] = "n/a"
+    edited = rng.choice(n_rows, max(1, n_rows // 200), replace=False)
+    df.loc[edited, 'total_cost'] += 1.0
+    return df.rename(columns={'id': 'Test ID', 'gases_utilities': 'Gases/Utilities', 'qc_oh': 'QC OH',
+                              'total_cost': 'Total Cost', 'margin_percent': 'Margin %'})
+
+
+def run(path, out, chunk_rows):
+    t0 = time.perf_counter()
+    result = import_cost_sheet(path, out, chunk_rows=chunk_rows)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    import_cost_sheet(path, out, chunk_rows=chunk_rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{path.name:<18} {result.rows:>9,} rows {elapsed * 1000:9.1f} ms "
+          f"{result.rows / elapsed:>10,.0f} rows/s  peak {peak / 2**20:6.1f} MiB  "
+          f"{result.mismatches['row'].nunique():,} mismatched, {len(result.rejected):,} rejected")
+    assert len(read_catalog(out)) == result.rows
+    return result
+
+
+def main(chunk_rows=20_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for n_rows in (100_000, 400_000):
+            sheet = make_sheet(n_rows)
+            csv_path = tmp / f"costs_{n_rows}.csv"
+            sheet.to_csv(csv_path, index=False)
+            run(csv_path, tmp / "catalog.parquet", chunk_rows)
+
+        n_rows = 20_000
+        sheet = make_sheet(n_rows)
+        xlsx_path = tmp / f"costs_{n_rows}.xlsx"
+        sheet.to_excel(xlsx_path, index=False)
+        run(xlsx_path, tmp / "catalog.parquet", chunk_rows // 4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Cost model benchmark: catalog-wide recosting and sensitivity sweeps on a
+100k-test catalog. Target: a grid sweep by category well under 1 s.
+
+Run from the repo root:  python -m benchmarks.bench_costmodel
+"""
+
+import time
+
+import numpy as np
+
+from kelp_costmodel import BASELINE, CostModel, CostParameters, sensitivity_grid
+from benchmarks.synthetic import make_catalog
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"{label:<52} {(time.perf_counter() - t0) * 1000:9.2f} ms")
+    return out
+
+
+def main(n_rows=100_000):
+    df = make_catalog(n_rows)
+    model = timed(f"build cost model ({n_rows:,} tests)", lambda: CostModel(df))
+
+    base = timed("recompute at baseline", model.recompute)
+    assert np.allclose(base['total_cost'], df['total_cost'], atol=0.005)
+    timed("labor +5% across the catalog", lambda: model.recompute(CostParameters(1.05)))
+    timed("facility 40% for one method group", lambda: model.recompute(BASELINE, {model.method_groups[0]: CostParameters(facility_rate=0.40)}))
+    timed("apply labor +5% to a catalog copy", lambda: model.apply(df, CostParameters(1.05)))
+
+    labor_only = sensitivity_grid([0.90, 0.95, 1.0, 1.05, 1.10])
+    out = timed(f"sweep {len(labor_only)} labor scenarios by category", lambda: model.sweep(labor_only))
+    assert np.allclose(out.loc[out['labor_factor'] == 1.0, 'margin_change'], 0)
+
+    grid = sensitivity_grid([0.90, 0.95, 1.0, 1.05, 1.10], [None, 0.20, 0.25], [None, 0.35, 0.40])
+    t0 = time.perf_counter()
+    out = model.sweep(grid)
+    elapsed = time.perf_counter() - t0
+    print(f"{f'sweep {len(grid)}-scenario grid by category':<52} {elapsed * 1000:9.2f} ms  "
+          f"({len(grid) * n_rows / elapsed / 1e6:,.0f}M test-scenarios/s, target < 1000 ms)")
+    timed(f"sweep {len(grid)}-scenario grid by method group", lambda: model.sweep(grid, by='method_group'))
+
+
+if __name__ == "__main__":
+    main()
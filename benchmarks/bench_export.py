@@ -0,0 +1,66 @@
+"""
+Export benchmark: multi-lab catalogs streamed from Parquet to CSV, Parquet
+and Excel, plus a large audit log. Peak traced memory should stay flat as the
+catalog grows; a second request for the same version is a cache hit.
+
+Run from the repo root:  python -m benchmarks.bench_export
+"""
+
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from kelp_audit import AuditStore
+from kelp_catalog import write_catalog
+from kelp_export import ExportCache, audit_section, parquet_section
+from benchmarks.synthetic import make_catalog
+
+
+def measure(cache, sections, fmt):
+    """Cold export time, cache hit time, and peak traced memory of a second cold export"""
+    t0 = time.perf_counter()
+    path = cache.get(sections, fmt)
+    elapsed = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    assert cache.get(sections, fmt) == path
+    hit = time.perf_counter() - t0
+    path.unlink()
+    tracemalloc.start()
+    cache.get(sections, fmt)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, hit, path.stat().st_size
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = ExportCache(tmp / "exports")
+        for n_rows in (100_000, 400_000):
+            src = tmp / f"catalog_{n_rows}.parquet"
+            write_catalog(make_catalog(n_rows), src)
+            for fmt in ("CSV", "Parquet"):
+                elapsed, peak, hit, size = measure(cache, [parquet_section("catalog", src)], fmt)
+                print(f"{fmt:<8} {n_rows:>9,} rows {elapsed * 1000:9.1f} ms  peak {peak / 2**20:6.1f} MiB  "
+                      f"{size / 2**20:6.1f} MiB file  cache hit {hit * 1000:.2f} ms")
+
+        src = tmp / "catalog_xlsx.parquet"
+        for n_rows in (5_000, 20_000):
+            write_catalog(make_catalog(n_rows), src)
+            elapsed, peak, hit, size = measure(cache, [parquet_section("catalog", src)], "Excel")
+            print(f"{'Excel':<8} {n_rows:>9,} rows {elapsed * 1000:9.1f} ms  peak {peak / 2**20:6.1f} MiB  "
+                  f"{size / 2**20:6.1f} MiB file  cache hit {hit * 1000:.2f} ms")
+
+        store = AuditStore(tmp / "audit.sqlite3", batch_size=10_000)
+        ts = datetime.now().isoformat()
+        store.append_many([(ts, "Price Updated", i % 5000, f"Test {i}: $10.00 → $11.00", "KELP") for i in range(100_000)])
+        elapsed, peak, hit, size = measure(cache, [parquet_section("catalog", src), audit_section(store)], "CSV")
+        print(f"{'CSV+audit':<9} 100,000 entries {elapsed * 1000:9.1f} ms  peak {peak / 2**20:6.1f} MiB  "
+              f"{size / 2**20:6.1f} MiB zip  cache hit {hit * 1000:.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Cold-start benchmark: fresh interpreter -> import -> one price lookup.
+Goal: kelp_core price lookup under COLD_START_GOAL_MS (interpreter start included).
+
+Run from the repo root:  python -m benchmarks.bench_import
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COLD_START_GOAL_MS = 100
+REPEAT = 7
+
+SCENARIOS = {
+    "python -c pass (baseline)": "pass",
+    "kelp_core price lookup": "import kelp_core; kelp_core.get_price(1)",
+    "kelp_core metals + quote totals": "import kelp_core as k; q = k.price_quote([(1, 2), (40, 1)], 5, [('EPA 200.8', ['Lead', 'Zinc'], 1)])",
+    "kelp_core PDF render": "import kelp_core as k; k.generate_pdf_quote({'quote_number': 'x', 'date': '01/01/2025', **k.price_quote([(1, 1)])})",
+    "import kelp_app (UI)": "import kelp_app",
+}
+
+
+def cold_ms(code):
+    times = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    print(f"{'scenario':<34} {'median ms':>10}")
+    for label, code in SCENARIOS.items():
+        try:
+            ms = cold_ms(code)
+        except subprocess.CalledProcessError as e:
+            print(f"{label:<34} {'failed':>10}  {e.stderr.decode().strip().splitlines()[-1]}")
+            continue
+        flag = ""
+        if label == "kelp_core price lookup":
+            flag = "  OK" if ms <= COLD_START_GOAL_MS else f"  over {COLD_START_GOAL_MS} ms goal"
+        print(f"{label:<34} {ms:10.1f}{flag}")
+
+    loaded = subprocess.run([sys.executable, "-c", "import sys, kelp_core; kelp_core.get_price(1); print(' '.join(m for m in ('streamlit', 'pandas', 'numpy', 'plotly', 'reportlab') if m in sys.modules))"],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout.strip()
+    print(f"heavy modules loaded by a price lookup: {loaded or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Lab site registry benchmark: cold vs warm site loads, memory held after
+visiting every site (should stay flat as sites are added, bounded by the
+LRU), and a cheapest-site query for a quote's test list across all sites.
+
+Run from the repo root:  python -m benchmarks.bench_labs
+"""
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from kelp_labs import CatalogRegistry, MAX_LABS, TEST_KEY
+from benchmarks.synthetic import make_catalog
+
+TESTS_PER_SITE = 5_000
+
+
+def make_site(seed, n_rows=TESTS_PER_SITE):
+    """A site's catalog: shared test names, its own prices, ~10% of tests not offered"""
+    df = make_catalog(n_rows, seed).drop(columns='lab')
+    keep = np.random.default_rng(seed).random(n_rows) > 0.1
+    return df[keep]
+
+
+def main():
+    template = [make_site(seed) for seed in range(10)]
+    keys = list(template[0][TEST_KEY].astype(str).sample(20, random_state=0).itertuples(index=False, name=None))
+    qty = np.random.default_rng(0).integers(1, 10, len(keys))
+
+    for n_sites in (10, 50, 200):
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = CatalogRegistry(Path(tmp))
+            for k in range(n_sites):
+                registry.add(f"SITE-{k:03d}", template[k % len(template)])
+            labs = registry.labs()[1:]
+
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            for code in labs:
+                registry.get(code)
+            cold = (time.perf_counter() - t0) / len(labs)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            t0 = time.perf_counter()
+            for _ in range(100):
+                registry.get(labs[-1])
+            warm = (time.perf_counter() - t0) / 100
+
+            t0 = time.perf_counter()
+            sites = registry.cheapest_sites(keys, qty)
+            query = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            registry.cheapest_sites(keys, qty)
+            indexed = time.perf_counter() - t0
+            stats = registry.stats()
+            print(f"{n_sites:>4} sites x {TESTS_PER_SITE:,} tests: cold load {cold * 1000:6.1f} ms, warm {warm * 1e6:5.1f} us; "
+                  f"after visiting all: {len(stats['loaded'])} loaded (max {MAX_LABS}), {current / 2**20:5.1f} MiB traced "
+                  f"(peak {peak / 2**20:5.1f}); cheapest site for {len(keys)} tests across {len(sites)} sites: "
+                  f"first {query * 1000:6.1f} ms, indexed {indexed * 1000:5.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
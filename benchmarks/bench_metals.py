@@ -0,0 +1,64 @@
+"""
+Metals panel pricing: randomized property check against the published price
+schedule, plus memoized vs cold lookup timings.
+
+Run from the repo root:  python -m benchmarks.bench_metals
+"""
+
+import random
+import time
+
+from kelp_metals import METALS_PANELS, calculate_metals_price, get_metals_tables, price_metals_panel, schedule_label
+
+# The schedule printed on the calculator, quote page and About tab
+PUBLISHED = {
+    "EPA 200.8": (70.00, 12.00, "$70 first + $12/additional"),
+    "EPA 6020B": (130.00, 45.00, "$130 first + $45/additional"),
+}
+
+
+def check_schedule(trials=20_000, seed=0):
+    rng = random.Random(seed)
+    for method, (first, each, label) in PUBLISHED.items():
+        assert schedule_label(method) == label, (method, schedule_label(method))
+        elements = METALS_PANELS[method]['elements']
+        water_type = METALS_PANELS[method]['water_type']
+        for _ in range(trials):
+            picked = frozenset(rng.sample(elements, rng.randint(1, len(elements))))
+            qty = rng.randint(1, 100)
+            expected = first + each * (len(picked) - 1)
+            price = price_metals_panel(method, picked, qty)
+            assert abs(price.unit_price - expected) < 1e-9, (method, sorted(picked), price)
+            assert abs(price.total - expected * qty) < 1e-6
+            assert calculate_metals_price(len(picked), water_type) == price.unit_price
+        try:
+            price_metals_panel(method, frozenset(["Unobtainium"]))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("unknown elements must be rejected")
+    assert calculate_metals_price(0, "Potable") == 0.0
+    print(f"engine matches the published schedule over {trials:,} random panels per method: OK")
+
+
+def main():
+    check_schedule()
+    rng = random.Random(1)
+    panels = [frozenset(rng.sample(METALS_PANELS["EPA 6020B"]['elements'], rng.randint(1, 12))) for _ in range(200)]
+
+    price_metals_panel.cache_clear()
+    get_metals_tables.cache_clear()
+    t0 = time.perf_counter()
+    for p in panels:
+        price_metals_panel("EPA 6020B", p, 3)
+    cold = (time.perf_counter() - t0) / len(panels) * 1e6
+    t0 = time.perf_counter()
+    for _ in range(50):
+        for p in panels:
+            price_metals_panel("EPA 6020B", p, 3)
+    warm = (time.perf_counter() - t0) / (50 * len(panels)) * 1e6
+    print(f"panel price: cold {cold:.2f} us, memoized {warm:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Dashboard metrics benchmark: incremental updates vs full recompute per rerun.
+
+Run from the repo root:  python -m benchmarks.bench_metrics
+"""
+
+import time
+
+import numpy as np
+
+from kelp_metrics import CatalogMetrics
+from kelp_pricing import adjust_prices, compute_margins
+from benchmarks.synthetic import make_catalog
+
+
+def full_recompute(df):
+    """What render_dashboard and the Cost Analysis tab did on every rerun"""
+    active = df[df['active']]
+    stats = (active['price'].mean(), active['total_cost'].mean(), active['margin_percent'].mean())
+    summary = active.groupby('category').agg({'id': 'count', 'price': 'mean', 'margin_percent': 'mean'}).round(2)
+    low = active[active['margin_percent'] < 40]
+    hist = np.histogram(active['margin_percent'], bins=20)
+    return stats, summary, low, hist
+
+
+def ms(t0):
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    print(f"{'rows':>8} {'full (ms)':>10} {'build (ms)':>11} {'1 edit (ms)':>12} {'bulk 10% (ms)':>14}")
+    for n in [84, 10_000, 100_000]:
+        df = make_catalog(n)
+        t0 = time.perf_counter(); full_recompute(df); t_full = ms(t0)
+        t0 = time.perf_counter(); metrics = CatalogMetrics(df); t_build = ms(t0)
+
+        price = df['price'].to_numpy(dtype=float).copy()
+        margin = df['margin_percent'].to_numpy(dtype=float).copy()
+        cost = df['total_cost'].to_numpy(dtype=float)
+
+        def edit(pos, new_price):
+            new_margin = compute_margins(new_price, cost[pos])
+            metrics.apply_price_changes(pos, price[pos], new_price, margin[pos], new_margin)
+            price[pos], margin[pos] = new_price, new_margin
+
+        t0 = time.perf_counter(); edit(np.array([n // 2]), np.array([price[n // 2] + 5])); t_one = ms(t0)
+        mask = np.zeros(n, dtype=bool); mask[::10] = True
+        pos = np.flatnonzero(mask)
+        new = adjust_prices(price, cost, mask, "Percentage", 10)[pos]
+        t0 = time.perf_counter(); edit(pos, new); t_bulk = ms(t0)
+
+        # incremental state must match a fresh build over the edited catalog
+        edited = df.copy()
+        edited['price'], edited['margin_percent'] = price, margin
+        fresh = CatalogMetrics(edited)
+        assert np.allclose(fresh.price_sum, metrics.price_sum) and np.allclose(fresh.margin_sum, metrics.margin_sum)
+        assert np.array_equal(fresh.hist, metrics.hist) and np.array_equal(fresh.low, metrics.low)
+        print(f"{n:>8} {t_full:10.2f} {t_build:11.2f} {t_one:12.3f} {t_bulk:14.2f}")
+    print("incremental aggregates match a full rebuild: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Margin optimizer benchmark: suggested prices for a 100k-test catalog and a
+scenario grid with revenue impact, on one thread and on every core. Also
+times the quote-volume query on a store of 20k quote lines.
+
+Run from the repo root:  python -m benchmarks.bench_optimizer
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from kelp_optimizer import MarginOptimizer, MarginRules
+from kelp_quotes import QuoteStore
+from benchmarks.synthetic import make_catalog
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"{label:<58} {(time.perf_counter() - t0) * 1000:9.2f} ms")
+    return out
+
+
+def main(n_rows=100_000):
+    df = make_catalog(n_rows)
+    optimizer = timed(f"build optimizer ({n_rows:,} tests)", lambda: MarginOptimizer(df))
+    rng = np.random.default_rng(0)
+    volumes = rng.poisson(3, n_rows).astype(float)
+
+    out = timed("suggest: 40% floor, $5 points, +25% cap", lambda: optimizer.suggest(MarginRules(40.0, None, 5.0, 'up', 25.0), volumes))
+    print(f"  {len(out):,} tests repriced, {int(out['below_floor'].sum()):,} left below their floor by the cap")
+    floors = {c: 55.0 for c in optimizer.categories[:3]}
+    timed("suggest: per-category floors, no cap", lambda: optimizer.suggest(MarginRules(40.0, floors), volumes))
+
+    grid = [MarginRules(float(f), floors, p, 'up', c) for f in range(20, 80, 5) for p in (None, 1.0, 5.0) for c in (None, 10.0, 25.0, 50.0)]
+    for workers in sorted({1, os.cpu_count() or 1}):
+        t0 = time.perf_counter()
+        optimizer.compare(grid, volumes, workers=workers)
+        elapsed = time.perf_counter() - t0
+        print(f"{f'compare {len(grid)} scenarios, {workers} worker(s)':<58} {elapsed * 1000:9.2f} ms  "
+              f"({len(grid) * n_rows / elapsed / 1e6:,.0f}M test-scenarios/s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = QuoteStore(Path(tmp) / "quotes.sqlite3")
+        ids = rng.integers(1, n_rows + 1, (2_000, 10))
+        store.save_many([{'date': f"{1 + q % 12:02d}/01/2026", 'account_name': f"Account {q % 50}", 'contact_name': "", 'prepared_by': "",
+                          'discount_percent': 0, 'items': [{'test_id': int(i), 'description': f"Test {i}", 'method': "", 'qty': 2, 'price': 10.0,
+                                                            'tat': "", 'total': 20.0} for i in row]} for q, row in enumerate(ids)])
+        vol_ids, qty = timed("quote volumes, all 20k lines", store.test_volumes)
+        timed("quote volumes since 07/01/2026", lambda: store.test_volumes("2026-07-01"))
+        timed("map volumes onto catalog rows", lambda: optimizer.row_volumes(vol_ids, qty))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
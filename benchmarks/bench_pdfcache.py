@@ -0,0 +1,61 @@
+"""
+Quote PDF cache benchmark: cold renders, repeat requests served from memory,
+and a fresh process (empty memory tier) served from disk.
+
+Run from the repo root:  python -m benchmarks.bench_pdfcache
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from kelp_catalog import get_base_catalog
+from kelp_core import price_quote
+from kelp_pdfcache import PdfCache
+
+
+def make_quotes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = get_base_catalog()['id'].to_numpy()
+    quotes = []
+    for i in range(n):
+        q = price_quote([(int(t), int(rng.integers(1, 5))) for t in rng.choice(ids, rng.integers(1, 15), replace=False)])
+        q.update(quote_number=f"20260101-{i:03d}", date="01/01/2026", account_name=f"Account {i}", contact_name="Jo Smith", prepared_by="KELP Lab")
+        quotes.append(q)
+    return quotes
+
+
+def timed(label, fn, n):
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms  ({elapsed / n * 1000:.3f} ms per quote)")
+
+
+def main(n_quotes=100):
+    quotes = make_quotes(n_quotes)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PdfCache(tmp)
+        timed(f"render {n_quotes} quotes (cold)", lambda: [cache.get(q) for q in quotes], n_quotes)
+        timed(f"same {n_quotes} quotes again (memory)", lambda: [cache.get(q) for q in quotes], n_quotes)
+        # A copy with equal but differently typed values must hit too
+        same = [{**q, 'subtotal': np.float64(q['subtotal']), 'discount_percent': 0.0} for q in quotes]
+        timed("equivalent copies (memory)", lambda: [cache.get(q) for q in same], n_quotes)
+        print(cache.stats())
+
+        fresh = PdfCache(tmp)
+        timed(f"new process, {n_quotes} quotes (disk)", lambda: [fresh.get(q) for q in quotes], n_quotes)
+        stats = fresh.stats()
+        assert stats['misses'] == 0, stats
+        print(stats)
+
+        small = PdfCache(tmp, memory_bytes=256 << 10)
+        [small.get(q) for q in quotes]
+        stats = small.stats()
+        assert stats['memory_bytes'] <= 256 << 10
+        print(f"256 KiB memory tier holds {stats['memory_entries']} of {n_quotes} PDFs ({stats['memory_bytes'] / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Price book benchmark: snapshot, diff, what-if and restore on a 100k-test catalog.
+
+Run from the repo root:  python -m benchmarks.bench_pricebook
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from kelp_pricebook import PriceBook, PriceBookStore, diff_books, what_if
+from benchmarks.synthetic import make_catalog
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"{label:<40} {(time.perf_counter() - t0) * 1000:9.2f} ms")
+    return out
+
+
+def main(n_rows=100_000):
+    base = make_catalog(n_rows)
+    ids = base['id'].to_numpy()
+    prices = base['price'].to_numpy()
+    rng = np.random.default_rng(0)
+
+    overlay = dict(zip(ids.tolist(), (prices * 1.03).round(2).tolist()))
+    q1 = timed(f"snapshot ({len(overlay):,} edited rows)", lambda: PriceBook.from_overlay("Q1", overlay))
+    changed = rng.choice(ids, n_rows // 2, replace=False)
+    q2 = timed(f"copy-on-write edit ({len(changed):,} rows)", lambda: q1.with_changes("Q2", changed, q1.lookup(changed, 0) * 1.05))
+
+    diff = timed("diff Q1 -> Q2 (full books)", lambda: diff_books(q1, q2, base))
+    assert len(diff) == len(changed)
+    small = PriceBook("hotfix", rng.choice(ids, 200, replace=False), np.full(200, 99.0))
+    timed("diff base -> 200-row book", lambda: diff_books(PriceBook("base", [], []), small, base))
+
+    targets = ids[base['category'].to_numpy() == "METALS"]
+    _, preview = timed(f"what-if +10% on {len(targets):,} METALS rows", lambda: what_if(q2, targets, "Percentage", 10, base=base))
+    assert len(preview) > 0
+    timed("restore (book -> session overlay)", q2.to_overlay)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceBookStore(Path(tmp))
+        timed("save Q2 to disk", lambda: store.save(q2))
+        loaded = timed("load Q2 from disk", lambda: store.load("Q2"))
+        assert np.array_equal(loaded.ids, q2.ids) and np.array_equal(loaded.prices, q2.prices)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Shared price store simulation: many sessions (threads in several processes,
+as with a few app servers) edit and read the same store at once. Editors
+save small batches against the version they last synced and re-sync on a
+conflict; readers only sync. A watcher per process measures how soon each
+saved version is noticed.
+
+At the end the run is checked: the store equals a replay of every accepted
+save in version order (no lost updates), no save was accepted over a newer
+edit it had not seen, and every session's synced prices equal the store.
+
+Run from the repo root:  python -m benchmarks.bench_prices [--processes 4] [--sessions 8] [--seconds 5]
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from kelp_prices import PriceConflict, PriceStore
+
+LAB = "KELP"
+
+
+def apply_changes(overlay, ids, prices):
+    for i, p in zip(ids.tolist(), prices.tolist()):
+        if np.isnan(p):
+            overlay.pop(i, None)
+        else:
+            overlay[i] = p
+
+
+def _session(store, seed, seconds, n_tests, edit_share, out):
+    rng = random.Random(seed)
+    overlay, version = store.snapshot(LAB)
+    saves, timings = [], {'save_ms': [], 'sync_idle_ms': [], 'sync_rows_ms': []}
+    conflicts = 0
+
+    def sync():
+        nonlocal version
+        t0 = time.perf_counter()
+        ids, prices, new = store.changes_since(LAB, version)
+        ms = (time.perf_counter() - t0) * 1000
+        timings['sync_rows_ms' if len(ids) else 'sync_idle_ms'].append(ms)
+        apply_changes(overlay, ids, prices)
+        version = new
+
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sync()
+        if rng.random() < edit_share:
+            # A few tests out of a small hot set, so sessions collide
+            batch = {i: (None if rng.random() < 0.1 else round(rng.uniform(10, 500), 2)) for i in rng.sample(range(1, n_tests + 1), rng.randint(1, 5))}
+            t0 = time.perf_counter()
+            try:
+                seq = store.save(LAB, batch, version)
+            except PriceConflict:
+                conflicts += 1
+                continue
+            timings['save_ms'].append((time.perf_counter() - t0) * 1000)
+            saves.append((seq, version, batch, time.time()))
+        time.sleep(rng.uniform(0, 0.01))
+    out.append({'saves': saves, 'conflicts': conflicts, 'timings': timings, 'overlay': overlay, 'version': version})
+
+
+def run_process(path, proc, sessions, seconds, n_tests, edit_share):
+    """One process's sessions plus a watcher; returns their results"""
+    store = PriceStore(path)
+    seen, stop = [], threading.Event()
+
+    def watch():
+        version = store.version()
+        while not stop.is_set():
+            new = store.wait(version, timeout=0.2, poll=0.02)
+            if new > version:
+                seen.append((new, time.time()))
+                version = new
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    out = []
+    threads = [threading.Thread(target=_session, args=(store, proc * 1000 + s, seconds, n_tests, edit_share, out)) for s in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop.set()
+    watcher.join()
+    store.close()
+    return {'proc': proc, 'sessions': out, 'seen': seen}
+
+
+def _pct(values, q):
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+def verify(results, store):
+    """Replay accepted saves in version order and check them against the store, and every
+    session against the store once it catches up from its last version"""
+    saves = sorted((s for r in results for sess in r['sessions'] for s in sess['saves']), key=lambda s: s[0])
+    assert len({s[0] for s in saves}) == len(saves), "two saves got the same version"
+    current, last_seq = {}, {}
+    for seq, base, batch, _ in saves:
+        for i, p in batch.items():
+            # Accepted only if nobody changed the test after the editor's version (or set the same price)
+            assert last_seq.get(i, 0) <= base or current.get(i) == p, f"save {seq} overwrote test {i} changed at {last_seq[i]} > {base}"
+            current[i], last_seq[i] = p, seq
+    expected = {i: p for i, p in current.items() if p is not None}
+    snapshot, _ = store.snapshot(LAB)
+    assert snapshot == expected, "store differs from the replay of accepted saves"
+    for r in results:
+        for sess in r['sessions']:
+            ids, prices, _ = store.changes_since(LAB, sess['version'])
+            apply_changes(sess['overlay'], ids, prices)
+            assert sess['overlay'] == expected, "a session's synced prices differ from the store"
+    return saves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=8, help="sessions (threads) per process")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tests", type=int, default=200, help="size of the hot set of tests being edited")
+    parser.add_argument("--edit-share", type=float, default=0.2, help="share of session steps that save an edit")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "prices.sqlite3"
+        PriceStore(path).close()
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            futures = [pool.submit(run_process, path, p, args.sessions, args.seconds, args.tests, args.edit_share) for p in range(args.processes)]
+            results = [f.result() for f in futures]
+        store = PriceStore(path)
+        saves = verify(results, store)
+        store.close()
+
+    sessions = [s for r in results for s in r['sessions']]
+    conflicts = sum(s['conflicts'] for s in sessions)
+    timing = {k: [v for s in sessions for v in s['timings'][k]] for k in sessions[0]['timings']}
+    # Notification delay: from a save's commit to each watcher noticing that version (or a later one)
+    committed = {seq: (proc['proc'], t) for proc in results for sess in proc['sessions'] for seq, _, _, t in sess['saves']}
+    local, remote = [], []
+    for r in results:
+        times = [t for _, t in r['seen']]
+        versions = [v for v, _ in r['seen']]
+        for seq, (proc, t) in committed.items():
+            k = np.searchsorted(versions, seq)
+            if k < len(versions):
+                (local if proc == r['proc'] else remote).append((times[k] - t) * 1000)
+
+    n = len(sessions)
+    print(f"{n} sessions ({args.processes} processes x {args.sessions}) for {args.seconds:g} s on {args.tests} hot tests")
+    print(f"  accepted saves   {len(saves):>8,}  ({len(saves) / args.seconds:,.0f}/s)   conflicts {conflicts:,} ({conflicts / max(conflicts + len(saves), 1):.1%} of attempts)")
+    for name, values in timing.items():
+        print(f"  {name:<16} p50 {_pct(values, 50):7.3f} ms   p99 {_pct(values, 99):7.3f} ms   (n={len(values):,})")
+    for name, values in (("notify, same process", local), ("notify, other process", remote)):
+        print(f"  {name:<22} p50 {_pct(values, 50):7.2f} ms   p99 {_pct(values, 99):7.2f} ms")
+    print("  verified: store = replay of accepted saves, no save over an unseen edit, every session in sync")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Bulk price engine benchmark: vectorized rules vs the old per-row iterrows loop.
+
+Run from the repo root:  python -m benchmarks.bench_pricing
+"""
+
+import time
+
+import numpy as np
+
+from kelp_pricing import compute_margins, reprice
+from benchmarks.synthetic import make_catalog
+
+
+def loop_reprice(df, mask, adjustment, value):
+    """The pre-engine Price Editor loop, kept as the reference implementation"""
+    df = df.copy()
+    for idx, row in df[mask].iterrows():
+        if adjustment == "Percentage":
+            new_price = row['price'] * (1 + value / 100)
+        else:
+            new_price = row['price'] + value
+        df.at[idx, 'price'] = max(0, new_price)
+        r = df.loc[idx]
+        df.at[idx, 'margin_percent'] = ((r['price'] - r['total_cost']) / r['price']) * 100 if r['price'] > 0 else 0
+    return df
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def check_equivalence():
+    df = make_catalog(2_000)
+    mask = df['category'].isin(["METALS", "INORGANICS"]).to_numpy()
+    for adjustment, value in [("Percentage", 7), ("Percentage", -50), ("Fixed Amount", -40.0), ("Fixed Amount", 12.5)]:
+        expected = loop_reprice(df, mask, adjustment, value)
+        got = reprice(df, mask, adjustment, value)
+        prices = expected.loc[mask, 'price'].to_numpy()
+        changed = prices != df.loc[mask, 'price'].to_numpy()
+        assert got == dict(zip(df.loc[mask, 'id'].to_numpy()[changed].tolist(), prices[changed].tolist())), adjustment
+        assert np.allclose(expected.loc[mask, 'margin_percent'], compute_margins(prices, df.loc[mask, 'total_cost']))
+    print("vectorized engine matches iterrows loop: OK")
+
+
+def main():
+    check_equivalence()
+    print(f"{'rows':>8} {'loop (s)':>10} {'engine (ms)':>12} {'speedup':>9}")
+    for n in [84, 1_000, 10_000, 100_000]:
+        df = make_catalog(n)
+        mask = (df['category'] != "SERVICES").to_numpy()
+        _, t_engine = timed(reprice, df, mask, "Percentage", 5)
+        if n <= 10_000:
+            _, t_loop = timed(loop_reprice, df, mask, "Percentage", 5)
+            loop_txt = f"{t_loop:10.3f}"
+            speedup = f"{t_loop / t_engine:8.0f}x"
+        else:
+            loop_txt, speedup = f"{'-':>10}", f"{'-':>9}"
+        print(f"{n:>8} {loop_txt} {t_engine * 1000:12.2f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
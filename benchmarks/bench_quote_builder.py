@@ -0,0 +1,56 @@
+"""
+Quote Generator interaction latency, measured headlessly with Streamlit's AppTest.
+
+Each interaction is a full script rerun, so this is the latency a rep sees per
+click. Target: p50 under INTERACTION_TARGET_MS for every interaction.
+
+Run from the repo root:  python -m benchmarks.bench_quote_builder
+"""
+
+import statistics
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "kelp_app.py")
+INTERACTION_TARGET_MS = 150
+REPEAT = 15
+
+
+def fresh_app():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.sidebar.radio[0].set_value("📝 Quote Generator").run()
+    return at
+
+
+def timed(action):
+    t0 = time.perf_counter()
+    action()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    at = fresh_app()
+    print(f"widgets on first render: {len(at.button)} buttons, {len(at.number_input)} number inputs")
+
+    results = {'add to cart': [], 'change qty': [], 'search keystroke': [], 'remove from cart': []}
+    for i in range(REPEAT):
+        add = [b for b in at.button if b.label == "➕ Add"][0]
+        results['add to cart'].append(timed(lambda: add.click().run()))
+        tid = next(iter(at.session_state['quote_cart']))
+        results['change qty'].append(timed(lambda: at.number_input(key=f"cart_qty_{tid}").set_value(2 + i % 5).run()))
+        results['search keystroke'].append(timed(lambda: at.text_input(key="qb_search").set_value("nitr"[:1 + i % 4]).run()))
+        at.text_input(key="qb_search").set_value("").run()
+        results['remove from cart'].append(timed(lambda: at.button(key=f"cart_rm_{tid}").click().run()))
+        assert not at.exception, at.exception
+
+    print(f"{'interaction':<18} {'p50 (ms)':>9} {'max (ms)':>9}  target {INTERACTION_TARGET_MS} ms")
+    for name, ms in results.items():
+        p50 = statistics.median(ms)
+        print(f"{name:<18} {p50:9.1f} {max(ms):9.1f}  {'OK' if p50 <= INTERACTION_TARGET_MS else 'SLOW'}")
+
+
+if __name__ == "__main__":
+    main()
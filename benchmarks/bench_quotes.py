@@ -0,0 +1,95 @@
+"""
+Quote repository benchmark: search and requote over a history of 300k quotes,
+and collision-free numbering with several processes saving at once.
+
+Run from the repo root:  python -m benchmarks.bench_quotes
+"""
+
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from kelp_catalog import get_base_catalog
+from kelp_core import price_quote
+from kelp_quotes import QuoteStore
+
+ACCOUNTS = [f"{w} {k} District" for w in ("North", "South", "East", "West", "Central") for k in range(400)]
+CONTACTS = [f"{f} {l}" for f in ("Alex", "Sam", "Jo", "Pat", "Lee", "Kim", "Ray", "Max", "Ari", "Dana") for l in range(500)]
+
+
+def make_quotes(n, seed=0):
+    """Synthetic history: popular tests quoted more often, dates over three years, one quote in ten at a second site"""
+    rng = np.random.default_rng(seed)
+    ids = get_base_catalog()['id'].to_numpy()
+    weights = 1 / np.arange(1, len(ids) + 1)
+    weights /= weights.sum()
+    start = date.today() - timedelta(days=3 * 365)
+    quotes = []
+    for i in range(n):
+        tests = rng.choice(ids, rng.integers(1, 9), replace=False, p=weights)
+        q = price_quote([(int(t), int(rng.integers(1, 5))) for t in tests], float(rng.choice([0, 5, 10])))
+        q.update(date=start + timedelta(days=int(rng.integers(0, 3 * 365))), account_name=ACCOUNTS[rng.integers(len(ACCOUNTS))],
+                 contact_name=CONTACTS[rng.integers(len(CONTACTS))], prepared_by="KELP Lab", lab="SITE-2" if i % 10 == 0 else "KELP")
+        quotes.append(q)
+    return quotes
+
+
+def timed(label, fn, repeat=20):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    print(f"{label:<48} {(time.perf_counter() - t0) / repeat * 1000:8.2f} ms")
+    return out
+
+
+def _save_from_worker(args):
+    path, n = args
+    store = QuoteStore(path)
+    quote = price_quote([(1, 1)])
+    return [store.save(quote) for _ in range(n)]
+
+
+def main(n_quotes=300_000, workers=8, per_worker=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "quotes.sqlite3"
+        store = QuoteStore(path)
+        t0 = time.perf_counter()
+        template = make_quotes(5_000)
+        for start in range(0, n_quotes, len(template)):
+            store.save_many(template[:min(len(template), n_quotes - start)])
+        print(f"{f'load {n_quotes:,} quotes':<48} {(time.perf_counter() - t0) * 1000:8.0f} ms")
+
+        timed("search by account prefix (newest 50)", lambda: store.search(account="north 12"))
+        timed("search by exact account", lambda: store.search(account=ACCOUNTS[7]))
+        timed("search by contact prefix", lambda: store.search(contact="jo 4"))
+        timed("search by popular test id (pH)", lambda: store.search(test_id=1))
+        timed("search by rare test id", lambda: store.search(test_id=84))
+        timed("search by date range (one week)", lambda: store.search(since=date.today() - timedelta(days=400), until=date.today() - timedelta(days=393)))
+        timed("search account prefix + test id", lambda: store.search(account="south", test_id=5))
+        timed("search exact account + test id", lambda: store.search(account=ACCOUNTS[7], test_id=5))
+        timed("count quotes with test id (pH)", lambda: store.count(test_id=1), repeat=5)
+        timed("one site's history page (newest 50)", lambda: store.search(lab="SITE-2"))
+        timed("one site: account prefix + test id", lambda: store.search(account="south", test_id=5, lab="SITE-2"))
+        timed("one site: count quotes with test id (pH)", lambda: store.count(test_id=1, lab="SITE-2"), repeat=5)
+        timed("one site: quoted volume per test", lambda: store.test_volumes(lab="SITE-2"), repeat=5)
+        number = store.search(account=ACCOUNTS[7], limit=1, lab="KELP")[0]['quote_number']
+        timed("get quote with lines", lambda: store.get(number))
+        timed("requote with current prices", lambda: store.requote(number))
+
+        with ProcessPoolExecutor(workers) as pool:
+            t0 = time.perf_counter()
+            results = list(pool.map(_save_from_worker, [(path, per_worker)] * workers))
+            elapsed = time.perf_counter() - t0
+        numbers = [n for r in results for n in r]
+        assert len(set(numbers)) == len(numbers), "duplicate quote numbers"
+        assert all(r == sorted(r, key=lambda n: int(n.split('-')[1])) for r in results), "numbers not monotonic"
+        print(f"{workers} processes x {per_worker} saves: {len(numbers):,} unique, monotonic numbers in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Catalog search benchmark: precomputed index vs the old copy + full-scan filter.
+
+Run from the repo root:  python -m benchmarks.bench_search
+"""
+
+import time
+
+import numpy as np
+
+from kelp_search import CatalogSearchIndex
+from benchmarks.synthetic import make_catalog
+
+QUERIES = [
+    ("", "METALS", None),
+    ("nitrate", None, None),
+    ("200.8", None, None),
+    ("537", None, "Potable"),
+    ("pfas 1633", "PFAS TESTING", None),
+    ("chlor", None, "Non-Potable"),
+    ("tr", None, None),
+    ("al ni", "METALS", None),
+]
+
+
+def scan(df, query, cat, wt):
+    """The pre-index render_catalog filter, generalised to all search fields"""
+    filtered = df[df['active']].copy()
+    if cat: filtered = filtered[filtered['category'] == cat]
+    if wt: filtered = filtered[filtered['water_type'] == wt]
+    for term in query.split():
+        hit = np.zeros(len(filtered), dtype=bool)
+        for field in ['name', 'method', 'method_group', 'category']:
+            hit |= filtered[field].str.contains(term, case=False, regex=False, na=False).to_numpy()
+        filtered = filtered[hit]
+    return filtered
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, min(times)
+
+
+def main(n_rows=50_000):
+    df = make_catalog(n_rows)
+    t0 = time.perf_counter()
+    index = CatalogSearchIndex(df)
+    print(f"index build over {n_rows:,} rows: {time.perf_counter() - t0:.2f}s (once per catalog version)")
+    print(f"{'query':<26} {'hits':>6} {'scan (ms)':>10} {'index (ms)':>11}")
+    for query, cat, wt in QUERIES:
+        expected, t_scan = best_of(lambda: scan(df, query, cat, wt))
+        positions, t_index = best_of(lambda: index.search(query, category=cat, water_type=wt))
+        if any(ch.isdigit() for ch in query):  # the index also matches punctuation-free method numbers
+            assert set(df.index[positions]) >= set(expected.index), query
+        else:
+            assert set(df.index[positions]) == set(expected.index), query
+        label = f"{query or '-'} [{cat or wt or 'all'}]"
+        print(f"{label:<26} {len(positions):>6} {t_scan * 1000:10.2f} {t_index * 1000:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
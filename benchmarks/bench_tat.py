@@ -0,0 +1,42 @@
+"""
+TAT surcharge benchmark: repricing a large multi-line quote when the TAT
+selector changes. Target: a 10k-line quote repriced well under 50 ms.
+
+Run from the repo root:  python -m benchmarks.bench_tat
+"""
+
+import time
+
+import numpy as np
+
+from kelp_core import quote_line
+from kelp_tat import TAT_OPTIONS, apply_tat, batch_fees, line_tats, price_tat
+from benchmarks.synthetic import make_catalog
+
+
+def timed(label, fn, repeat=20):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    print(f"{label:<52} {(time.perf_counter() - t0) / repeat * 1000:9.3f} ms")
+    return out
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for n_lines in (1_000, 10_000, 100_000):
+        df = make_catalog(n_lines)
+        price, qty, catalog_tat = df['price'].to_numpy(), rng.integers(1, 20, n_lines).astype(float), df['tat'].to_numpy()
+        for tat in ("1 Day", "Weekend"):
+            out = timed(f"price_tat, {n_lines:,} lines at {tat}", lambda: price_tat(price, qty, line_tats(catalog_tat, tat)))
+        batch = rng.integers(0, 50, n_lines)
+        timed(f"batch_fees, {n_lines:,} lines in 50 batches", lambda: batch_fees(out.batch_fee, batch))
+
+    items = [quote_line(i % 84 + 1, 2) for i in range(10_000)]
+    for tat in TAT_OPTIONS[1:3]:
+        timed(f"apply_tat on 10,000 quote items at {tat}", lambda: apply_tat(items, tat, batches=3), repeat=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Load test for kelp_service against localhost: sustained /quote/price
+throughput with p50/p99 latency, plus PDF coalescing and backpressure.
+
+Starts its own service unless --url points at a running one.
+Run from the repo root:  python -m benchmarks.load_test_service --seconds 10 --connections 32
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGET_RPS = 500
+
+
+async def request(reader, writer, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return status, await reader.readexactly(length)
+
+
+def random_quote(rng):
+    return {
+        'lines': [{'test_id': rng.randint(1, 84), 'qty': rng.randint(1, 5)} for _ in range(rng.randint(1, 12))],
+        'metals': [{'method': "EPA 200.8", 'elements': rng.sample(["Lead", "Copper", "Zinc", "Arsenic", "Mercury"], 3), 'qty': 1}],
+        'discount_percent': rng.choice([0, 5, 10]),
+    }
+
+
+async def price_worker(host, port, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/quote/price", random_quote(rng))
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def pdf_burst(host, port, n, identical):
+    async def one(i):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            body = {'lines': [{'test_id': 1 if identical else 1 + i % 84, 'qty': 1}], 'quote_number': "LOAD" if identical else f"LOAD-{i}"}
+            status, _ = await request(reader, writer, "POST", "/quote/pdf", body)
+            return status
+        finally:
+            writer.close()
+    return await asyncio.gather(*(one(i) for i in range(n)))
+
+
+async def health(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return json.loads((await request(reader, writer, "GET", "/health"))[1])
+    finally:
+        writer.close()
+
+
+async def run(host, port, seconds, connections):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    t0 = time.perf_counter()
+    await asyncio.gather(*(price_worker(host, port, deadline, latencies, errors, i) for i in range(connections)))
+    elapsed = time.perf_counter() - t0
+    q = statistics.quantiles(latencies, n=100)
+    rps = len(latencies) / elapsed
+    print(f"/quote/price: {len(latencies):,} requests in {elapsed:.1f}s = {rps:,.0f} req/s "
+          f"({'OK' if rps >= TARGET_RPS else 'below'} {TARGET_RPS} target), p50 {q[49]:.2f} ms, p99 {q[98]:.2f} ms, errors {len(errors)}")
+
+    before = await health(host, port)
+    statuses = await pdf_burst(host, port, 24, identical=True)
+    after = await health(host, port)
+    print(f"24 identical PDFs: {statuses.count(200)} ok, {after['pdf_renders'] - before['pdf_renders']} renders, "
+          f"{after['pdf_coalesced'] - before['pdf_coalesced']} coalesced")
+    statuses = await pdf_burst(host, port, 64, identical=False)
+    print(f"64 distinct PDFs at once: {statuses.count(200)} ok, {statuses.count(503)} rejected with 503 (backpressure)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="existing service, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--connections", type=int, default=32)
+    args = parser.parse_args()
+
+    proc = None
+    if args.url:
+        u = urlsplit(args.url)
+        host, port = u.hostname, u.port
+    else:
+        host, port = "127.0.0.1", 8799
+        proc = subprocess.Popen([sys.executable, "-m", "kelp_service", "--port", str(port)], cwd=ROOT, stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            try:
+                asyncio.run(health(host, port))
+                break
+            except OSError:
+                time.sleep(0.1)
+    try:
+        asyncio.run(run(host, port, args.seconds, args.connections))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Synthetic multi-lab catalogs for benchmarks.
+Tiles the 84-test base catalog across labs and jitters costs and prices.
+"""
+
+import numpy as np
+import pandas as pd
+
+from kelp_catalog import get_base_catalog
+
+
+def make_catalog(n_rows, seed=0):
+    """Catalog of n_rows tests with unique ids, spread across synthetic lab sites"""
+    base = get_base_catalog()
+    reps = -(-n_rows // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).iloc[:n_rows].copy()
+    rng = np.random.default_rng(seed)
+    scale = rng.uniform(0.8, 1.25, n_rows)
+    cost_cols = ['standards', 'consumables', 'gases_utilities', 'labor', 'depreciation', 'subtotal', 'qc_oh', 'facility_oh', 'total_cost']
+    for c in cost_cols:
+        df[c] = (df[c] * scale).round(2)
+    df['price'] = (df['price'] * rng.uniform(0.9, 1.2, n_rows)).round(2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['margin_percent'] = np.where(df['price'] > 0, (df['price'] - df['total_cost']) / df['price'] * 100, 0.0).round(2)
+    df['id'] = np.arange(1, n_rows + 1)
+    df['lab'] = [f"LAB-{i // len(base) % 50:02d}" for i in range(n_rows)]
+    df['name'] = df['name'] + np.where(np.arange(n_rows) >= len(base), " #" + (np.arange(n_rows) // len(base)).astype(str), "")
+    return df
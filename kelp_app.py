@@ -6,18 +6,32 @@ Version 5.0 - Complete with 84 Tests, Price Editing, PDF Quotes
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import json
-import io
+import hashlib
 import plotly.express as px
-
-st.set_page_config(page_title="KELP Lab Services", page_icon="🔬", layout="wide", initial_sidebar_state="expanded")
+from kelp_catalog import apply_price_overlay
+from kelp_core import quote_totals
+from kelp_pricing import ADJUSTMENT_TYPES, compute_margins, reprice
+from kelp_audit import get_audit_store
+from kelp_metrics import LOW_MARGIN_THRESHOLD, CatalogMetrics
+from kelp_export import EXPORT_FORMATS, audit_section, export_name, frame_section, get_export_cache, quote_sections
+from kelp_quotes import get_quote_store
+from kelp_pdfcache import get_pdf_cache, quote_key
+from kelp_profiling import get_profiler, timed
+from kelp_costmodel import BASELINE, CostParameters, sensitivity_grid
+from kelp_optimizer import MarginOptimizer, MarginRules
+from kelp_labs import DEFAULT_LAB, get_registry, read_lab_file
+from kelp_prices import PriceConflict, get_price_store
+from kelp_pricebook import PriceBook, diff_books, get_pricebook_store, what_if
+from kelp_metals import METALS_PANELS, price_metals_panel, schedule_label
+from kelp_tat import DEFAULT_TAT, EXEMPT_TAT, TAT_OPTIONS, apply_tat, batch_fee_item, line_tats, price_tat
 
 # ============================================================================
-# CUSTOM CSS
+# PAGE SETUP & CUSTOM CSS
 # ============================================================================
 
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     [data-testid="stSidebar"] { background: linear-gradient(180deg, #1B3B6F 0%, #0D253D 100%); }
     [data-testid="stSidebar"] * { color: white !important; }
@@ -26,228 +40,177 @@ st.markdown("""
     .stButton > button { background: linear-gradient(135deg, #00B4D8 0%, #0096C7 100%); color: white; border: none; border-radius: 8px; }
     #MainMenu {visibility: hidden;} footer {visibility: hidden;}
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# ============================================================================
-# COMPLETE DATA - ALL 84 TESTS FROM CSV
-# ============================================================================
-
-def get_all_analytes():
-    """All 84 analytes from the CA ELAP 2025 Cost Calculator"""
-    data = [
-        # PHYSICAL/GENERAL CHEMISTRY
-        {"id": 1, "name": "pH", "method": "EPA 150.1", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 30.00, "margin_percent": 57.63, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 2, "name": "pH", "method": "EPA 150.2", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 30.00, "margin_percent": 57.63, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 3, "name": "Temperature", "method": "SM 2550 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 15.00, "margin_percent": 15.27, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 4, "name": "Dissolved Oxygen", "method": "SM 4500-O", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 30.00, "margin_percent": 57.63, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 5, "name": "Turbidity", "method": "EPA 180.1", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 6, "name": "Turbidity", "method": "EPA 180.1", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 7, "name": "Conductivity", "method": "SM 2510 B", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 8, "name": "Conductivity", "method": "EPA 120.1", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 9, "name": "Alkalinity", "method": "SM 2320 B", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 50.00, "margin_percent": 51.60, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 10, "name": "Hardness - Total", "method": "SM 2340 C", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 80.00, "margin_percent": 69.75, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 11, "name": "Hardness - Total", "method": "EPA 130.1", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 80.00, "margin_percent": 69.75, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 12, "name": "Total Dissolved Solids", "method": "SM 2540 C", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 60.00, "margin_percent": 31.53, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 13, "name": "Total Dissolved Solids", "method": "SM 2540 C", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 60.00, "margin_percent": 31.53, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 14, "name": "Total Suspended Solids", "method": "SM 2540 D", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 80.00, "margin_percent": 48.65, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 15, "name": "Total Solids", "method": "SM 2540 B", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 20.00, "margin_percent": -105.41, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 16, "name": "Total Solids", "method": "SM 2540 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 20.00, "margin_percent": -105.41, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 17, "name": "Chemical Oxygen Demand", "method": "EPA 410.4", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 150.00, "margin_percent": 77.78, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 18, "name": "BOD (5-day)", "method": "SM 5210 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Spectrophotometry - BOD/COD", "standards": 0.00, "consumables": 2.50, "gases_utilities": 0.00, "labor": 14.93, "depreciation": 0.60, "subtotal": 18.03, "qc_oh": 3.61, "facility_oh": 6.31, "total_cost": 27.95, "price": 180.00, "margin_percent": 84.47, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 19, "name": "BOD, Carbonaceous", "method": "SM 5210 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Spectrophotometry - BOD/COD", "standards": 0.00, "consumables": 2.50, "gases_utilities": 0.00, "labor": 14.93, "depreciation": 0.60, "subtotal": 18.03, "qc_oh": 3.61, "facility_oh": 6.31, "total_cost": 27.95, "price": 200.00, "margin_percent": 86.02, "tat": "Standard (5-7 Day)", "active": True},
-        
-        # INORGANICS
-        {"id": 20, "name": "Bromide", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 21, "name": "Bromide", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 22, "name": "Bromate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 160.00, "margin_percent": 82.41, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 23, "name": "Bromate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 160.00, "margin_percent": 82.41, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 24, "name": "Chloride", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 25, "name": "Chloride", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 26, "name": "Chlorite", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 140.00, "margin_percent": 79.90, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 27, "name": "Chlorite", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 140.00, "margin_percent": 79.90, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 28, "name": "Chlorate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 130.00, "margin_percent": 78.35, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 29, "name": "Chlorate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 130.00, "margin_percent": 78.35, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 30, "name": "Fluoride", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 31, "name": "Fluoride", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 32, "name": "Nitrate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 33, "name": "Nitrate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 34, "name": "Nitrite", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 35, "name": "Nitrite", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 36, "name": "Phosphate, Ortho", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 37, "name": "Phosphate, Ortho", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 38, "name": "Sulfate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 39, "name": "Sulfate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 40, "name": "Perchlorate", "method": "EPA 314.2", "water_type": "Potable", "category": "INORGANICS", "method_group": "IC-MS Perchlorate", "standards": 2.40, "consumables": 6.20, "gases_utilities": 0.00, "labor": 14.44, "depreciation": 14.29, "subtotal": 37.32, "qc_oh": 7.46, "facility_oh": 13.06, "total_cost": 57.85, "price": 350.00, "margin_percent": 83.47, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 41, "name": "Perchlorate", "method": "EPA 314.0", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "IC-MS Perchlorate", "standards": 2.40, "consumables": 6.20, "gases_utilities": 0.00, "labor": 14.44, "depreciation": 14.29, "subtotal": 37.32, "qc_oh": 7.46, "facility_oh": 13.06, "total_cost": 57.85, "price": 350.00, "margin_percent": 83.47, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 42, "name": "Cyanide, Total", "method": "SM 4500-CN E", "water_type": "Potable", "category": "INORGANICS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 160.00, "margin_percent": 68.98, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 43, "name": "Cyanide, Total", "method": "SW-846 9012B", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 160.00, "margin_percent": 68.98, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 44, "name": "Cyanide, Available", "method": "SM 4500-CN I", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 210.00, "margin_percent": 76.37, "tat": "Standard (5-7 Day)", "active": True},
-        
-        # NUTRIENTS
-        {"id": 45, "name": "Ammonia (as N)", "method": "EPA 350.1", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 110.00, "margin_percent": 69.70, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 46, "name": "Ammonia (as N)", "method": "EPA 350.1", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 110.00, "margin_percent": 69.70, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 47, "name": "Kjeldahl Nitrogen, Total", "method": "EPA 351.2", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 48, "name": "Kjeldahl Nitrogen, Total", "method": "EPA 351.2", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 49, "name": "Phosphorus, Total", "method": "EPA 365.1", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 120.00, "margin_percent": 72.23, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 50, "name": "Phosphorus, Total", "method": "EPA 365.1", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 120.00, "margin_percent": 72.23, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 51, "name": "Sulfide (as S)", "method": "SM 4500-S2 D", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 200.00, "margin_percent": 75.18, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 52, "name": "Sulfite (as SO3)", "method": "SM 4500-SO3", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 120.00, "margin_percent": 46.58, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 53, "name": "Sulfite (as SO3)", "method": "SM 4500-SO3", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 120.00, "margin_percent": 46.58, "tat": "Standard (5-7 Day)", "active": True},
-        
-        # ORGANICS
-        {"id": 54, "name": "Surfactants (MBAS)", "method": "SM 5540 C", "water_type": "Potable", "category": "ORGANICS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 280.00, "margin_percent": 77.11, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 55, "name": "Surfactants (MBAS)", "method": "SM 5540 C", "water_type": "Non-Potable", "category": "ORGANICS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 280.00, "margin_percent": 77.11, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 56, "name": "Dissolved Organic Carbon", "method": "EPA 415.3", "water_type": "Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 57, "name": "Dissolved Organic Carbon", "method": "EPA 415.3", "water_type": "Non-Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 58, "name": "Total Organic Carbon", "method": "EPA 415.3", "water_type": "Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 160.00, "margin_percent": 79.17, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 59, "name": "Total Organic Carbon", "method": "EPA 415.1", "water_type": "Non-Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 160.00, "margin_percent": 79.17, "tat": "Standard (5-7 Day)", "active": True},
-        
-        # DISINFECTION PARAMETERS
-        {"id": 60, "name": "Chlorine, Free", "method": "SM 4500-Cl G", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 61, "name": "Chlorine, Free - DPD", "method": "SM 4500-Cl F", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 62, "name": "Chlorine, Total - DPD", "method": "SM 4500-Cl F", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 63, "name": "Chlorine, Total - DPD", "method": "SM 4500-Cl F", "water_type": "Non-Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 64, "name": "Chlorine, Combined", "method": "SM 4500-Cl G", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 65, "name": "Chloramines (Monochloramine)", "method": "SM 4500-Cl G", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 66, "name": "Chlorine Dioxide", "method": "SM 4500-ClO2 E", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
-        
-        # METALS
-        {"id": 67, "name": "Calcium - Total", "method": "SM 3500-Ca B", "water_type": "Potable", "category": "METALS", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 70.00, "margin_percent": 65.43, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 68, "name": "Calcium - Total", "method": "EPA 6020B", "water_type": "Non-Potable", "category": "METALS", "method_group": "EPA 200.8 / EPA 6020B (ICP-MS)", "standards": 2.03, "consumables": 1.20, "gases_utilities": 0.90, "labor": 10.81, "depreciation": 14.58, "subtotal": 29.53, "qc_oh": 5.91, "facility_oh": 10.33, "total_cost": 45.77, "price": 70.00, "margin_percent": 34.62, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 69, "name": "Magnesium - Total", "method": "SM 3500-Mg B", "water_type": "Potable", "category": "METALS", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 70.00, "margin_percent": 65.43, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 70, "name": "Magnesium - Total", "method": "EPA 6020B", "water_type": "Non-Potable", "category": "METALS", "method_group": "EPA 200.8 / EPA 6020B (ICP-MS)", "standards": 2.03, "consumables": 1.20, "gases_utilities": 0.90, "labor": 10.81, "depreciation": 14.58, "subtotal": 29.53, "qc_oh": 5.91, "facility_oh": 10.33, "total_cost": 45.77, "price": 70.00, "margin_percent": 34.62, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 71, "name": "Chromium (VI)", "method": "EPA 218.6", "water_type": "Potable", "category": "METALS", "method_group": "Chromium(VI) IC-Postcolumn", "standards": 1.42, "consumables": 3.50, "gases_utilities": 0.00, "labor": 11.00, "depreciation": 5.00, "subtotal": 20.92, "qc_oh": 4.18, "facility_oh": 7.32, "total_cost": 32.42, "price": 230.00, "margin_percent": 85.90, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 72, "name": "Chromium (VI)", "method": "EPA 218.6", "water_type": "Non-Potable", "category": "METALS", "method_group": "Chromium(VI) IC-Postcolumn", "standards": 1.42, "consumables": 3.50, "gases_utilities": 0.00, "labor": 11.00, "depreciation": 5.00, "subtotal": 20.92, "qc_oh": 4.18, "facility_oh": 7.32, "total_cost": 32.42, "price": 230.00, "margin_percent": 85.90, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 73, "name": "RCRA 8 Metals Panel (Ag, As, Ba, Cd, Cr, Hg, Pb, Se)", "method": "EPA 6020B", "water_type": "Non-Potable", "category": "METALS", "method_group": "EPA 200.8 / EPA 6020B (ICP-MS)", "standards": 2.03, "consumables": 1.20, "gases_utilities": 0.90, "labor": 10.81, "depreciation": 14.58, "subtotal": 29.53, "qc_oh": 5.91, "facility_oh": 10.33, "total_cost": 45.77, "price": 540.00, "margin_percent": 91.52, "tat": "Standard (5-7 Day)", "active": True},
-        
-        # PFAS Testing
-        {"id": 74, "name": "PFAS 3-Compound (PFNA, PFOA, PFOS)", "method": "EPA 537.1", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 425.00, "margin_percent": 66.00, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 75, "name": "PFAS 3-Compound (PFNA, PFOA, PFOS)", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 425.00, "margin_percent": 66.00, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 76, "name": "PFAS 14-Compound", "method": "EPA 537.1", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 595.00, "margin_percent": 75.71, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 77, "name": "PFAS 18-Compound", "method": "EPA 537.1", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 625.00, "margin_percent": 76.88, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 78, "name": "PFAS 18-Compound", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 625.00, "margin_percent": 76.88, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 79, "name": "PFAS 25-Compound", "method": "EPA 533", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 710.00, "margin_percent": 79.65, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 80, "name": "PFAS 25-Compound", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 710.00, "margin_percent": 79.65, "tat": "Standard (5-7 Day)", "active": True},
-        {"id": 81, "name": "PFAS 40-Compound", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 65.00, "consumables": 35.00, "gases_utilities": 0.63, "labor": 30.00, "depreciation": 25.00, "subtotal": 155.63, "qc_oh": 50.00, "facility_oh": 54.47, "total_cost": 260.10, "price": 1190.00, "margin_percent": 78.14, "tat": "Standard (5-7 Day)", "active": True},
-        
-        # SERVICES
-        {"id": 82, "name": "Field Service", "method": "-", "water_type": "All", "category": "SERVICES", "method_group": "Field Services", "standards": 0.00, "consumables": 0.00, "gases_utilities": 0.00, "labor": 200.00, "depreciation": 0.00, "subtotal": 200.00, "qc_oh": 0.00, "facility_oh": 0.00, "total_cost": 200.00, "price": 330.00, "margin_percent": 39.39, "tat": "-", "active": True},
-        {"id": 83, "name": "Sample Pickup", "method": "-", "water_type": "All", "category": "SERVICES", "method_group": "Field Services", "standards": 0.00, "consumables": 0.00, "gases_utilities": 0.00, "labor": 50.00, "depreciation": 0.00, "subtotal": 50.00, "qc_oh": 0.00, "facility_oh": 0.00, "total_cost": 50.00, "price": 75.00, "margin_percent": 33.33, "tat": "-", "active": True},
-        {"id": 84, "name": "Rush Fee (per sample)", "method": "-", "water_type": "All", "category": "SERVICES", "method_group": "Rush Services", "standards": 0.00, "consumables": 0.00, "gases_utilities": 0.00, "labor": 0.00, "depreciation": 0.00, "subtotal": 0.00, "qc_oh": 0.00, "facility_oh": 0.00, "total_cost": 0.00, "price": 100.00, "margin_percent": 100.00, "tat": "-", "active": True},
-    ]
-    return pd.DataFrame(data)
+def setup_page():
+    """Page config and CSS; run from main() so importing this module has no side effects"""
+    st.set_page_config(page_title="KELP Lab Services", page_icon="🔬", layout="wide", initial_sidebar_state="expanded")
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # ============================================================================
 # SESSION STATE
 # ============================================================================
 
+# Per-lab session state, parked while the user works in another lab
+LAB_SESSION_KEYS = ('catalog_version', 'price_overlay', 'price_version', 'analytes', 'metrics', 'cost_base', 'cost_params', 'quote_cart', 'cart_rev', 'cart_cache', 'last_quote')
+
+@timed()
 def init_session_state():
-    if 'analytes' not in st.session_state or len(st.session_state.analytes) < 80:
-        st.session_state.analytes = get_all_analytes()
-    if 'audit_log' not in st.session_state:
-        st.session_state.audit_log = pd.DataFrame(columns=['timestamp', 'action', 'details'])
+    if 'lab' not in st.session_state:
+        st.session_state.lab = DEFAULT_LAB
+    if 'price_overlay' not in st.session_state:
+        st.session_state.price_overlay, st.session_state.price_version = get_price_store().snapshot(st.session_state.lab)
+    version = current_lab().catalog.attrs.get('version')
+    if st.session_state.get('catalog_version') != version:
+        reload_catalog(version)
+    if 'analytes' not in st.session_state:
+        refresh_view()
+    sync_prices()
 
-def log_action(action, details):
-    new_log = pd.DataFrame([{'timestamp': datetime.now().isoformat(), 'action': action, 'details': details}])
-    st.session_state.audit_log = pd.concat([st.session_state.audit_log, new_log], ignore_index=True)
+def reload_catalog(version):
+    """Start the session's view of its lab over from the catalog at `version`.
 
-# ============================================================================
-# HELPER FUNCTIONS
-# ============================================================================
+    On a first run this only records the version. When the lab's file was
+    replaced on disk, rows may have moved or gone, so nothing built from the
+    old catalog is kept: the view and metrics are rebuilt, the cost model is
+    re-applied, and the cart drops tests the lab no longer has. Price edits
+    are by test id and carry over.
+    """
+    reloaded = 'catalog_version' in st.session_state
+    st.session_state.catalog_version = version
+    if not reloaded:
+        return
+    for k in ('analytes', 'metrics', 'cost_base', 'cart_cache'):
+        st.session_state.pop(k, None)
+    lab = current_lab()
+    if 'cost_params' in st.session_state:
+        try:
+            st.session_state.cost_base = lab.cost_model.apply(lab.catalog, *st.session_state.cost_params)
+        except ValueError as e:
+            st.session_state.pop('cost_params')
+            st.warning(f"⚠️ Cost model dropped: {e}")
+    cart = st.session_state.get('quote_cart') or {}
+    gone = [i for i, pos in zip(list(cart), lab.positions(cart)) if pos < 0]
+    for test_id in gone:
+        _cart_remove(test_id)
+    st.toast(f"🔔 The {lab.code} catalog was updated" + (f"; {len(gone)} test(s) it no longer has left the quote cart" if gone else ""))
+
+def sync_prices():
+    """Pick up prices other sessions saved since this session's version; the view is rebuilt only if this lab's moved"""
+    st.session_state.price_seen = st.session_state.price_version
+    catch_up()
+
+def catch_up(own=()):
+    """Fold the price store's changes since the session's version into its overlay and view.
 
-def calculate_metals_price(num_metals, water_type):
-    if num_metals <= 0:
-        return 0.0
-    if water_type == "Potable":
-        return 70.00 + (12.00 * max(0, num_metals - 1))
+    `own` names the tests of a save this session just made, which are not
+    announced as another user's.
+    """
+    ids, prices, st.session_state.price_version = get_price_store().changes_since(st.session_state.lab, st.session_state.price_version)
+    known = current_lab().positions(ids) >= 0
+    overlay = st.session_state.price_overlay
+    theirs = 0
+    for test_id, price in zip(ids[known].tolist(), prices[known].tolist()):
+        old = overlay.pop(test_id, None)
+        if not np.isnan(price):
+            overlay[test_id] = price
+        theirs += test_id not in own and overlay.get(test_id) != old
+    if known.any():
+        refresh_view()
+    if theirs:
+        st.toast(f"🔔 {theirs} price(s) updated by another user")
+
+def refresh_view():
+    """Point the session at its lab's catalog at its price version: the lab's shared
+    priced catalog and metrics, or a copy of its own under a cost model"""
+    if 'cost_base' in st.session_state:
+        st.session_state.analytes = apply_price_overlay(st.session_state.cost_base, st.session_state.price_overlay)
+        st.session_state.metrics = CatalogMetrics(st.session_state.analytes)
     else:
-        return 130.00 + (12.00 * max(0, num_metals - 1))
+        st.session_state.analytes, st.session_state.metrics = current_lab().priced(st.session_state.price_overlay, st.session_state.price_version)
 
-def recalc_margin(row):
-    if row['price'] > 0:
-        return ((row['price'] - row['total_cost']) / row['price']) * 100
-    return 0
+def current_lab():
+    """The session's lab: catalog, search index, metrics and cost model"""
+    return get_registry().get(st.session_state.get('lab', DEFAULT_LAB))
 
-# ============================================================================
-# PDF GENERATOR
-# ============================================================================
+def switch_lab():
+    """Park this lab's edits, cart and views and pick up the chosen lab's where they were left"""
+    old, new = st.session_state.lab, st.session_state.lab_select
+    parked = st.session_state.setdefault('lab_sessions', {})
+    parked[old] = {k: st.session_state.pop(k) for k in LAB_SESSION_KEYS if k in st.session_state}
+    for k, v in parked.pop(new, {}).items():
+        st.session_state[k] = v
+    st.session_state.lab = new
+    init_session_state()
 
-def generate_pdf_quote(quote_data):
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.5*inch, rightMargin=0.5*inch)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    normal = ParagraphStyle('Normal', fontSize=10)
-    bold = ParagraphStyle('Bold', fontSize=10, fontName='Helvetica-Bold')
-    small = ParagraphStyle('Small', fontSize=8, textColor=colors.HexColor('#666666'))
-    
-    header_blue = colors.HexColor('#4A90A4')
-    light_blue = colors.HexColor('#E8F4F8')
-    dark_blue = colors.HexColor('#1B3B6F')
-    
-    # Header
-    header = [[Paragraph('<b>KETOS</b><br/><font size="8">ENVIRONMENTAL LAB SERVICES</font><br/><font size="7">520 Mercury Dr, Sunnyvale, CA 94085<br/>Email: info@ketoslab.com</font>', ParagraphStyle('Logo', fontSize=12, textColor=dark_blue)), '', Paragraph(f'<b>DATE</b><br/>{quote_data["date"]}', ParagraphStyle('C', alignment=TA_CENTER, fontSize=10)), Paragraph(f'<b>QUOTE NO.</b><br/>{quote_data["quote_number"]}', ParagraphStyle('C', alignment=TA_CENTER, fontSize=10))]]
-    ht = Table(header, colWidths=[3*inch, 1.5*inch, 1.25*inch, 1.75*inch])
-    ht.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'MIDDLE'), ('BOX', (2,0), (3,0), 1, header_blue), ('BACKGROUND', (2,0), (3,0), light_blue)]))
-    elements.append(ht)
-    elements.append(Spacer(1, 20))
-    
-    # Customer Info
-    info = [[Paragraph('<b>Prepared By</b>', normal), quote_data.get('prepared_by', '')], [Paragraph('<b>Account Name</b>', normal), quote_data.get('account_name', 'NA')], [Paragraph('<b>Contact Name</b>', normal), quote_data.get('contact_name', '')], [Paragraph('<b>KELP Contact</b>', normal), 'info@ketoslab.com']]
-    it = Table(info, colWidths=[1.5*inch, 6*inch])
-    elements.append(it)
-    elements.append(Spacer(1, 20))
-    
-    # Items
-    items = [['DESCRIPTION', 'METHOD', 'QTY', 'LIST PRICE', 'TAT', 'TOTAL']]
-    for item in quote_data['items']:
-        items.append([Paragraph(item['description'], normal), item['method'], str(item['qty']), f"${item['price']:.2f}", item['tat'], f"${item['total']:.2f}"])
-    
-    imt = Table(items, colWidths=[2.5*inch, 1*inch, 0.5*inch, 0.9*inch, 1.3*inch, 0.8*inch])
-    style = [('BACKGROUND', (0,0), (-1,0), header_blue), ('TEXTCOLOR', (0,0), (-1,0), colors.white), ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'), ('ALIGN', (2,1), (-1,-1), 'CENTER'), ('BOX', (0,0), (-1,-1), 1, header_blue), ('LINEBELOW', (0,0), (-1,0), 1, header_blue)]
-    for i in range(1, len(items)):
-        if i % 2 == 0:
-            style.append(('BACKGROUND', (0,i), (-1,i), light_blue))
-    imt.setStyle(TableStyle(style))
-    elements.append(imt)
-    elements.append(Spacer(1, 10))
-    
-    # Totals
-    subtotal = quote_data['subtotal']
-    disc_pct = quote_data.get('discount_percent', 0)
-    disc_amt = subtotal * (disc_pct / 100)
-    total = subtotal - disc_amt
-    
-    tots = [['', '', '', '', 'Subtotal:', f"${subtotal:,.2f}"], ['', '', '', '', f'Discount ({disc_pct:.1f}%):', f"-${disc_amt:,.2f}"], ['', '', '', '', 'TOTAL:', f"${total:,.2f}"]]
-    tt = Table(tots, colWidths=[2.5*inch, 1*inch, 0.5*inch, 0.9*inch, 1.3*inch, 0.8*inch])
-    tt.setStyle(TableStyle([('ALIGN', (4,0), (-1,-1), 'RIGHT'), ('FONTNAME', (4,2), (-1,2), 'Helvetica-Bold'), ('BOX', (4,2), (-1,2), 2, dark_blue), ('BACKGROUND', (4,2), (-1,2), light_blue)]))
-    elements.append(tt)
-    
-    # Rush info
-    elements.append(Spacer(1, 30))
-    elements.append(Paragraph('<b>Rush Surcharges:</b>', bold))
-    elements.append(Paragraph('<font size="8">1 Day 150% | 2 Days 75% | 3 Days 50% | 4 Days 25% | Weekend $700 + 250%</font>', small))
-    
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer.getvalue()
+def log_action(action, details, test_id=None):
+    get_audit_store().append(action, details, test_id, lab=st.session_state.lab)
+
+def log_price_changes(new_prices):
+    """One 'Price Updated' entry per test, appended as a single batch"""
+    ts = datetime.now().isoformat()
+    df = st.session_state.analytes
+    rows = df[df['id'].isin(list(new_prices))]
+    get_audit_store().append_many([(ts, "Price Updated", int(i), f"{n} ({m}): ${old:.2f} → ${new_prices[i]:.2f}", st.session_state.lab) for i, n, m, old in zip(rows['id'], rows['name'], rows['method'], rows['price'])])
+
+@timed()
+def get_metrics():
+    return st.session_state.get('metrics') or current_lab().metrics
+
+def session_base():
+    """The lab's shared catalog, or the session's copy re-costed by its cost model"""
+    base = st.session_state.get('cost_base')
+    return current_lab().catalog if base is None else base
+
+@timed()
+def set_prices(prices):
+    """Save {test id: new price} edits to the shared price store, log them and refresh the view.
+
+    Returns False, with an error on the page, if another user changed one of
+    the tests after this session last synced.
+    """
+    try:
+        get_price_store().save(st.session_state.lab, prices, st.session_state.price_seen)
+    except PriceConflict as e:
+        st.error(f"⚠️ {e}")
+        return False
+    log_price_changes(prices)
+    catch_up(own=prices)
+    return True
+
+def reset_prices():
+    """Every price in this lab back to the catalog, for every session; False on a conflict"""
+    try:
+        get_price_store().reset(st.session_state.lab, st.session_state.price_seen)
+    except PriceConflict as e:
+        st.error(f"⚠️ {e}")
+        return False
+    catch_up(own=set(st.session_state.price_overlay))
+    return True
+
+def set_cost_model(params, overrides=None):
+    """Re-cost every test in one vectorized pass; the session keeps its price edits"""
+    if params == BASELINE and not overrides:
+        st.session_state.pop('cost_base', None)
+        st.session_state.pop('cost_params', None)
+    else:
+        lab = current_lab()
+        st.session_state.cost_base = lab.cost_model.apply(lab.catalog, params, overrides)
+        st.session_state.cost_params = (params, overrides or {})
+    refresh_view()
 
 # ============================================================================
 # SIDEBAR
 # ============================================================================
 
+@timed()
 def render_sidebar():
     st.sidebar.markdown('<div style="text-align:center;padding:20px 0;"><div style="font-size:32px;font-weight:800;">KELP</div><div style="font-size:11px;color:#00B4D8;">LABORATORY SERVICES</div></div>', unsafe_allow_html=True)
     st.sidebar.markdown("---")
-    page = st.sidebar.radio("Navigation", ["🏠 Dashboard", "🧪 Test Catalog", "✏️ Price Editor", "📝 Quote Generator", "🧮 Metals Calculator", "⚙️ Settings"], label_visibility="collapsed")
+    labs = get_registry().labs()
+    if len(labs) > 1:
+        st.sidebar.selectbox("Lab Site", labs, index=labs.index(st.session_state.lab) if st.session_state.lab in labs else 0, key="lab_select", on_change=switch_lab)
+    page = st.sidebar.radio("Navigation", ["🏠 Dashboard", "🧪 Test Catalog", "✏️ Price Editor", "📝 Quote Generator", "📂 Quote History", "🧮 Metals Calculator", "⚙️ Settings"], label_visibility="collapsed")
     st.sidebar.markdown("---")
     st.sidebar.markdown(f"**{len(st.session_state.analytes)}** Tests Available")
     return page.split(" ", 1)[1]
@@ -256,54 +219,62 @@ def render_sidebar():
 # PAGES
 # ============================================================================
 
+@timed()
 def render_dashboard():
     st.title("🔬 KELP Dashboard")
-    df = st.session_state.analytes[st.session_state.analytes['active']]
+    metrics = get_metrics()
+    totals = metrics.totals()
     
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total Tests", len(df))
-    c2.metric("Avg Price", f"${df['price'].mean():.2f}")
-    c3.metric("Avg Cost", f"${df['total_cost'].mean():.2f}")
-    c4.metric("Avg Margin", f"{df['margin_percent'].mean():.1f}%")
+    c1.metric("Total Tests", totals['count'])
+    c2.metric("Avg Price", f"${totals['avg_price']:.2f}")
+    c3.metric("Avg Cost", f"${totals['avg_cost']:.2f}")
+    c4.metric("Avg Margin", f"{totals['avg_margin']:.1f}%")
     
     st.markdown("---")
     col1, col2 = st.columns(2)
+    summary = metrics.figure('category_summary', lambda m: m.category_summary())
     with col1:
-        fig = px.pie(df, names='category', title='Tests by Category')
+        fig = metrics.figure('category_pie', lambda m: px.pie(summary.reset_index(), names='category', values='Count', title='Tests by Category'))
         st.plotly_chart(fig, use_container_width=True)
     with col2:
-        summary = df.groupby('category').agg({'id':'count', 'price':'mean', 'margin_percent':'mean'}).round(2)
-        summary.columns = ['Count', 'Avg Price', 'Avg Margin %']
         st.dataframe(summary, use_container_width=True)
 
 
+@timed()
 def render_catalog():
     st.title("🧪 Test Catalog")
-    df = st.session_state.analytes[st.session_state.analytes['active']]
+    index = current_lab().search
     
     c1, c2, c3 = st.columns(3)
-    cat = c1.selectbox("Category", ["All"] + list(df['category'].unique()))
+    cat = c1.selectbox("Category", ["All"] + index.values('category'))
     wt = c2.selectbox("Water Type", ["All", "Potable", "Non-Potable"])
-    search = c3.text_input("Search")
+    search = c3.text_input("Search", placeholder="Name, method or method number (e.g. 200.8, 537)")
     
-    filtered = df.copy()
-    if cat != "All": filtered = filtered[filtered['category'] == cat]
-    if wt != "All": filtered = filtered[filtered['water_type'] == wt]
-    if search: filtered = filtered[filtered['name'].str.contains(search, case=False, na=False)]
+    positions = index.search(search, category=None if cat == "All" else cat, water_type=None if wt == "All" else wt)
+    filtered = st.session_state.analytes.iloc[positions]
     
     st.markdown(f"**{len(filtered)} tests**")
     st.dataframe(filtered[['name', 'method', 'water_type', 'category', 'price', 'total_cost', 'margin_percent', 'tat']], use_container_width=True, hide_index=True, height=600)
 
 
+def margin_histogram_figure(metrics):
+    hist = metrics.margin_histogram()
+    fig = px.bar(x=(hist['start'] + hist['end']) / 2, y=hist['count'], labels={'x': 'margin_percent', 'y': 'count'}, title='Margin Distribution')
+    fig.update_traces(width=5)
+    return fig
+
+
+@timed()
 def render_price_editor():
     st.title("✏️ Price Editor")
     st.markdown("*Edit individual test prices or apply bulk changes*")
     
-    tab1, tab2, tab3 = st.tabs(["📝 Individual Edit", "📦 Bulk Edit by Category", "📊 Cost Analysis"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📝 Individual Edit", "📦 Bulk Edit by Category", "📊 Cost Analysis", "🗂️ Price Books"])
     
     with tab1:
         df = st.session_state.analytes
-        test_options = df['name'] + " | " + df['method'] + " | " + df['water_type']
+        test_options = df['name'] + " | " + df['method'].astype(str) + " | " + df['water_type'].astype(str)
         selected = st.selectbox("Select Test to Edit", test_options.tolist())
         
         if selected:
@@ -320,13 +291,10 @@ def render_price_editor():
                 new_price = st.number_input("New Price ($)", value=float(test['price']), min_value=0.0, step=5.0)
                 
                 if new_price != test['price']:
-                    new_margin = ((new_price - test['total_cost']) / new_price * 100) if new_price > 0 else 0
+                    new_margin = float(compute_margins(new_price, test['total_cost']))
                     st.info(f"New Margin: {new_margin:.1f}%")
                 
-                if st.button("💾 Save Price", type="primary"):
-                    st.session_state.analytes.at[idx, 'price'] = new_price
-                    st.session_state.analytes.at[idx, 'margin_percent'] = recalc_margin(st.session_state.analytes.iloc[idx])
-                    log_action("Price Updated", f"{test['name']} ({test['method']}): ${test['price']:.2f} → ${new_price:.2f}")
+                if st.button("💾 Save Price", type="primary") and set_prices({int(test['id']): new_price}):
                     st.success("Price updated!")
                     st.rerun()
     
@@ -336,49 +304,322 @@ def render_price_editor():
         categories = st.session_state.analytes['category'].unique().tolist()
         selected_cats = st.multiselect("Select Categories", categories, default=[])
         
-        adjustment_type = st.radio("Adjustment Type", ["Percentage", "Fixed Amount"], horizontal=True)
+        adjustment_type = st.radio("Adjustment Type", ADJUSTMENT_TYPES, horizontal=True)
         
         if adjustment_type == "Percentage":
-            pct = st.slider("Percentage Change (%)", -50, 50, 0)
-            st.caption(f"{'Increase' if pct > 0 else 'Decrease'} prices by {abs(pct)}%")
+            value = st.slider("Percentage Change (%)", -50, 50, 0)
+            st.caption(f"{'Increase' if value > 0 else 'Decrease'} prices by {abs(value)}%")
+            summary = f"{value}%"
+        elif adjustment_type == "Fixed Amount":
+            value = st.number_input("Amount ($)", value=0.0, step=5.0)
+            st.caption(f"{'Add' if value > 0 else 'Subtract'} ${abs(value):.2f} to/from prices")
+            summary = f"${value:.2f}"
         else:
-            amt = st.number_input("Amount ($)", value=0.0, step=5.0)
-            st.caption(f"{'Add' if amt > 0 else 'Subtract'} ${abs(amt):.2f} to/from prices")
+            value = st.slider("Target Margin (%)", 0, 90, 50)
+            st.caption(f"Price each test at a {value}% margin over its total cost")
+            summary = f"{value}% target margin"
+        
+        price_point = st.selectbox("Round to Price Point", [None, 1.0, 5.0, 10.0], format_func=lambda v: "No rounding" if v is None else f"${v:.0f}")
         
         if selected_cats:
-            affected = st.session_state.analytes[st.session_state.analytes['category'].isin(selected_cats)]
-            st.info(f"This will affect **{len(affected)}** tests")
+            mask = st.session_state.analytes['category'].isin(selected_cats).to_numpy()
+            st.info(f"This will affect **{int(mask.sum())}** tests")
+            
+            if st.checkbox("Preview (what-if)"):
+                ids = st.session_state.analytes['id'].to_numpy()[mask]
+                _, preview = what_if(current_price_book(), ids, adjustment_type, value, price_point, session_base())
+                if len(preview):
+                    st.caption(f"{len(preview)} prices change · avg margin {preview['old_margin'].mean():.1f}% → {preview['new_margin'].mean():.1f}% · list total {preview['change'].sum():+,.2f}")
+                st.dataframe(preview[['name', 'method', 'old_price', 'new_price', 'change_pct', 'new_margin']].round(2), hide_index=True)
             
             if st.button("Apply Bulk Change", type="primary"):
-                for idx, row in affected.iterrows():
-                    if adjustment_type == "Percentage":
-                        new_price = row['price'] * (1 + pct/100)
-                    else:
-                        new_price = row['price'] + amt
-                    new_price = max(0, new_price)
-                    st.session_state.analytes.at[idx, 'price'] = new_price
-                    st.session_state.analytes.at[idx, 'margin_percent'] = recalc_margin(st.session_state.analytes.iloc[idx])
-                
-                log_action("Bulk Price Update", f"Categories: {selected_cats}, Adjustment: {pct}% or ${amt}")
-                st.success(f"Updated {len(affected)} tests!")
-                st.rerun()
+                new_prices = reprice(st.session_state.analytes, mask, adjustment_type, value, price_point)
+                if not new_prices:
+                    st.info("No prices change under this adjustment")
+                elif set_prices(new_prices):
+                    log_action("Bulk Price Update", f"Categories: {selected_cats}, Adjustment: {summary}" + (f", rounded to ${price_point:.0f}" if price_point else ""))
+                    st.success(f"Updated {len(new_prices)} tests!")
+                    st.rerun()
     
     with tab3:
         st.subheader("Cost & Margin Analysis")
-        df = st.session_state.analytes[st.session_state.analytes['active']]
+        metrics = get_metrics()
         
         # Low margin alerts
-        low_margin = df[df['margin_percent'] < 40]
-        if len(low_margin) > 0:
-            st.warning(f"⚠️ {len(low_margin)} tests have margins below 40%")
+        low_pos = metrics.low_margin_positions()
+        if len(low_pos) > 0:
+            st.warning(f"⚠️ {len(low_pos)} tests have margins below {LOW_MARGIN_THRESHOLD:.0f}%")
+            low_margin = st.session_state.analytes.iloc[low_pos]
             st.dataframe(low_margin[['name', 'method', 'price', 'total_cost', 'margin_percent']].sort_values('margin_percent'), hide_index=True)
         
+        if st.toggle("🎯 Margin optimizer"):
+            render_margin_optimizer()
+        
         # Margin distribution
-        fig = px.histogram(df, x='margin_percent', nbins=20, title='Margin Distribution')
+        fig = metrics.figure('margin_histogram', margin_histogram_figure)
         st.plotly_chart(fig, use_container_width=True)
+        
+        render_cost_model()
+    
+    with tab4:
+        render_price_books()
 
 
+@timed()
+def render_margin_optimizer():
+    """Suggested prices for every test below its category's margin floor, applied as one batch"""
+    optimizer = MarginOptimizer(st.session_state.analytes)
+    c1, c2, c3, c4 = st.columns(4)
+    default_floor = c1.number_input("Margin Floor (%)", value=LOW_MARGIN_THRESHOLD, min_value=0.0, max_value=95.0, step=5.0)
+    price_point = c2.selectbox("Round Up to Price Point", [None, 1.0, 5.0, 10.0], format_func=lambda v: "No rounding" if v is None else f"${v:.0f}")
+    max_increase = c3.number_input("Max Increase (%)", value=None, min_value=0.0, step=5.0, placeholder="No cap")
+    max_amount = c4.number_input("Max Increase ($)", value=None, min_value=0.0, step=5.0, placeholder="No cap")
+    with st.expander("Category floors"):
+        edited = st.data_editor(pd.DataFrame({'Category': optimizer.categories, 'Floor (%)': default_floor}), disabled=['Category'], hide_index=True, key="opt_floors",
+                                column_config={'Floor (%)': st.column_config.NumberColumn(min_value=0.0, max_value=95.0, step=1.0)})
+    floors = {c: f for c, f in zip(edited['Category'], edited['Floor (%)']) if pd.notna(f) and f != default_floor}
+    since = st.date_input("Quote Volumes Since", value=date.today() - timedelta(days=365))
+    volumes = optimizer.row_volumes(*get_quote_store().test_volumes(since, lab=st.session_state.lab))
+    
+    rules = MarginRules(default_floor, floors, price_point, 'up', max_increase, max_amount)
+    try:
+        suggestions = optimizer.suggest(rules, volumes)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    summary = optimizer.compare([rules], volumes, workers=1).iloc[0]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Tests to Reprice", f"{len(suggestions)}")
+    m2.metric("Still Below Floor", f"{int(summary['below_floor'])}")
+    m3.metric("Avg Margin", f"{summary['new_avg_margin']:.1f}%", f"{summary['new_avg_margin'] - summary['avg_margin']:+.1f} pts")
+    m4.metric("Revenue Impact ($)", f"{summary['revenue_change']:+,.2f}", None if pd.isna(summary['revenue_change_pct']) else f"{summary['revenue_change_pct']:+.1f}%")
+    st.caption(f"Revenue impact at the test volumes quoted since {since:%m/%d/%Y}, assuming volumes do not change with price")
+    st.dataframe(suggestions[['name', 'method', 'category', 'price', 'new_price', 'change_pct', 'margin', 'new_margin', 'below_floor', 'volume', 'revenue_change']].round(2), hide_index=True)
+    
+    with st.expander("Compare scenarios"):
+        s1, s2 = st.columns(2)
+        floor_options = s1.multiselect("Margin Floors (%)", list(range(20, 85, 5)), default=[30, 40, 50, 60])
+        cap_options = s2.multiselect("Max Increases (%)", [None, 10, 25, 50, 100], default=[None, 25], format_func=lambda v: "No cap" if v is None else f"{v}%")
+        scenarios = [rules._replace(default_floor=float(f), max_increase=c) for f in floor_options for c in cap_options]
+        if scenarios:
+            grid = optimizer.compare(scenarios, volumes)
+            grid['max_increase'] = grid['max_increase'].map(lambda v: "No cap" if pd.isna(v) else f"{v:g}%")
+            st.dataframe(grid[['default_floor', 'max_increase', 'changed', 'below_floor', 'new_avg_margin', 'revenue_change', 'revenue_change_pct']].rename(columns={
+                'default_floor': 'Floor %', 'max_increase': 'Max Increase', 'changed': 'Repriced', 'below_floor': 'Below Floor',
+                'new_avg_margin': 'Avg Margin %', 'revenue_change': 'Revenue Change', 'revenue_change_pct': 'Revenue Change %'}).round(2), hide_index=True)
+    
+    if len(suggestions) and st.button("✅ Apply Suggested Prices", type="primary"):
+        new_prices = dict(zip(suggestions['id'].tolist(), suggestions['new_price'].tolist()))
+        if set_prices(new_prices):
+            log_action("Margin Optimizer Applied", f"{len(new_prices)} tests, floor {default_floor:g}%" + (f", category floors {floors}" if floors else "") + (f", rounded up to ${price_point:.0f}" if price_point else "")
+                       + (f", max +{max_increase:g}%" if max_increase is not None else "") + (f", max +${max_amount:.2f}" if max_amount is not None else ""))
+            st.success(f"Updated {len(new_prices)} tests!")
+            st.rerun()
+
+
+@timed()
+def render_cost_model():
+    st.subheader("Cost Model")
+    model = current_lab().cost_model
+    params, overrides = st.session_state.get('cost_params', (BASELINE, {}))
+    scoped = next(iter(overrides.items()), None)
+    current = scoped[1] if scoped else params
+    
+    c1, c2, c3, c4 = st.columns(4)
+    groups = ["All method groups"] + model.method_groups.tolist()
+    scope = c1.selectbox("Apply To", groups, index=groups.index(scoped[0]) if scoped else 0)
+    labor = c2.number_input("Labor Rate Change (%)", value=round((current.labor_factor - 1) * 100, 2), min_value=-50.0, max_value=200.0, step=1.0)
+    qc = c3.number_input("QC Overhead (%)", value=None if current.qc_rate is None else current.qc_rate * 100, min_value=0.0, step=1.0, placeholder="Per test")
+    facility = c4.number_input("Facility Overhead (%)", value=None if current.facility_rate is None else current.facility_rate * 100, min_value=0.0, step=1.0, placeholder="Per test")
+    
+    new = CostParameters(1 + labor / 100, None if qc is None else qc / 100, None if facility is None else facility / 100)
+    new_params, new_overrides = (new, {}) if scope == groups[0] else (BASELINE, {scope: new})
+    prices = st.session_state.analytes['price'].to_numpy()
+    impact = model.sweep([(new_params, new_overrides)], prices=prices)
+    st.dataframe(impact[['group', 'tests', 'avg_cost', 'avg_margin', 'margin_change']].rename(columns={'group': 'Category', 'tests': 'Tests', 'avg_cost': 'Avg Cost', 'avg_margin': 'Avg Margin %', 'margin_change': 'Margin Change'}).round(2), hide_index=True)
+    
+    b1, b2 = st.columns(2)
+    if b1.button("⚙️ Apply Cost Model", type="primary"):
+        set_cost_model(new_params, new_overrides)
+        log_action("Cost Model Updated", f"{scope}: labor {labor:+.1f}%, QC {'per test' if qc is None else f'{qc:.1f}%'}, facility {'per test' if facility is None else f'{facility:.1f}%'}")
+        st.rerun()
+    if 'cost_base' in st.session_state and b2.button("↩️ Reset Cost Model"):
+        set_cost_model(BASELINE)
+        log_action("Cost Model Updated", "Reset to catalog costs")
+        st.rerun()
+    
+    with st.expander("Labor sensitivity by category"):
+        steps = [-10, -5, 0, 5, 10]
+        sweep = model.sweep(sensitivity_grid([1 + s / 100 for s in steps]), prices=prices)
+        sweep['labor'] = (sweep['labor_factor'] * 100 - 100).round().astype(int).map(lambda s: f"{s:+d}%")
+        grid = sweep.pivot(index='group', columns='labor', values='margin_change')[[f"{s:+d}%" for s in steps]]
+        st.caption("Change in average margin (points) against catalog costs")
+        st.dataframe(grid.round(2), use_container_width=True)
+
+
+def current_price_book():
+    return PriceBook.from_overlay("Current session", st.session_state.price_overlay, lab=st.session_state.lab)
+
+def warn_missing(diff):
+    missing = diff.attrs.get('missing', ())
+    if len(missing):
+        st.warning(f"⚠️ {len(missing)} test id(s) in this price book are not in the {st.session_state.lab} catalog and were skipped: {missing[:10]}")
+
+
+@timed()
+def render_price_books():
+    store = get_pricebook_store()
+    lab = st.session_state.lab
+    
+    st.subheader("Save Snapshot")
+    c1, c2 = st.columns(2)
+    name = c1.text_input("Price Book Name", value=f"Price book {date.today().isoformat()}")
+    note = c2.text_input("Note")
+    if st.button("📸 Save Snapshot"):
+        try:
+            store.save(PriceBook.from_overlay(name, st.session_state.price_overlay, note, lab))
+            log_action("Price Book Saved", f"{name} ({lab}): {len(st.session_state.price_overlay)} edited prices")
+            st.success(f"Saved '{name}'")
+        except ValueError as e:
+            st.error(f"Error: {e}")
+    
+    saved = store.list(lab)
+    if not saved:
+        st.info(f"No saved price books for {lab} yet")
+        return
+    st.dataframe(pd.DataFrame(saved, columns=['Name', 'Created', 'Edited Prices', 'Note']), hide_index=True)
+    
+    st.subheader("Compare")
+    labels = ["Base catalog", "Current session"] + [b[0] for b in saved]
+    c1, c2 = st.columns(2)
+    old_label = c1.selectbox("From", labels, index=2)
+    new_label = c2.selectbox("To", labels, index=1)
+    
+    def book_for(label):
+        if label == "Base catalog":
+            return PriceBook(label, [], [])
+        if label == "Current session":
+            return current_price_book()
+        return store.load(label, lab)
+    
+    diff = diff_books(book_for(old_label), book_for(new_label), session_base())
+    warn_missing(diff)
+    st.caption(f"{len(diff)} prices differ")
+    st.dataframe(diff.round(2), hide_index=True)
+    
+    st.subheader("Restore")
+    restore = st.selectbox("Restore session prices from", [b[0] for b in saved])
+    if st.button("⏪ Restore Price Book"):
+        changes = diff_books(current_price_book(), store.load(restore, lab), session_base())
+        warn_missing(changes)
+        new_prices = dict(zip(changes['id'].tolist(), changes['new_price'].tolist()))
+        if set_prices(new_prices):
+            log_action("Price Book Restored", f"{restore}: {len(new_prices)} prices changed")
+            st.success(f"Restored '{restore}'")
+            st.rerun()
+
+
+QUOTE_PAGE_SIZE = 20
+QUOTE_ITEM_COLUMNS = ['description', 'method', 'qty', 'price', 'tat', 'total']
+
+def init_quote_cart():
+    if 'quote_cart' not in st.session_state:
+        st.session_state.quote_cart = {}
+        st.session_state.cart_rev = 0
+
+def _cart_add(test_id):
+    st.session_state.quote_cart[test_id] = 1
+    st.session_state.cart_rev += 1
+
+def _cart_remove(test_id):
+    st.session_state.quote_cart.pop(test_id, None)
+    st.session_state.pop(f"cart_qty_{test_id}", None)
+    st.session_state.cart_rev += 1
+
+def _cart_set_qty(test_id):
+    st.session_state.quote_cart[test_id] = st.session_state[f"cart_qty_{test_id}"]
+    st.session_state.cart_rev += 1
+
+def cart_rows():
+    """(test ids, catalog rows) of the cart's tests, leaving out any the lab's catalog does not have"""
+    ids = list(st.session_state.quote_cart)
+    pos = current_lab().positions(ids)
+    return [i for i, p in zip(ids, pos) if p >= 0], st.session_state.analytes.iloc[pos[pos >= 0]]
+
+def cart_items():
+    """Quote lines for the cart at the selected TAT, rebuilt only when the cart, the catalog or the TAT changes"""
+    df = st.session_state.analytes
+    tat = st.session_state.get('quote_tat', DEFAULT_TAT)
+    cached = st.session_state.get('cart_cache')
+    if cached and cached[0] == (st.session_state.cart_rev, tat) and cached[1] is df:
+        return cached[2]
+    
+    cart = st.session_state.quote_cart
+    ids, rows = cart_rows()
+    tats = line_tats(rows['tat'].to_numpy(), tat)
+    priced = price_tat(rows['price'].to_numpy(), np.fromiter((cart[i] for i in ids), dtype=float, count=len(ids)), tats)
+    items = [{'test_id': i, 'description': n, 'method': m, 'qty': cart[i], 'base_price': b, 'base_total': bt, 'price': p, 'tat': t, 'total': total}
+             for i, n, m, b, bt, p, t, total in zip(ids, rows['name'], rows['method'], rows['price'], (priced.total - priced.surcharge).tolist(),
+                                                    priced.unit_price.tolist(), tats.tolist(), priced.total.tolist())]
+    st.session_state.cart_cache = ((st.session_state.cart_rev, tat), df, items)
+    return items
+
+@timed()
+def render_quote_builder():
+    """Searchable, paged test picker - widgets exist only for the visible page"""
+    index = current_lab().search
+    cart = st.session_state.quote_cart
+    
+    c1, c2 = st.columns([2, 1])
+    search = c1.text_input("Search Tests", key="qb_search", placeholder="Name, method or method number")
+    cat = c2.selectbox("Category", ["All"] + index.values('category'), key="qb_cat")
+    positions = index.search(search, category=None if cat == "All" else cat)
+    
+    pages = max(1, -(-len(positions) // QUOTE_PAGE_SIZE))
+    if st.session_state.get('qb_page', 1) > pages:
+        st.session_state.qb_page = 1
+    page = st.number_input(f"Page (of {pages})", 1, pages, 1, key="qb_page") if pages > 1 else 1
+    st.caption(f"{len(positions)} tests")
+    
+    visible = st.session_state.analytes.iloc[positions[(page - 1) * QUOTE_PAGE_SIZE:page * QUOTE_PAGE_SIZE]]
+    for tid, name, method, price in zip(visible['id'].tolist(), visible['name'], visible['method'], visible['price']):
+        cols = st.columns([4, 1])
+        cols[0].markdown(f"{name} ({method}) - ${price:.2f}")
+        if tid in cart:
+            cols[1].button("✓ Added", key=f"qb_rm_{tid}", on_click=_cart_remove, args=(tid,), use_container_width=True)
+        else:
+            cols[1].button("➕ Add", key=f"qb_add_{tid}", on_click=_cart_add, args=(tid,), use_container_width=True)
+
+@timed()
+def render_cart():
+    st.markdown("### 🛒 Selected Tests")
+    cart = st.session_state.quote_cart
+    if not cart:
+        st.caption("No tests added yet")
+        return
+    for tid, item in zip(list(cart), cart_items()):
+        cols = st.columns([3, 1, 1])
+        cols[0].markdown(f"{item['description']} ({item['method']})")
+        cols[1].number_input("Qty", 1, 100, cart[tid], key=f"cart_qty_{tid}", on_change=_cart_set_qty, args=(tid,), label_visibility="collapsed")
+        cols[2].button("✕", key=f"cart_rm_{tid}", on_click=_cart_remove, args=(tid,))
+
+
+def render_metals_panel_picker(method, icon, select_key, qty_key):
+    """Element multiselect + qty for one metals panel; returns (elements, MetalsPrice or None)"""
+    panel = METALS_PANELS[method]
+    st.markdown(f"**{icon} {panel['label']}** ({schedule_label(method)})")
+    sel = st.multiselect(f"Select {panel['water_type']} Metals", panel['elements'], key=select_key)
+    if not sel:
+        return sel, None
+    qty = st.number_input(f"Qty ({panel['water_type']})", 1, 100, 1, key=qty_key)
+    price = price_metals_panel(method, frozenset(sel), qty)
+    st.success(f"**{len(sel)} metals = ${price.unit_price:.2f}**")
+    return sel, price
+
+
+@timed()
 def render_quote_generator():
+    init_quote_cart()
     st.title("📝 Quote Generator")
     
     # Customer Info
@@ -388,41 +629,24 @@ def render_quote_generator():
     account = c2.text_input("Account Name", value="NA")
     prepared = c3.text_input("Prepared By", value="KELP Lab")
     
-    c4, c5 = st.columns(2)
+    c4, c5, c6, c7 = st.columns(4)
     quote_date = c4.date_input("Quote Date", value=date.today())
     discount = c5.number_input("Discount (%)", 0.0, 50.0, 0.0, 0.5)
+    tat = c6.selectbox("Turnaround", TAT_OPTIONS, key="quote_tat")
+    batches = c7.number_input("Sample Batches", 1, 50, 1, key="quote_batches", help="The weekend fee is charged once per batch")
     
     st.markdown("---")
     
     # METALS PANEL SECTION
     st.subheader("🔬 ICP-MS Metals Panel")
     
-    potable_metals = ["Aluminum", "Antimony", "Arsenic", "Barium", "Beryllium", "Cadmium", "Chromium", "Cobalt", "Copper", "Lead", "Manganese", "Mercury", "Molybdenum", "Nickel", "Selenium", "Silver", "Thallium", "Thorium", "Uranium", "Vanadium", "Zinc"]
-    nonpotable_metals = ["Aluminum", "Antimony", "Arsenic", "Barium", "Beryllium", "Boron", "Cadmium", "Calcium", "Chromium", "Cobalt", "Copper", "Iron", "Lead", "Magnesium", "Manganese", "Mercury", "Nickel", "Potassium", "Selenium", "Silicon", "Silver", "Sodium", "Thallium", "Vanadium", "Uranium", "Zinc"]
-    
     mc1, mc2 = st.columns(2)
     
     with mc1:
-        st.markdown("**🚰 Potable Water - EPA 200.8** ($70 first + $12/additional)")
-        sel_potable = st.multiselect("Select Potable Metals", potable_metals, key="qpm")
-        if sel_potable:
-            p_price = calculate_metals_price(len(sel_potable), "Potable")
-            st.success(f"**{len(sel_potable)} metals = ${p_price:.2f}**")
-            potable_qty = st.number_input("Qty (Potable)", 1, 100, 1, key="pqty")
-        else:
-            p_price = 0
-            potable_qty = 0
+        sel_potable, potable = render_metals_panel_picker("EPA 200.8", "🚰", "qpm", "pqty")
     
     with mc2:
-        st.markdown("**🏭 Non-Potable - EPA 6020B** ($130 first + $45/additional)")
-        sel_np = st.multiselect("Select Non-Potable Metals", nonpotable_metals, key="qnpm")
-        if sel_np:
-            np_price = calculate_metals_price(len(sel_np), "Non-Potable")
-            st.success(f"**{len(sel_np)} metals = ${np_price:.2f}**")
-            np_qty = st.number_input("Qty (Non-Potable)", 1, 100, 1, key="npqty")
-        else:
-            np_price = 0
-            np_qty = 0
+        sel_np, nonpotable = render_metals_panel_picker("EPA 6020B", "🏭", "qnpm", "npqty")
     
     st.markdown("---")
     st.subheader("🧪 Other Tests")
@@ -431,53 +655,58 @@ def render_quote_generator():
     selected_items = []
     
     # Add metals if selected
-    if sel_potable and potable_qty > 0:
-        selected_items.append({'description': f"Individual Element by ICP/ICP-MS ({', '.join(sel_potable)})", 'method': 'EPA 200.8', 'qty': potable_qty, 'price': p_price, 'tat': 'Standard (5-7 Day)', 'total': p_price * potable_qty})
-    
-    if sel_np and np_qty > 0:
-        selected_items.append({'description': f"Individual Element by ICP/ICP-MS ({', '.join(sel_np)})", 'method': 'EPA 6020B', 'qty': np_qty, 'price': np_price, 'tat': 'Standard (5-7 Day)', 'total': np_price * np_qty})
-    
-    # Other tests
-    df = st.session_state.analytes[st.session_state.analytes['active']]
+    for sel, panel in [(sel_potable, potable), (sel_np, nonpotable)]:
+        if panel:
+            selected_items.append({'description': f"Individual Element by ICP/ICP-MS ({', '.join(sel)})", 'method': panel.method, 'elements': list(sel), 'qty': panel.qty, 'price': panel.unit_price, 'tat': DEFAULT_TAT, 'total': panel.total})
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        for cat in df['category'].unique():
-            cat_df = df[df['category'] == cat]
-            with st.expander(f"**{cat}** ({len(cat_df)} tests)"):
-                for _, test in cat_df.iterrows():
-                    cols = st.columns([3, 1])
-                    with cols[0]:
-                        sel = st.checkbox(f"{test['name']} ({test['method']}) - ${test['price']:.2f}", key=f"q_{test['id']}")
-                    with cols[1]:
-                        qty = st.number_input("Qty", 1, 100, 1, key=f"qty_{test['id']}", label_visibility="collapsed")
-                    
-                    if sel:
-                        selected_items.append({'description': test['name'], 'method': test['method'], 'qty': qty, 'price': test['price'], 'tat': test.get('tat', 'Standard (5-7 Day)'), 'total': test['price'] * qty})
+        render_quote_builder()
+    
+    selected_items = apply_tat(selected_items, tat, batches=0) + cart_items()
+    fee = batch_fee_item(tat, batches) if any(i['tat'] != EXEMPT_TAT for i in selected_items) else None
+    if fee:
+        selected_items.append(fee)
     
     with col2:
+        render_cart()
+        st.markdown("---")
         st.markdown("### 📋 Quote Summary")
         
         if selected_items:
             subtotal = sum(i['total'] for i in selected_items)
-            disc_amt = subtotal * (discount / 100)
-            total = subtotal - disc_amt
+            totals = quote_totals(subtotal, discount)
             
             st.metric("Items", len(selected_items))
+            surcharge = subtotal - sum(i.get('base_total', i['total']) for i in selected_items if not i.get('batch_fee'))
+            if surcharge > 0:
+                st.metric(f"{tat} Surcharge", f"${surcharge:,.2f}")
             st.metric("Subtotal", f"${subtotal:,.2f}")
             if discount > 0:
-                st.metric("Discount", f"-${disc_amt:,.2f}")
-            st.metric("**TOTAL**", f"${total:,.2f}")
+                st.metric("Discount", f"-${totals['discount_amount']:,.2f}")
+            st.metric("**TOTAL**", f"${totals['total']:,.2f}")
             
             st.markdown("---")
             
-            if st.button("📄 Generate PDF", type="primary", use_container_width=True):
-                qnum = f"{datetime.now().strftime('%Y%m%d')}-{np.random.randint(100,999)}"
-                qdata = {'quote_number': qnum, 'date': quote_date.strftime('%m/%d/%Y'), 'contact_name': contact, 'account_name': account, 'prepared_by': prepared, 'items': selected_items, 'subtotal': subtotal, 'discount_percent': discount}
-                
+            qdata = {'date': quote_date.strftime('%m/%d/%Y'), 'lab': st.session_state.lab, 'contact_name': contact, 'account_name': account, 'prepared_by': prepared, 'items': selected_items, 'subtotal': subtotal, 'discount_percent': discount}
+            # Generating the same content again reuses its number and its cached PDF
+            content = quote_key(qdata)
+            last = st.session_state.get('last_quote')
+            
+            if st.button("📄 Generate PDF", type="primary", use_container_width=True) and (last is None or last['content'] != content):
+                qdata['catalog_version'] = catalog_version(st.session_state.price_overlay, st.session_state.get('cost_params'))
                 try:
-                    pdf = generate_pdf_quote(qdata)
+                    qnum = get_quote_store().save(qdata)
+                    log_action("Quote Saved", f"{qnum}: {account} - ${totals['total']:,.2f}")
+                    st.session_state.last_quote = last = {'content': content, 'number': qnum}
+                except Exception as e:
+                    st.error(f"Error: {e}")
+            
+            if last is not None and last['content'] == content:
+                qnum = qdata['quote_number'] = last['number']
+                try:
+                    pdf = get_pdf_cache().get(qdata)
                     st.success(f"✅ Quote {qnum} generated!")
                     st.download_button("📥 Download PDF", pdf, f"KELP_Quote_{qnum}.pdf", "application/pdf", use_container_width=True)
                 except Exception as e:
@@ -488,56 +717,183 @@ def render_quote_generator():
     if selected_items:
         st.markdown("---")
         st.subheader("📋 Selected Items")
-        items_df = pd.DataFrame(selected_items)
+        items_df = pd.DataFrame(selected_items, columns=QUOTE_ITEM_COLUMNS)
         st.dataframe(items_df, use_container_width=True, hide_index=True)
+        if len(get_registry().labs()) > 1:
+            render_site_comparison()
+
+
+@timed()
+def render_site_comparison():
+    """Where the cart's catalog tests are cheapest across lab sites, at each site's shared prices"""
+    cart = st.session_state.quote_cart
+    if not cart or not st.toggle("🏢 Compare lab sites"):
+        return
+    ids, rows = cart_rows()
+    keys = list(zip(rows['name'].astype(str), rows['water_type'].astype(str)))
+    registry = get_registry()
+    sites = registry.cheapest_sites(keys, [cart[i] for i in ids])
+    st.dataframe(sites, use_container_width=True, hide_index=True)
+    st.caption("Sites offering every test come first. Saved price edits of every site are included; cost model what-ifs and metals panels are not.")
+    per_test = registry.cheapest_per_test(keys)
+    st.dataframe(per_test, use_container_width=True, hide_index=True)
+
 
+QUOTE_HISTORY_PAGE_SIZE = 25
 
+@timed()
+def render_quote_history():
+    st.title("📂 Quote History")
+    store = get_quote_store()
+    
+    f1, f2, f3, f4 = st.columns(4)
+    account = f1.text_input("Account", placeholder="Starts with...")
+    contact = f2.text_input("Contact", placeholder="Starts with...")
+    test_id = f3.number_input("Test ID", min_value=0, value=0, step=1, help="0 shows all tests")
+    since = f4.date_input("Quoted Since", value=None)
+    # Test ids and prices are per site, so history shows (and requotes) the session's lab only
+    filters = {'account': account.strip() or None, 'contact': contact.strip() or None, 'test_id': test_id or None, 'since': since, 'lab': st.session_state.lab}
+    
+    total = store.count(**filters)
+    if total == 0:
+        st.info(f"No saved {st.session_state.lab} quotes match")
+        return
+    pages = -(-total // QUOTE_HISTORY_PAGE_SIZE)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+    rows = store.search(**filters, limit=QUOTE_HISTORY_PAGE_SIZE, offset=(page - 1) * QUOTE_HISTORY_PAGE_SIZE)
+    st.caption(f"{total:,} {st.session_state.lab} quotes")
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    number = st.selectbox("Open Quote", [r['quote_number'] for r in rows])
+    quote = store.get(number)
+    st.markdown(f"**{quote['quote_number']}** · {quote['account_name']} · {quote['contact_name'] or '-'} · {quote['date']} · Total **${quote['total']:,.2f}**")
+    st.download_button("📥 Download PDF", lambda: get_pdf_cache().get(quote), f"KELP_Quote_{number}.pdf", "application/pdf")
+    
+    requote = store.requote(number, st.session_state.analytes)
+    lines = pd.DataFrame(requote['items'])
+    lines['change'] = lines['price'] - lines['previous_price']
+    new_total = quote_totals(requote['subtotal'], requote['discount_percent'])['total']
+    st.dataframe(lines[['description', 'method', 'qty', 'previous_price', 'price', 'change', 'total']].rename(columns={'previous_price': 'quoted_price', 'price': 'current_price'}).round(2), use_container_width=True, hide_index=True)
+    st.caption(f"At current prices: ${new_total:,.2f} ({new_total - quote['total']:+,.2f})")
+    
+    if st.button("🔁 Requote with Current Prices", type="primary"):
+        requote['catalog_version'] = catalog_version(st.session_state.price_overlay, st.session_state.get('cost_params'))
+        qnum = requote['quote_number'] = store.save(requote)
+        log_action("Quote Saved", f"{qnum}: requote of {number} - ${new_total:,.2f}")
+        st.success(f"✅ Quote {qnum} saved")
+        st.download_button("📥 Download PDF", get_pdf_cache().get(requote), f"KELP_Quote_{qnum}.pdf", "application/pdf", key="requote_pdf")
+
+
+@timed()
 def render_metals_calculator():
     st.title("🧮 Metals Calculator")
     
     c1, c2 = st.columns(2)
     
-    with c1:
-        st.subheader("🚰 Potable - EPA 200.8")
-        st.caption("$70 first + $12 each additional")
-        metals = ["Aluminum", "Antimony", "Arsenic", "Barium", "Beryllium", "Cadmium", "Chromium", "Cobalt", "Copper", "Lead", "Manganese", "Mercury", "Molybdenum", "Nickel", "Selenium", "Silver", "Thallium", "Thorium", "Uranium", "Vanadium", "Zinc"]
-        sel = st.multiselect("Select Metals", metals, key="calc_p")
-        price = calculate_metals_price(len(sel), "Potable")
-        st.metric("Selected", len(sel))
-        st.metric("Price", f"${price:.2f}")
-    
-    with c2:
-        st.subheader("🏭 Non-Potable - EPA 6020B")
-        st.caption("$130 first + $45 each additional")
-        metals_np = ["Aluminum", "Antimony", "Arsenic", "Barium", "Beryllium", "Boron", "Cadmium", "Calcium", "Chromium", "Cobalt", "Copper", "Iron", "Lead", "Magnesium", "Manganese", "Mercury", "Nickel", "Potassium", "Selenium", "Silicon", "Silver", "Sodium", "Thallium", "Vanadium", "Uranium", "Zinc"]
-        sel_np = st.multiselect("Select Metals", metals_np, key="calc_np")
-        price_np = calculate_metals_price(len(sel_np), "Non-Potable")
-        st.metric("Selected", len(sel_np))
-        st.metric("Price", f"${price_np:.2f}")
+    for col, (method, icon, key) in zip([c1, c2], [("EPA 200.8", "🚰 Potable", "calc_p"), ("EPA 6020B", "🏭 Non-Potable", "calc_np")]):
+        with col:
+            st.subheader(f"{icon} - {method}")
+            st.caption(schedule_label(method))
+            sel = st.multiselect("Select Metals", METALS_PANELS[method]['elements'], key=key)
+            price = price_metals_panel(method, frozenset(sel)).unit_price if sel else 0.0
+            st.metric("Selected", len(sel))
+            st.metric("Price", f"${price:.2f}")
+
+
+def catalog_version(overlay, cost_params):
+    """Changes whenever a session's view of the catalog does"""
+    edits = hashlib.sha256(repr((sorted(overlay.items()), cost_params)).encode()).hexdigest()[:16]
+    return f"{current_lab().catalog.attrs['version']}-{edits}"
 
 
+@timed()
+def render_export():
+    fmt = st.selectbox("Export Format", list(EXPORT_FORMATS))
+    include_audit = st.checkbox("Include audit log")
+    include_quotes = st.checkbox("Include saved quotes")
+    df, overlay, cost_params = st.session_state.analytes, dict(st.session_state.price_overlay), st.session_state.get('cost_params')
+    
+    def build():
+        # Runs only when the button is clicked; cached exports are served from disk
+        sections = [frame_section("catalog", df, catalog_version(overlay, cost_params))]
+        if include_audit:
+            sections.append(audit_section(get_audit_store()))
+        if include_quotes:
+            sections += quote_sections(get_quote_store())
+        return get_export_cache().get(sections, fmt).read_bytes()
+    
+    file_name, mime = export_name(fmt, 1 + include_audit + 2 * include_quotes, "kelp_catalog")
+    st.download_button(f"📥 Export Catalog ({fmt})", build, file_name, mime, use_container_width=True)
+
+
+def render_lab_sites():
+    registry = get_registry()
+    labs = registry.labs()
+    stats = registry.stats()
+    st.dataframe(pd.DataFrame({'lab': labs, 'in_memory': [l == DEFAULT_LAB or l in stats['loaded'] for l in labs], 'current': [l == st.session_state.lab for l in labs]}),
+                 use_container_width=True, hide_index=True)
+    st.caption(f"{len(stats['loaded'])} sites in memory besides {DEFAULT_LAB} ({stats['loaded_bytes'] / 2**20:.1f} MiB) · "
+               f"{stats['hits']:,} warm loads · {stats['loads']:,} cold loads · {stats['evictions']:,} evictions")
+    
+    c1, c2 = st.columns([1, 2])
+    code = c1.text_input("Site Code", placeholder="e.g. SJ-01")
+    upload = c2.file_uploader("Site Catalog (CSV or Excel with the catalog export's columns)", type=['csv', 'xlsx'])
+    if st.button("➕ Add Site", disabled=not (code and upload)):
+        try:
+            df = read_lab_file(upload)
+            registry.add(code.strip(), df)
+            log_action("Lab Site Added", f"{code.strip()}: {len(df):,} tests")
+            st.success(f"✅ Site {code.strip()} added")
+            st.rerun()
+        except ValueError as e:
+            st.error(f"Error: {e}")
+
+
+@timed()
 def render_settings():
     st.title("⚙️ Settings")
     
-    tab1, tab2, tab3 = st.tabs(["📊 Export", "📋 Audit Log", "ℹ️ About"])
+    tab1, tab2, tab_labs, tab3, tab4 = st.tabs(["📊 Export", "📋 Audit Log", "🏢 Lab Sites", "⏱️ Performance", "ℹ️ About"])
     
     with tab1:
         c1, c2 = st.columns(2)
         with c1:
-            st.download_button("📥 Export Catalog (CSV)", st.session_state.analytes.to_csv(index=False), "kelp_catalog.csv", "text/csv", use_container_width=True)
+            render_export()
         with c2:
-            if st.button("🔄 Reset All Data", use_container_width=True):
-                st.session_state.analytes = get_all_analytes()
+            if st.button("🔄 Reset All Data", use_container_width=True) and reset_prices():
+                log_action("Prices Reset", f"{st.session_state.lab}: every price back to the catalog")
                 st.success("Data reset!")
                 st.rerun()
     
     with tab2:
-        if 'audit_log' in st.session_state and len(st.session_state.audit_log) > 0:
-            st.dataframe(st.session_state.audit_log.sort_values('timestamp', ascending=False), use_container_width=True, hide_index=True)
+        store = get_audit_store()
+        f1, f2, f3 = st.columns(3)
+        action = f1.selectbox("Action", ["All"] + store.actions())
+        test_id = f2.number_input("Test ID", min_value=0, value=0, step=1, help="0 shows all tests")
+        page_size = f3.selectbox("Per Page", [25, 50, 100, 250], index=1)
+        filters = {'action': None if action == "All" else action, 'test_id': test_id or None}
+        total = store.count(**filters)
+        
+        if total > 0:
+            pages = -(-total // page_size)
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+            st.caption(f"{total:,} entries")
+            st.dataframe(pd.DataFrame(store.page(page - 1, page_size, **filters)), use_container_width=True, hide_index=True)
         else:
             st.info("No audit entries yet")
     
+    with tab_labs:
+        render_lab_sites()
+    
     with tab3:
+        profiler = get_profiler()
+        st.caption(f"Profiling: {', '.join(sorted(profiler.modes))} → {profiler.log_path}" if profiler.modes else "Timers only; set KELP_PROFILE=timing, cprofile or tracemalloc to write a profile log")
+        reruns = profiler.rerun_counts()
+        st.markdown(f"**Reruns:** {sum(reruns.values()):,} · " + " · ".join(f"{p} {n:,}" for p, n in sorted(reruns.items(), key=lambda r: -r[1])))
+        st.dataframe(profiler.stats().round(2), use_container_width=True, hide_index=True)
+    
+    with tab4:
         st.markdown("""
         ### KELP Price Management v5.0
         - ✅ 84 complete tests from CA ELAP 2025
@@ -547,22 +903,37 @@ def render_settings():
         - ✅ Full Cost Breakdown
         
         **Metals Pricing:**
-        - EPA 200.8 (Potable): $70 + $12/metal
-        - EPA 6020B (Non-Potable): $130 + $45/metal
         """)
+        for method, panel in METALS_PANELS.items():
+            st.markdown(f"- {method} ({panel['water_type']}): {schedule_label(method)}")
+        
+        pdf_stats = get_pdf_cache().stats()
+        st.markdown("**Quote PDF Cache:**")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Requests", f"{pdf_stats['requests']:,}")
+        c2.metric("Hit Rate", f"{pdf_stats['hit_rate']:.0%}")
+        c3.metric("Renders", f"{pdf_stats['misses']:,}")
+        c4.metric("Avg Render", f"{pdf_stats['avg_render_ms']:.0f} ms")
+        st.caption(f"{pdf_stats['memory_hits']:,} memory hits · {pdf_stats['disk_hits']:,} disk hits · {pdf_stats['memory_entries']} PDFs ({pdf_stats['memory_bytes'] / 2**20:.1f} MiB) in memory")
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
 def main():
-    init_session_state()
-    page = render_sidebar()
-    
+    with get_profiler().rerun() as run:
+        setup_page()
+        init_session_state()
+        run['page'] = page = render_sidebar()
+        render_page(page)
+
+
+def render_page(page):
     if page == "Dashboard": render_dashboard()
     elif page == "Test Catalog": render_catalog()
     elif page == "Price Editor": render_price_editor()
     elif page == "Quote Generator": render_quote_generator()
+    elif page == "Quote History": render_quote_history()
     elif page == "Metals Calculator": render_metals_calculator()
     elif page == "Settings": render_settings()
     else: render_dashboard()
@@ -0,0 +1,162 @@
+"""
+KELP Laboratory Services - Audit Log Store
+Append-only SQLite log shared by every session. Appends are buffered in
+memory and committed in batches, so bulk edits cost O(1) per entry. A
+background timer commits a partial batch within flush_interval seconds, and
+each committed batch is fsynced.
+"""
+
+import atexit
+import functools
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from kelp_config import data_path
+
+COLUMNS = ['timestamp', 'action', 'test_id', 'details', 'lab']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_log (
+    seq       INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    action    TEXT NOT NULL,
+    test_id   INTEGER,
+    details   TEXT,
+    lab       TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_audit_timestamp ON audit_log (timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_action ON audit_log (action, timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_test ON audit_log (test_id, timestamp);
+CREATE TRIGGER IF NOT EXISTS audit_no_update BEFORE UPDATE ON audit_log
+    BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS audit_no_delete BEFORE DELETE ON audit_log
+    BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+"""
+
+
+class AuditStore:
+    """Append-only audit log with batched commits and indexed, paged queries"""
+
+    def __init__(self, path, batch_size=500, flush_interval=1.0):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._timer = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: each committed batch is on disk before append returns, not just at the next checkpoint
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        """Bring a log from before entries had a lab up to SCHEMA"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {r[1] for r in self._conn.execute("PRAGMA table_info(audit_log)")}
+            if columns and 'lab' not in columns:
+                # Older entries keep a NULL lab: they may predate sites or come from any of them
+                self._conn.execute("ALTER TABLE audit_log ADD COLUMN lab TEXT")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def append(self, action, details, test_id=None, timestamp=None, lab=None):
+        self.append_many([(timestamp or datetime.now().isoformat(), action, test_id, details, lab)])
+
+    def append_many(self, entries):
+        """Queue (timestamp, action, test_id, details, lab) tuples; commits once the batch fills or flush_interval passes"""
+        with self._lock:
+            self._pending.extend(entries)
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+            elif self._pending and self._timer is None:
+                # No further append may come to commit these, so a timer does
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            with self._conn:
+                self._conn.executemany("INSERT INTO audit_log (timestamp, action, test_id, details, lab) VALUES (?, ?, ?, ?, ?)", self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def _where(self, action, test_id, since):
+        clauses, params = [], []
+        if action:
+            clauses.append("action = ?")
+            params.append(action)
+        if test_id is not None:
+            clauses.append("test_id = ?")
+            params.append(int(test_id))
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, action=None, test_id=None, since=None):
+        where, params = self._where(action, test_id, since)
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(f"SELECT COUNT(*) FROM audit_log{where}", params).fetchone()[0]
+
+    def page(self, page=0, page_size=50, action=None, test_id=None, since=None):
+        """Newest-first slice of the log as a list of dicts"""
+        where, params = self._where(action, test_id, since)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM audit_log{where} ORDER BY timestamp DESC, seq DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(sql, params + [page_size, page * page_size]).fetchall()
+        return [dict(zip(COLUMNS, r)) for r in rows]
+
+    def iter_batches(self, batch_size=5000):
+        """Whole log oldest-first in lists of dicts, paged by seq so each batch is an index seek"""
+        sql = f"SELECT seq, {', '.join(COLUMNS)} FROM audit_log WHERE seq > ? ORDER BY seq LIMIT ?"
+        last = 0
+        while True:
+            with self._lock:
+                self._flush_locked()
+                rows = self._conn.execute(sql, (last, batch_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [dict(zip(COLUMNS, r[1:])) for r in rows]
+
+    def last_seq(self):
+        """Sequence number of the newest entry; changes whenever the log grows"""
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM audit_log").fetchone()[0]
+
+    def actions(self):
+        with self._lock:
+            self._flush_locked()
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT action FROM audit_log ORDER BY action")]
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+
+@functools.lru_cache(maxsize=1)
+def get_audit_store():
+    """Process-wide audit store, flushed on interpreter exit"""
+    store = AuditStore(data_path("audit.sqlite3"))
+    atexit.register(store.flush)
+    return store
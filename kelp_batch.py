@@ -0,0 +1,171 @@
+"""
+KELP Laboratory Services - Batch Quote Generation
+Headless entry point for contract renewals: reads a CSV/Excel sheet of quote
+specs, saves the quotes to the quote repository (which numbers them), renders
+the PDFs in a pre-warmed process pool and streams them into a ZIP together
+with a per-quote timing report.
+
+Spec sheet: one row per line item.
+    quote_ref, test_id, qty                       (required)
+    account_name, contact_name, prepared_by,
+    date, discount_percent                        (optional, first row per quote wins)
+
+Usage:  python -m kelp_batch renewals.xlsx -o renewals.zip --workers 4 [--lab SITE]
+"""
+
+import argparse
+import csv
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+
+import pandas as pd
+
+from kelp_catalog import apply_price_overlay
+from kelp_config import DEFAULT_LAB
+from kelp_labs import get_registry
+from kelp_pdf import generate_pdf_quote, get_pdf_template
+from kelp_core import quote_totals
+from kelp_prices import get_price_store
+from kelp_quotes import get_quote_store
+
+REQUIRED_COLUMNS = ['quote_ref', 'test_id', 'qty']
+TIMING_COLUMNS = ['quote_ref', 'quote_number', 'items', 'total', 'render_ms', 'worker_pid']
+
+
+def read_quote_specs(path):
+    """Load the spec sheet, normalising column names to snake_case"""
+    path = str(path)
+    if path.lower().endswith(('.xlsx', '.xlsm', '.xls')):
+        df = pd.read_excel(path)
+    else:
+        df = pd.read_csv(path)
+    df.columns = [str(c).strip().lower().replace(' ', '_') for c in df.columns]
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Quote spec is missing columns: {', '.join(missing)}")
+    return df
+
+
+def build_quotes(specs, catalog=None, lab=DEFAULT_LAB):
+    """Group spec rows into quote_data dicts priced from the catalog (default: lab's
+    catalog with the shared price edits applied, as the app shows it).
+
+    Quotes have no quote_number until save_quotes gives them one.
+    """
+    if catalog is None:
+        catalog = apply_price_overlay(get_registry().get(lab).catalog, get_price_store().snapshot(lab)[0])
+    catalog = catalog.set_index('id')
+    unknown = sorted(set(specs['test_id'].astype(int)) - set(catalog.index))
+    if unknown:
+        raise ValueError(f"Unknown test ids in quote spec: {unknown}")
+
+    quotes = []
+    for ref, rows in specs.groupby('quote_ref', sort=False):
+        head = rows.iloc[0]
+        ids = rows['test_id'].astype(int)
+        lines = catalog.loc[ids]
+        qty = rows['qty'].fillna(1).astype(int).to_numpy()
+        totals = lines['price'].to_numpy() * qty
+        items = [{'test_id': int(i), 'description': n, 'method': m, 'qty': int(q), 'price': float(p), 'tat': t, 'total': float(tot)}
+                 for i, n, m, q, p, t, tot in zip(ids, lines['name'], lines['method'], qty, lines['price'], lines['tat'], totals)]
+        quote_date = pd.to_datetime(head['date']).date() if pd.notna(head.get('date')) else date.today()
+        quotes.append({
+            'quote_ref': str(ref),
+            'lab': lab,
+            'date': quote_date.strftime('%m/%d/%Y'),
+            'contact_name': _text(head.get('contact_name'), ''),
+            'account_name': _text(head.get('account_name'), 'NA'),
+            'prepared_by': _text(head.get('prepared_by'), 'KELP Lab'),
+            'items': items,
+            'subtotal': float(totals.sum()),
+            'discount_percent': float(head['discount_percent']) if pd.notna(head.get('discount_percent')) else 0.0,
+        })
+    return quotes
+
+
+def save_quotes(quotes, store=None):
+    """Save quotes to the quote repository in one transaction and stamp each with
+    its quote number, so batch PDFs never reuse a number and show up in history"""
+    numbers = (store or get_quote_store()).save_many(quotes)
+    for q, number in zip(quotes, numbers):
+        q['quote_number'] = number
+    return quotes
+
+
+def _text(value, default):
+    return default if value is None or pd.isna(value) else str(value)
+
+
+def _render(quote_data):
+    t0 = time.perf_counter()
+    pdf = generate_pdf_quote(quote_data)
+    return pdf, (time.perf_counter() - t0) * 1000, os.getpid()
+
+
+def render_quotes_to_zip(quotes, out, workers=None, max_in_flight=None):
+    """Render quotes in a process pool and stream each PDF into the ZIP as it finishes.
+
+    out may be a path or a binary file object. Returns the timing report rows,
+    which are also written into the archive as timing_report.csv.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    report = []
+    pending = {}
+    queue = iter(quotes)
+
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as zf, \
+            ProcessPoolExecutor(max_workers=workers, initializer=get_pdf_template) as pool:
+        def submit_next():
+            q = next(queue, None)
+            if q is not None:
+                pending[pool.submit(_render, q)] = q
+            return q is not None
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                q = pending.pop(fut)
+                pdf, ms, pid = fut.result()
+                zf.writestr(f"KELP_Quote_{q['quote_number']}.pdf", pdf)
+                total = quote_totals(q['subtotal'], q['discount_percent'])['total']
+                report.append({'quote_ref': q['quote_ref'], 'quote_number': q['quote_number'], 'items': len(q['items']), 'total': round(total, 2), 'render_ms': round(ms, 2), 'worker_pid': pid})
+                submit_next()
+
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=TIMING_COLUMNS)
+        writer.writeheader()
+        writer.writerows(report)
+        zf.writestr("timing_report.csv", buf.getvalue())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render KELP quote PDFs in bulk from a CSV/Excel spec sheet")
+    parser.add_argument("specs", help="CSV or Excel file with one row per quote line")
+    parser.add_argument("-o", "--output", default="kelp_quotes.zip", help="ZIP file to write")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--lab", default=DEFAULT_LAB, help=f"lab site whose catalog and prices to quote (default {DEFAULT_LAB})")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    quotes = save_quotes(build_quotes(read_quote_specs(args.specs), lab=args.lab))
+    report = render_quotes_to_zip(quotes, args.output, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+
+    ms = sorted(r['render_ms'] for r in report)
+    if ms:
+        print(f"{len(report)} quotes -> {args.output} in {elapsed:.2f}s "
+              f"(render p50 {ms[len(ms) // 2]:.1f} ms, max {ms[-1]:.1f} ms)")
+    else:
+        print("No quotes in spec sheet")
+
+
+if __name__ == "__main__":
+    main()
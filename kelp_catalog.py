@@ -0,0 +1,116 @@
+"""
+KELP Laboratory Services - Shared Analyte Catalog
+The base catalog is built once per process and shared read-only by every
+session; sessions keep only a small overlay of their own price edits.
+Repeated strings are categorical; on disk, money is stored as int64 cents.
+"""
+
+import functools
+import pandas as pd
+import numpy as np
+from kelp_config import catalog_file
+from kelp_pricing import compute_margins
+from kelp_data import ANALYTES, CATALOG_VERSION
+
+# ============================================================================
+# COMPLETE DATA - ALL 84 TESTS FROM CSV
+# ============================================================================
+
+def get_all_analytes():
+    """All 84 analytes from the CA ELAP 2025 Cost Calculator"""
+    return pd.DataFrame(ANALYTES)
+
+# ============================================================================
+# TYPED SCHEMA
+# ============================================================================
+
+CATEGORICAL_COLUMNS = ['category', 'method_group', 'water_type', 'tat', 'method']
+MONEY_COLUMNS = ['standards', 'consumables', 'gases_utilities', 'labor', 'depreciation', 'subtotal', 'qc_oh', 'facility_oh', 'total_cost', 'price']
+
+
+def typed_catalog(df):
+    """Categorical repeated-string columns and money snapped to whole cents"""
+    df = df.copy()
+    df['id'] = df['id'].astype('int64')
+    for c in CATEGORICAL_COLUMNS:
+        df[c] = df[c].astype('category')
+    for c in MONEY_COLUMNS:
+        df[c] = to_cents(df[c]) / 100
+    df['active'] = df['active'].astype(bool)
+    return df
+
+
+def to_cents(values):
+    """Dollar amounts as exact int64 cents"""
+    return np.round(np.asarray(values, dtype=float) * 100).astype('int64')
+
+
+def round_cents(values):
+    """Dollar amounts rounded to whole cents, kept as float (same values as to_cents / 100)"""
+    out = np.multiply(values, 100, dtype=float)
+    np.rint(out, out=out)
+    out /= 100
+    return out
+
+
+def write_catalog(df, path):
+    """Write a catalog to Parquet: int64 cents and dictionary-encoded strings"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out = typed_catalog(df)
+    for c in MONEY_COLUMNS:
+        out[c] = to_cents(out[c])
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'kelp_money': b'cents'})
+    pq.write_table(table, str(path))
+
+
+def read_catalog(path, cents=False):
+    """Memory-map a catalog written by write_catalog.
+
+    With cents=True the money columns stay int64 cents, which pyarrow hands to
+    pandas without copying; otherwise they are converted to dollars.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(str(path), memory_map=True)
+    df = table.to_pandas(split_blocks=True)
+    if not cents:
+        for c in MONEY_COLUMNS:
+            df[c] = df[c] / 100
+    return df
+
+# ============================================================================
+# SHARED BASE CATALOG
+# ============================================================================
+
+@functools.lru_cache(maxsize=1)
+def get_base_catalog():
+    """Process-wide base catalog. Shared by all sessions - never mutate it."""
+    path = catalog_file()
+    if path is None:
+        df = typed_catalog(get_all_analytes())
+        df.attrs['version'] = CATALOG_VERSION
+    else:
+        df = read_catalog(path)
+        df.attrs['version'] = f"{path.name}:{path.stat().st_mtime_ns}"
+    return df
+
+
+def apply_price_overlay(base, overlay):
+    """Return the catalog with a session's {test id: price} edits applied.
+
+    With no edits the shared base itself is returned, so untouched sessions
+    hold no copy of their own.
+    """
+    if not overlay:
+        return base
+    df = base.copy()
+    pos = pd.Index(df['id']).get_indexer(list(overlay.keys()))
+    keep = pos >= 0
+    rows = df.index[pos[keep]]
+    prices = np.fromiter(overlay.values(), dtype=float, count=len(overlay))[keep]
+    df.loc[rows, 'price'] = prices
+    df.loc[rows, 'margin_percent'] = compute_margins(prices, df.loc[rows, 'total_cost'])
+    return df
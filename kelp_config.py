@@ -0,0 +1,28 @@
+"""
+KELP Laboratory Services - Local storage locations
+Everything persistent lives under KELP_DATA_DIR (default ./kelp_data).
+KELP_CATALOG points at a catalog Parquet file to serve instead of the
+built-in 84 tests (benchmarks use it for 10k and 100k-test catalogs).
+"""
+
+import os
+from pathlib import Path
+
+# Lab code of the built-in catalog (kelp_labs) and of headless pricing (kelp_core)
+DEFAULT_LAB = "KELP"
+# Shared price store (kelp_prices); named here so kelp_core can look for it without importing sqlite3
+PRICES_FILE = "prices.sqlite3"
+
+
+def data_path(name, create=True):
+    """Path for a persistent store file, creating the data directory on first use unless create is False"""
+    root = Path(os.environ.get("KELP_DATA_DIR", "kelp_data"))
+    if create:
+        root.mkdir(parents=True, exist_ok=True)
+    return root / name
+
+
+def catalog_file():
+    """Catalog file named by KELP_CATALOG, or None for the built-in catalog"""
+    path = os.environ.get("KELP_CATALOG")
+    return Path(path) if path else None
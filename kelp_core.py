@@ -0,0 +1,163 @@
+"""
+KELP Laboratory Services - Headless Pricing Core
+Side-effect-free pricing and catalog API for scripts, workers and services.
+Importing it pulls in no Streamlit, and pandas / ReportLab are imported only
+by the functions that need them, so a price lookup starts in milliseconds.
+Prices are a lab's catalog (DEFAULT_LAB unless given) with the edits saved
+to the shared price store (kelp_prices) applied, so scripts and services
+quote what the app shows. The store is opened read-only, and only once it
+exists; until then lookups use list prices and touch no files.
+"""
+
+import functools
+import threading
+
+from kelp_config import DEFAULT_LAB, PRICES_FILE, data_path
+from kelp_data import ANALYTES, CATALOG_VERSION
+from kelp_metals import METALS_PANELS, calculate_metals_price, price_metals_panel
+from kelp_profiling import timed
+
+__all__ = [
+    'CATALOG_VERSION', 'METALS_PANELS',
+    'get_all_analytes', 'list_analytes', 'get_analyte', 'get_price', 'calculate_metals_price', 'price_metals_panel',
+    'recalc_margin', 'quote_line', 'quote_totals', 'price_quote', 'generate_pdf_quote',
+]
+
+DEFAULT_TAT = 'Standard (5-7 Day)'
+
+# ============================================================================
+# CATALOG
+# ============================================================================
+
+def get_all_analytes():
+    """The full catalog as a DataFrame (imports pandas on first use)"""
+    from kelp_catalog import get_all_analytes as build
+    return build()
+
+
+@functools.lru_cache(maxsize=1)
+def _catalog_by_id():
+    return {a['id']: a for a in ANALYTES}
+
+
+@functools.lru_cache(maxsize=8)
+def _site_by_id(lab, version):
+    from kelp_labs import get_registry
+    return {a['id']: a for a in get_registry().get(lab).catalog.to_dict('records')}
+
+
+def _lab_by_id(lab):
+    """{test id: record} of a lab's catalog at list prices. Other sites' catalogs
+    are Parquet files, so they (only) import pandas."""
+    if lab == DEFAULT_LAB:
+        return _catalog_by_id()
+    from kelp_labs import get_registry
+    return _site_by_id(lab, get_registry().get(lab).catalog.attrs['version'])
+
+
+_store = None
+_priced = {}    # lab -> (list-price records, store version, {test id: record at current prices})
+_priced_lock = threading.Lock()
+
+
+def _price_store():
+    """The shared price store opened read-only, or None while nobody has saved a price"""
+    global _store
+    if _store is None:
+        path = data_path(PRICES_FILE, create=False)
+        if path.exists():
+            from kelp_prices import PriceStore
+            _store = PriceStore(path, readonly=True)
+    return _store
+
+
+def _analytes_by_id(lab=DEFAULT_LAB):
+    """{test id: record} at current prices; records are shared, never mutate them.
+
+    Catches up on the rows saved since the last call, and costs no query
+    while the price store has not moved.
+    """
+    base = _lab_by_id(lab)
+    store = _price_store()
+    if store is None:
+        return base
+    with _priced_lock:
+        hit = _priced.get(lab)
+        if hit is None or hit[0] is not base:
+            overlay, version = store.snapshot(lab)
+            rows, by_id = overlay.items(), dict(base)
+        else:
+            _, version, by_id = hit
+            rows, version = store.changed_rows(lab, version)
+            if rows:
+                by_id = dict(by_id)
+        for test_id, price in rows:
+            a = base.get(test_id)
+            if a is not None:
+                by_id[test_id] = a if price is None else {**a, 'price': price, 'margin_percent': recalc_margin({'price': price, 'total_cost': a['total_cost']})}
+        _priced[lab] = (base, version, by_id)
+        return by_id
+
+
+def list_analytes(lab=DEFAULT_LAB):
+    """Every analyte record of lab at current prices, as dict copies in catalog order"""
+    return [dict(a) for a in _analytes_by_id(lab).values()]
+
+
+def get_analyte(test_id, lab=DEFAULT_LAB):
+    """One analyte record as a dict copy; KeyError for unknown ids"""
+    return dict(_analytes_by_id(lab)[int(test_id)])
+
+
+def get_price(test_id, lab=DEFAULT_LAB):
+    return _analytes_by_id(lab)[int(test_id)]['price']
+
+# ============================================================================
+# PRICING
+# ============================================================================
+
+def recalc_margin(row):
+    """Margin % for a single row/record with price and total_cost"""
+    price, cost = row['price'], row['total_cost']
+    return (price - cost) / price * 100 if price > 0 else 0.0
+
+
+def quote_line(test_id, qty=1, price=None, lab=DEFAULT_LAB):
+    """Quote item dict for a catalog test of lab; price overrides the current price"""
+    a = _analytes_by_id(lab)[int(test_id)]
+    price = a['price'] if price is None else price
+    return {'test_id': int(test_id), 'description': a['name'], 'method': a['method'], 'qty': qty, 'price': price, 'tat': a.get('tat', DEFAULT_TAT), 'total': price * qty}
+
+
+def quote_totals(subtotal, discount_percent=0):
+    """Subtotal, discount and grand total for a quote"""
+    disc_amt = subtotal * (discount_percent / 100)
+    return {'subtotal': subtotal, 'discount_percent': discount_percent, 'discount_amount': disc_amt, 'total': subtotal - disc_amt}
+
+
+def price_quote(lines, discount_percent=0, metals=(), tat=None, batches=1, lab=DEFAULT_LAB):
+    """Price a quote from (test_id, qty) lines of lab's catalog and (method, elements, qty) metals panels.
+
+    With tat, lines are surcharged for that turnaround (see kelp_tat) and its
+    per-batch fee is added for `batches` sample batches.
+    Returns {'items': [...], **quote_totals(...)} ready for generate_pdf_quote.
+    """
+    items = []
+    for method, elements, qty in metals:
+        panel = price_metals_panel(method, frozenset(elements), qty)
+        items.append({'description': f"Individual Element by ICP/ICP-MS ({', '.join(sorted(elements))})", 'method': method, 'elements': sorted(elements), 'qty': qty, 'price': panel.unit_price, 'tat': DEFAULT_TAT, 'total': panel.total})
+    items.extend(quote_line(test_id, qty, lab=lab) for test_id, qty in lines)
+    if tat is not None:
+        from kelp_tat import apply_tat
+        items = apply_tat(items, tat, batches)
+    return {'items': items, **quote_totals(sum(i['total'] for i in items), discount_percent)}
+
+# ============================================================================
+# PDF
+# ============================================================================
+
+@timed()
+def generate_pdf_quote(quote_data):
+    """Render a quote PDF (imports ReportLab on first use)"""
+    from kelp_pdf import generate_pdf_quote as render
+    return render(quote_data)
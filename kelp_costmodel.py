@@ -0,0 +1,181 @@
+"""
+KELP Laboratory Services - Cost Model
+Labor rate and QC / facility overhead as catalog-wide (or per method group)
+parameters. A change recomputes total cost and margin for every affected test
+in one vectorized pass; sensitivity sweeps evaluate a grid of scenarios at once.
+"""
+
+import collections
+import functools
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from kelp_catalog import get_base_catalog, round_cents
+from kelp_costs import overhead_rollup
+from kelp_pricing import compute_margins
+
+# labor_factor scales each test's labor cost (1.05 = labor rate +5%). A rate of
+# None keeps each test's own overhead rate from the catalog.
+CostParameters = collections.namedtuple('CostParameters', ['labor_factor', 'qc_rate', 'facility_rate'], defaults=(1.0, None, None))
+
+BASELINE = CostParameters()
+COST_MODEL_COLUMNS = ['labor', 'subtotal', 'qc_oh', 'facility_oh', 'total_cost', 'margin_percent']
+SWEEP_COLUMNS = ['scenario', 'labor_factor', 'qc_rate', 'facility_rate', 'group', 'tests', 'avg_cost', 'avg_margin', 'margin_change']
+# Bound on scenarios x rows evaluated at once, to cap sweep memory
+SWEEP_CELLS = 2_000_000
+
+
+class CostModel:
+    """Column arrays of a catalog's cost structure, in the catalog's row order"""
+
+    def __init__(self, df):
+        self.labor = df['labor'].to_numpy(dtype=float)
+        self.subtotal = df['subtotal'].to_numpy(dtype=float)
+        self.price = df['price'].to_numpy(dtype=float)
+        self.active = df['active'].to_numpy(dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.qc_rate = np.where(self.subtotal > 0, df['qc_oh'].to_numpy(dtype=float) / self.subtotal, 0.0)
+            self.facility_rate = np.where(self.subtotal > 0, df['facility_oh'].to_numpy(dtype=float) / self.subtotal, 0.0)
+        # Cents by which a stored total differs from subtotal + overheads (hand-typed sheets)
+        self.residual = df['total_cost'].to_numpy(dtype=float) - overhead_rollup(self.subtotal, self.qc_rate, self.facility_rate)[3]
+        self.method_groups = pd.Index(pd.unique(df['method_group'].astype(str)))
+        self.group_codes = self.method_groups.get_indexer(df['method_group'].astype(str))
+        self.categories = pd.Index(pd.unique(df['category'].astype(str)))
+        self.category_codes = self.categories.get_indexer(df['category'].astype(str))
+
+    def row_parameters(self, params=BASELINE, overrides=None):
+        """Per-row (labor_factor, qc_rate, facility_rate) arrays.
+
+        overrides maps method_group -> CostParameters; fields left at their
+        defaults fall back to the global params.
+        """
+        labor = np.full(len(self.labor), float(params.labor_factor))
+        qc = self.qc_rate if params.qc_rate is None else np.full(len(self.labor), float(params.qc_rate))
+        facility = self.facility_rate if params.facility_rate is None else np.full(len(self.labor), float(params.facility_rate))
+        for group, p in (overrides or {}).items():
+            if group not in self.method_groups:
+                raise ValueError(f"Unknown method group: {group}")
+            rows = self.group_codes == self.method_groups.get_loc(group)
+            if p.labor_factor != BASELINE.labor_factor:
+                labor[rows] = p.labor_factor
+            if p.qc_rate is not None:
+                qc = np.where(rows, p.qc_rate, qc)
+            if p.facility_rate is not None:
+                facility = np.where(rows, p.facility_rate, facility)
+        return labor, qc, facility
+
+    def recompute(self, params=BASELINE, overrides=None, prices=None):
+        """Cost columns and margins under the given parameters, one vectorized pass.
+
+        The baseline parameters reproduce the catalog's stored costs to the cent.
+        """
+        labor_factor, qc, facility = self.row_parameters(params, overrides)
+        labor = round_cents(self.labor * labor_factor)
+        subtotal, qc_oh, facility_oh, total_cost = overhead_rollup(self.subtotal + labor - self.labor, qc, facility)
+        total_cost = round_cents(total_cost + self.residual)
+        prices = self.price if prices is None else np.asarray(prices, dtype=float)
+        return pd.DataFrame({
+            'labor': labor,
+            'subtotal': subtotal,
+            'qc_oh': qc_oh,
+            'facility_oh': facility_oh,
+            'total_cost': total_cost,
+            'margin_percent': compute_margins(prices, total_cost),
+        })
+
+    def apply(self, df, params=BASELINE, overrides=None):
+        """Copy of df (same rows, same order) with the modelled costs and margins"""
+        out = df.copy()
+        costs = self.recompute(params, overrides, df['price'].to_numpy(dtype=float))
+        for c in COST_MODEL_COLUMNS:
+            out[c] = costs[c].to_numpy()
+        return out
+
+    def sweep(self, scenarios, by='category', prices=None):
+        """Average cost and margin per group for each scenario.
+
+        scenarios is a list of CostParameters (or (CostParameters, overrides)
+        pairs). Scenarios are evaluated as a (scenarios, rows) grid in blocks of
+        at most SWEEP_CELLS cells. Inactive tests are left out, as on the
+        dashboard; margin_change is against the catalog's current margins.
+        """
+        scenarios = [s if isinstance(s, tuple) and not isinstance(s, CostParameters) else (s, None) for s in scenarios]
+        prices = self.price if prices is None else np.asarray(prices, dtype=float)
+        groups = self.categories if by == 'category' else self.method_groups
+        codes = (self.category_codes if by == 'category' else self.group_codes)[self.active]
+        n_groups = len(groups)
+        tests = np.bincount(codes, minlength=n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            base_margin = np.bincount(codes, weights=compute_margins(prices, self._baseline_cost())[self.active], minlength=n_groups) / tests
+
+        labor, subtotal, price = self.labor[self.active], self.subtotal[self.active], prices[self.active]
+        residual = self.residual[self.active]
+        block = max(1, SWEEP_CELLS // max(len(labor), 1))
+        all_keys = (np.arange(min(block, len(scenarios)))[:, None] * n_groups + codes).ravel()
+        cost_sums, margin_sums = [], []
+        for start in range(0, len(scenarios), block):
+            chunk = scenarios[start:start + block]
+            labor_factor, qc, facility = self._grid_parameters(chunk)
+            new_subtotal = round_cents(labor * labor_factor)
+            new_subtotal += subtotal - labor
+            total_cost = overhead_rollup(new_subtotal, qc, facility)[3]
+            total_cost += residual
+            total_cost = round_cents(total_cost)
+            margin = compute_margins(np.broadcast_to(price, total_cost.shape), total_cost)
+            # One bincount per block over scenario-major group keys
+            keys = all_keys[:len(chunk) * len(codes)]
+            cost_sums.append(np.bincount(keys, weights=total_cost.ravel(), minlength=len(chunk) * n_groups))
+            margin_sums.append(np.bincount(keys, weights=margin.ravel(), minlength=len(chunk) * n_groups))
+
+        cost_sum = np.concatenate(cost_sums).reshape(len(scenarios), n_groups) if scenarios else np.empty((0, n_groups))
+        margin_sum = np.concatenate(margin_sums).reshape(len(scenarios), n_groups) if scenarios else np.empty((0, n_groups))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_cost, avg_margin = cost_sum / tests, margin_sum / tests
+        params = [p for p, _ in scenarios]
+        out = pd.DataFrame({
+            'scenario': np.repeat(np.arange(len(scenarios)), n_groups),
+            'labor_factor': np.repeat([p.labor_factor for p in params], n_groups),
+            'qc_rate': np.repeat([p.qc_rate for p in params], n_groups),
+            'facility_rate': np.repeat([p.facility_rate for p in params], n_groups),
+            'group': np.tile(np.asarray(groups, dtype=object), len(scenarios)),
+            'tests': np.tile(tests, len(scenarios)),
+            'avg_cost': avg_cost.ravel(),
+            'avg_margin': avg_margin.ravel(),
+            'margin_change': (avg_margin - base_margin).ravel(),
+        }, columns=SWEEP_COLUMNS)
+        return out[out['tests'] > 0].reset_index(drop=True)
+
+    def _grid_parameters(self, scenarios):
+        """(scenarios, active rows) parameter grids; plain global scenarios broadcast
+        per-scenario columns instead of materialising every row"""
+        if any(o for _, o in scenarios):
+            rows = [self.row_parameters(p, o) for p, o in scenarios]
+            return tuple(np.stack([r[i][self.active] for r in rows]) for i in range(3))
+
+        def column(values, per_row):
+            if all(v is None for v in values):
+                return per_row[self.active]
+            values = np.array([np.nan if v is None else v for v in values], dtype=float)[:, None]
+            if not np.isnan(values).any():
+                return values
+            return np.where(np.isnan(values), per_row[self.active], values)
+
+        labor = np.array([p.labor_factor for p, _ in scenarios], dtype=float)[:, None]
+        return (labor, column([p.qc_rate for p, _ in scenarios], self.qc_rate),
+                column([p.facility_rate for p, _ in scenarios], self.facility_rate))
+
+    def _baseline_cost(self):
+        return round_cents(overhead_rollup(self.subtotal, self.qc_rate, self.facility_rate)[3] + self.residual)
+
+
+def sensitivity_grid(labor_factors=(1.0,), qc_rates=(None,), facility_rates=(None,)):
+    """Every combination of the given parameter values, as CostParameters"""
+    return [CostParameters(*p) for p in itertools.product(labor_factors, qc_rates, facility_rates)]
+
+
+@functools.lru_cache(maxsize=1)
+def get_cost_model():
+    """Cost model of the shared base catalog"""
+    return CostModel(get_base_catalog())
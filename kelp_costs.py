@@ -0,0 +1,393 @@
+"""
+KELP Laboratory Services - Cost Sheet Import
+Streams a CA ELAP cost-calculator sheet (CSV or XLSX) in fixed-size chunks,
+validates each row and recomputes the cost rollup in one vectorized pass.
+
+Sheet: one row per test, header names are matched loosely ("Gases/Utilities",
+"QC OH", "Total Cost", "Margin %" ...).
+    id, name, standards, consumables, gases_utilities,
+    labor, depreciation, price                         (required)
+    subtotal, qc_oh, facility_oh, total_cost,
+    margin_percent                                     (optional, checked against the rollup)
+    lab, method, water_type, category, method_group,
+    tat, active                                        (optional, passed through)
+
+Usage:  python -m kelp_costs costs.xlsx -o catalog.parquet --report mismatches.csv
+"""
+
+import argparse
+import collections
+import re
+
+import numpy as np
+import pandas as pd
+
+from kelp_catalog import round_cents, to_cents
+from kelp_pricing import compute_margins
+
+QC_RATE = 0.20
+FACILITY_RATE = 0.35
+CHUNK_ROWS = 50_000
+
+COMPONENT_COLUMNS = ['standards', 'consumables', 'gases_utilities', 'labor', 'depreciation']
+ROLLUP_COLUMNS = ['subtotal', 'qc_oh', 'facility_oh', 'total_cost', 'margin_percent']
+REQUIRED_COLUMNS = ['id', 'name'] + COMPONENT_COLUMNS + ['price']
+TEXT_COLUMNS = ['lab', 'name', 'method', 'water_type', 'category', 'method_group', 'tat']
+MISMATCH_COLUMNS = ['row', 'lab', 'id', 'name', 'column', 'stored', 'recomputed', 'difference']
+REJECT_COLUMNS = ['row', 'id', 'reason']
+
+_ALIASES = {
+    'test_id': 'id', 'analyte_id': 'id',
+    'analyte': 'name', 'test': 'name', 'test_name': 'name',
+    'gases': 'gases_utilities', 'gas_utilities': 'gases_utilities', 'utilities': 'gases_utilities',
+    'qc': 'qc_oh', 'qc_overhead': 'qc_oh',
+    'facility': 'facility_oh', 'facility_overhead': 'facility_oh',
+    'total': 'total_cost',
+    'margin': 'margin_percent', 'margin_pct': 'margin_percent',
+    'turnaround': 'tat', 'lab_id': 'lab', 'site': 'lab',
+}
+
+CostImport = collections.namedtuple('CostImport', ['rows', 'catalog', 'mismatches', 'rejected'])
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def normalize_column(name):
+    """Loose header match: 'Gases/Utilities' -> 'gases_utilities', 'Margin %' -> 'margin_percent'"""
+    key = re.sub(r'[^a-z0-9]+', '_', str(name).strip().lower()).strip('_')
+    return _ALIASES.get(key, key)
+
+
+def iter_cost_sheet(path, chunk_rows=CHUNK_ROWS):
+    """Yield the sheet as DataFrames of at most chunk_rows raw rows.
+
+    Each chunk carries a 'row' column with the 1-based sheet row number, so
+    reports point back at the spreadsheet. Cells are left as read; validation
+    happens in validate_chunk.
+    """
+    path = str(path)
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        yield from _iter_xlsx(path, chunk_rows)
+        return
+    start = 2
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, keep_default_na=False, na_values=['']):
+        chunk.columns = [normalize_column(c) for c in chunk.columns]
+        chunk.insert(0, 'row', np.arange(start, start + len(chunk)))
+        start += len(chunk)
+        yield chunk
+
+
+def _iter_xlsx(path, chunk_rows):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header, row_no = None, 0
+        for values in rows:
+            row_no += 1
+            if any(v is not None for v in values):
+                header = [normalize_column(v) if v is not None else f"column_{i}" for i, v in enumerate(values)]
+                break
+        if header is None:
+            return
+        buf, numbers = [], []
+        for values in rows:
+            row_no += 1
+            if not any(v is not None for v in values):
+                continue
+            buf.append(values[:len(header)])
+            numbers.append(row_no)
+            if len(buf) >= chunk_rows:
+                yield _xlsx_chunk(buf, numbers, header)
+                buf, numbers = [], []
+        if buf:
+            yield _xlsx_chunk(buf, numbers, header)
+    finally:
+        wb.close()
+
+
+def _xlsx_chunk(buf, numbers, header):
+    chunk = pd.DataFrame.from_records(buf, columns=header)
+    chunk.insert(0, 'row', numbers)
+    return chunk
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+def validate_chunk(chunk):
+    """Split a raw chunk into (clean rows, rejected rows).
+
+    Blank cost components count as $0; text in a numeric cell, a missing or
+    non-integer id, a missing name or price, and negative amounts reject the row.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Cost sheet is missing columns: {', '.join(missing)}")
+
+    out = chunk.copy()
+    reasons = np.full(len(chunk), None, dtype=object)
+    bad = np.zeros(len(chunk), dtype=bool)
+
+    def reject(mask, reason):
+        first = np.asarray(mask, dtype=bool) & ~bad
+        reasons[first] = reason
+        bad[first] = True
+
+    ids = pd.to_numeric(chunk['id'], errors='coerce')
+    reject(ids.isna() | (ids % 1 != 0), "missing or non-integer id")
+    reject(chunk['name'].isna() | (chunk['name'].astype(str).str.strip() == ''), "missing name")
+    for c in COMPONENT_COLUMNS + ['price'] + [c for c in ROLLUP_COLUMNS if c in chunk.columns]:
+        values = pd.to_numeric(chunk[c], errors='coerce')
+        blank = chunk[c].isna()
+        reject(values.isna() & ~blank, f"{c} is not a number")
+        if c == 'price':
+            reject(blank, "missing price")
+        elif c != 'margin_percent':
+            reject(values < 0, f"{c} is negative")
+        out[c] = values.fillna(0.0) if c in COMPONENT_COLUMNS else values
+
+    rejected = pd.DataFrame({'row': chunk['row'].to_numpy()[bad], 'id': chunk['id'].to_numpy()[bad],
+                             'reason': reasons[bad]}, columns=REJECT_COLUMNS)
+    out = out.loc[~bad]
+    out['id'] = ids[~bad].astype('int64')
+    return out, rejected
+
+# ============================================================================
+# ROLLUP
+# ============================================================================
+
+def rollup_costs(components, prices, qc_rate=QC_RATE, facility_rate=FACILITY_RATE):
+    """subtotal -> qc_oh -> facility_oh -> total_cost -> margin_percent for every row at once.
+
+    components is an (n, 5) array or frame in COMPONENT_COLUMNS order. Overhead
+    rates are fractions of the subtotal and may be scalars or per-row arrays.
+    """
+    components = np.asarray(components, dtype=float)
+    subtotal, qc_oh, facility_oh, total_cost = overhead_rollup(components.sum(axis=1), qc_rate, facility_rate)
+    return pd.DataFrame({
+        'subtotal': subtotal,
+        'qc_oh': qc_oh,
+        'facility_oh': facility_oh,
+        'total_cost': total_cost,
+        'margin_percent': compute_margins(prices, total_cost),
+    })
+
+
+def overhead_rollup(subtotal, qc_rate=QC_RATE, facility_rate=FACILITY_RATE):
+    """(subtotal, qc_oh, facility_oh, total_cost) arrays from a subtotal.
+
+    Every amount is taken from the unrounded subtotal and then rounded to whole
+    cents, as the cost calculator does (total = round(subtotal x 1.55) at the
+    default rates), so total_cost may differ by a cent from the sum of the
+    rounded parts. Arguments broadcast, so a (scenarios, rows) grid works the
+    same way.
+    """
+    subtotal = np.asarray(subtotal, dtype=float)
+    qc_rate = np.asarray(qc_rate, dtype=float)
+    facility_rate = np.asarray(facility_rate, dtype=float)
+    total_cost = subtotal * (1 + qc_rate + facility_rate)
+    return round_cents(subtotal), round_cents(subtotal * qc_rate), round_cents(subtotal * facility_rate), round_cents(total_cost)
+
+
+def find_mismatches(stored, recomputed, money_tolerance=0.01, margin_tolerance=0.05):
+    """Long-format report of stored rollup values that disagree with the recomputed ones.
+
+    Money is compared in whole cents, allowing money_tolerance (default one
+    cent, the rounding slack of hand-kept sheets; 0 means exact). Stored
+    margins are usually rounded, hence the looser margin tolerance. Only
+    rollup columns present in the sheet are compared.
+    """
+    frames = []
+    for c in ROLLUP_COLUMNS:
+        if c not in stored.columns:
+            continue
+        old = stored[c].to_numpy(dtype=float)
+        new = recomputed[c].to_numpy()
+        if c == 'margin_percent':
+            bad = np.abs(old - new) > margin_tolerance + 1e-9
+        else:
+            bad = np.abs(to_cents(old) - to_cents(new)) > round(money_tolerance * 100)
+        if not bad.any():
+            continue
+        frames.append(pd.DataFrame({
+            'row': stored['row'].to_numpy()[bad],
+            'lab': stored['lab'].to_numpy()[bad] if 'lab' in stored.columns else None,
+            'id': stored['id'].to_numpy()[bad],
+            'name': stored['name'].to_numpy()[bad],
+            'column': c,
+            'stored': old[bad],
+            'recomputed': new[bad],
+            'difference': (new - old)[bad].round(4),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=MISMATCH_COLUMNS)
+    return pd.concat(frames, ignore_index=True).sort_values('row', kind='stable', ignore_index=True)
+
+# ============================================================================
+# IMPORT
+# ============================================================================
+
+def import_cost_sheet(path, output=None, qc_rate=QC_RATE, facility_rate=FACILITY_RATE,
+                      chunk_rows=CHUNK_ROWS, money_tolerance=0.01, margin_tolerance=0.05):
+    """Import a cost sheet chunk by chunk.
+
+    With output set, recomputed rows are appended to a Parquet file in the
+    kelp_catalog layout (int64 cents, readable by read_catalog) and only one
+    chunk is held in memory at a time; catalog is then None. Without output,
+    the recomputed rows are returned as a DataFrame.
+
+    Returns CostImport(rows, catalog, mismatches, rejected). Ids must be unique
+    per lab; repeats are rejected.
+    """
+    writer, frames, mismatches, rejected = None, [], [], []
+    seen = {}
+    rows = 0
+    try:
+        for chunk in iter_cost_sheet(path, chunk_rows):
+            clean, bad = validate_chunk(chunk)
+            clean, dupes = _drop_duplicate_ids(clean, seen)
+            rejected += [f for f in (bad, dupes) if len(f)]
+
+            recomputed = rollup_costs(clean[COMPONENT_COLUMNS], clean['price'].to_numpy(dtype=float),
+                                      qc_rate, facility_rate)
+            recomputed.index = clean.index
+            report = find_mismatches(clean, recomputed, money_tolerance, margin_tolerance)
+            if len(report):
+                mismatches.append(report)
+
+            result = _catalog_rows(clean, recomputed)
+            rows += len(result)
+            if output is None:
+                frames.append(result)
+            else:
+                writer = _write_chunk(writer, output, result)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    catalog = None
+    if output is None:
+        catalog = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=REQUIRED_COLUMNS)
+    return CostImport(
+        rows=rows,
+        catalog=catalog,
+        mismatches=pd.concat(mismatches, ignore_index=True) if mismatches else pd.DataFrame(columns=MISMATCH_COLUMNS),
+        rejected=pd.concat(rejected, ignore_index=True) if rejected else pd.DataFrame(columns=REJECT_COLUMNS),
+    )
+
+
+def _drop_duplicate_ids(clean, seen):
+    """Reject ids already seen for the same lab, in this chunk or an earlier one.
+
+    seen is a dict holding the lab codes and a sorted int64 array of packed
+    (lab, id) keys, so the check stays vectorized across chunks.
+    """
+    labs = seen.setdefault('labs', {})
+    if 'lab' in clean.columns:
+        local, names = pd.factorize(clean['lab'].astype('string').fillna(''), use_na_sentinel=False)
+        codes = np.array([labs.setdefault(lab, len(labs)) for lab in names], dtype='int64')[local]
+    else:
+        codes = np.zeros(len(clean), dtype='int64')
+    keys = (codes << 40) | clean['id'].to_numpy(dtype='int64')
+    known = seen.get('keys', np.empty(0, dtype='int64'))
+    at = np.minimum(np.searchsorted(known, keys), max(len(known) - 1, 0))
+    dup = pd.Index(keys).duplicated() | (known[at] == keys if len(known) else False)
+    # Both runs are sorted, so the stable sort is a cheap merge
+    seen['keys'] = np.sort(np.concatenate([known, np.sort(keys[~dup])]), kind='stable')
+    dupes = pd.DataFrame({'row': clean['row'].to_numpy()[dup], 'id': clean['id'].to_numpy()[dup],
+                          'reason': "duplicate id"}, columns=REJECT_COLUMNS)
+    return clean.loc[~dup], dupes
+
+
+def _catalog_rows(clean, recomputed):
+    """Sheet rows in catalog column order with the rollup replaced by recomputed values"""
+    out = clean.drop(columns=['row'] + [c for c in ROLLUP_COLUMNS if c in clean.columns])
+    out = pd.concat([out, recomputed], axis=1)
+    # 'string' keeps blank cells missing on pandas 2 too, where astype(str) writes 'nan'
+    for c in TEXT_COLUMNS:
+        if c in out.columns:
+            out[c] = out[c].astype('string')
+    if 'active' in out.columns:
+        out['active'] = _truthy(out['active'])
+    order = [c for c in ['id', 'lab', 'name', 'method', 'water_type', 'category', 'method_group'] if c in out.columns]
+    order += COMPONENT_COLUMNS + ROLLUP_COLUMNS[:4] + ['price', 'margin_percent']
+    return out[order + [c for c in out.columns if c not in order]].reset_index(drop=True)
+
+
+def _truthy(values):
+    text = values.astype('string').fillna('').str.strip().str.lower()
+    return text.isin(['1', '1.0', 'true', 'yes', 'y', 'active']).to_numpy(dtype=bool)
+
+
+def _write_chunk(writer, output, result):
+    """Append a chunk to the Parquet output, fixing the schema on the first chunk.
+
+    Columns outside the catalog layout keep their kind from the first chunk:
+    numbers as float64 (a later chunk may have blanks or decimals), booleans
+    as bool, anything else, including a column still blank, as text.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from kelp_catalog import MONEY_COLUMNS
+
+    out = result.copy()
+    for c in MONEY_COLUMNS:
+        out[c] = to_cents(out[c])
+    if writer is None:
+        fields = []
+        for c in out.columns:
+            if c == 'id' or c in MONEY_COLUMNS:
+                fields.append(pa.field(c, pa.int64()))
+            elif c == 'margin_percent':
+                fields.append(pa.field(c, pa.float64()))
+            elif c == 'active' or pd.api.types.infer_dtype(out[c], skipna=True) == 'boolean':
+                fields.append(pa.field(c, pa.bool_()))
+            elif out[c].notna().any() and pd.api.types.infer_dtype(out[c], skipna=True) in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+                fields.append(pa.field(c, pa.float64()))
+            else:
+                fields.append(pa.field(c, pa.string()))
+        schema = pa.schema(fields, metadata={b'kelp_money': b'cents'})
+        writer = pq.ParquetWriter(str(output), schema)
+    for field in writer.schema:
+        if pa.types.is_string(field.type) and not isinstance(out[field.name].dtype, pd.StringDtype):
+            out[field.name] = out[field.name].astype('string')
+        elif pa.types.is_floating(field.type):
+            values = pd.to_numeric(out[field.name], errors='coerce')
+            if (values.isna() & out[field.name].notna()).any():
+                raise ValueError(f"Column {field.name} holds numbers in earlier rows but text further down")
+            out[field.name] = values.astype(float)
+    writer.write_table(pa.Table.from_pandas(out, schema=writer.schema, preserve_index=False))
+    return writer
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a cost-calculator sheet and recompute the cost rollup")
+    parser.add_argument('sheet', help="CSV or XLSX cost sheet")
+    parser.add_argument('-o', '--output', required=True, help="Parquet catalog to write")
+    parser.add_argument('--report', help="CSV of stored totals that disagree with the rollup")
+    parser.add_argument('--rejects', help="CSV of rows that failed validation")
+    parser.add_argument('--qc-rate', type=float, default=QC_RATE, help="QC overhead as a fraction of subtotal")
+    parser.add_argument('--facility-rate', type=float, default=FACILITY_RATE, help="Facility overhead as a fraction of subtotal")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--money-tolerance', type=float, default=0.01, help="Dollar difference from the rollup to allow before reporting (0 = exact)")
+    args = parser.parse_args(argv)
+
+    result = import_cost_sheet(args.sheet, args.output, args.qc_rate, args.facility_rate, args.chunk_rows, args.money_tolerance)
+    if args.report:
+        result.mismatches.to_csv(args.report, index=False)
+    if args.rejects:
+        result.rejected.to_csv(args.rejects, index=False)
+    print(f"Imported {result.rows:,} rows to {args.output}: "
+          f"{result.mismatches['row'].nunique():,} with stored totals off the rollup, "
+          f"{len(result.rejected):,} rejected")
+
+
+if __name__ == '__main__':
+    main()
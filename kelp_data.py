@@ -0,0 +1,110 @@
+"""
+KELP Laboratory Services - Analyte Data
+All 84 analytes from the CA ELAP 2025 Cost Calculator as plain records.
+Pure Python so a price lookup never has to import pandas; treat as read-only.
+"""
+
+# Bump whenever the analyte data below changes so version-keyed caches refresh
+CATALOG_VERSION = "2025.1"
+
+ANALYTES = [
+    # PHYSICAL/GENERAL CHEMISTRY
+    {"id": 1, "name": "pH", "method": "EPA 150.1", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 30.00, "margin_percent": 57.63, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 2, "name": "pH", "method": "EPA 150.2", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 30.00, "margin_percent": 57.63, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 3, "name": "Temperature", "method": "SM 2550 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 15.00, "margin_percent": 15.27, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 4, "name": "Dissolved Oxygen", "method": "SM 4500-O", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Wet Chemistry - pH/Temp/DO", "standards": 0.00, "consumables": 0.90, "gases_utilities": 0.00, "labor": 7.15, "depreciation": 0.15, "subtotal": 8.20, "qc_oh": 1.64, "facility_oh": 2.87, "total_cost": 12.71, "price": 30.00, "margin_percent": 57.63, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 5, "name": "Turbidity", "method": "EPA 180.1", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 6, "name": "Turbidity", "method": "EPA 180.1", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 7, "name": "Conductivity", "method": "SM 2510 B", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 8, "name": "Conductivity", "method": "EPA 120.1", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Turbidity/Conductivity", "standards": 0.00, "consumables": 0.80, "gases_utilities": 0.00, "labor": 7.37, "depreciation": 0.40, "subtotal": 8.57, "qc_oh": 1.71, "facility_oh": 3.00, "total_cost": 13.28, "price": 40.00, "margin_percent": 66.79, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 9, "name": "Alkalinity", "method": "SM 2320 B", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 50.00, "margin_percent": 51.60, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 10, "name": "Hardness - Total", "method": "SM 2340 C", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 80.00, "margin_percent": 69.75, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 11, "name": "Hardness - Total", "method": "EPA 130.1", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 80.00, "margin_percent": 69.75, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 12, "name": "Total Dissolved Solids", "method": "SM 2540 C", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 60.00, "margin_percent": 31.53, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 13, "name": "Total Dissolved Solids", "method": "SM 2540 C", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 60.00, "margin_percent": 31.53, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 14, "name": "Total Suspended Solids", "method": "SM 2540 D", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 80.00, "margin_percent": 48.65, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 15, "name": "Total Solids", "method": "SM 2540 B", "water_type": "Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 20.00, "margin_percent": -105.41, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 16, "name": "Total Solids", "method": "SM 2540 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Solids Analysis (Gravimetric)", "standards": 0.00, "consumables": 1.20, "gases_utilities": 0.00, "labor": 24.89, "depreciation": 0.42, "subtotal": 26.50, "qc_oh": 5.30, "facility_oh": 9.28, "total_cost": 41.08, "price": 20.00, "margin_percent": -105.41, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 17, "name": "Chemical Oxygen Demand", "method": "EPA 410.4", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 150.00, "margin_percent": 77.78, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 18, "name": "BOD (5-day)", "method": "SM 5210 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Spectrophotometry - BOD/COD", "standards": 0.00, "consumables": 2.50, "gases_utilities": 0.00, "labor": 14.93, "depreciation": 0.60, "subtotal": 18.03, "qc_oh": 3.61, "facility_oh": 6.31, "total_cost": 27.95, "price": 180.00, "margin_percent": 84.47, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 19, "name": "BOD, Carbonaceous", "method": "SM 5210 B", "water_type": "Non-Potable", "category": "PHYSICAL/GENERAL CHEMISTRY", "method_group": "Spectrophotometry - BOD/COD", "standards": 0.00, "consumables": 2.50, "gases_utilities": 0.00, "labor": 14.93, "depreciation": 0.60, "subtotal": 18.03, "qc_oh": 3.61, "facility_oh": 6.31, "total_cost": 27.95, "price": 200.00, "margin_percent": 86.02, "tat": "Standard (5-7 Day)", "active": True},
+    
+    # INORGANICS
+    {"id": 20, "name": "Bromide", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 21, "name": "Bromide", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 22, "name": "Bromate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 160.00, "margin_percent": 82.41, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 23, "name": "Bromate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 160.00, "margin_percent": 82.41, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 24, "name": "Chloride", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 25, "name": "Chloride", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 26, "name": "Chlorite", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 140.00, "margin_percent": 79.90, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 27, "name": "Chlorite", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 140.00, "margin_percent": 79.90, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 28, "name": "Chlorate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 130.00, "margin_percent": 78.35, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 29, "name": "Chlorate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 130.00, "margin_percent": 78.35, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 30, "name": "Fluoride", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 31, "name": "Fluoride", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 32, "name": "Nitrate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 33, "name": "Nitrate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 34, "name": "Nitrite", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 35, "name": "Nitrite", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 36, "name": "Phosphate, Ortho", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 37, "name": "Phosphate, Ortho", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 38, "name": "Sulfate", "method": "EPA 300.1", "water_type": "Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 39, "name": "Sulfate", "method": "EPA 300.1", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "EPA 300.1 (IC Anions)", "standards": 1.25, "consumables": 1.72, "gases_utilities": 0.00, "labor": 8.94, "depreciation": 6.25, "subtotal": 18.16, "qc_oh": 3.63, "facility_oh": 6.36, "total_cost": 28.14, "price": 80.00, "margin_percent": 64.82, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 40, "name": "Perchlorate", "method": "EPA 314.2", "water_type": "Potable", "category": "INORGANICS", "method_group": "IC-MS Perchlorate", "standards": 2.40, "consumables": 6.20, "gases_utilities": 0.00, "labor": 14.44, "depreciation": 14.29, "subtotal": 37.32, "qc_oh": 7.46, "facility_oh": 13.06, "total_cost": 57.85, "price": 350.00, "margin_percent": 83.47, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 41, "name": "Perchlorate", "method": "EPA 314.0", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "IC-MS Perchlorate", "standards": 2.40, "consumables": 6.20, "gases_utilities": 0.00, "labor": 14.44, "depreciation": 14.29, "subtotal": 37.32, "qc_oh": 7.46, "facility_oh": 13.06, "total_cost": 57.85, "price": 350.00, "margin_percent": 83.47, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 42, "name": "Cyanide, Total", "method": "SM 4500-CN E", "water_type": "Potable", "category": "INORGANICS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 160.00, "margin_percent": 68.98, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 43, "name": "Cyanide, Total", "method": "SW-846 9012B", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 160.00, "margin_percent": 68.98, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 44, "name": "Cyanide, Available", "method": "SM 4500-CN I", "water_type": "Non-Potable", "category": "INORGANICS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 210.00, "margin_percent": 76.37, "tat": "Standard (5-7 Day)", "active": True},
+    
+    # NUTRIENTS
+    {"id": 45, "name": "Ammonia (as N)", "method": "EPA 350.1", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 110.00, "margin_percent": 69.70, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 46, "name": "Ammonia (as N)", "method": "EPA 350.1", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 110.00, "margin_percent": 69.70, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 47, "name": "Kjeldahl Nitrogen, Total", "method": "EPA 351.2", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 48, "name": "Kjeldahl Nitrogen, Total", "method": "EPA 351.2", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 49, "name": "Phosphorus, Total", "method": "EPA 365.1", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 120.00, "margin_percent": 72.23, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 50, "name": "Phosphorus, Total", "method": "EPA 365.1", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 120.00, "margin_percent": 72.23, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 51, "name": "Sulfide (as S)", "method": "SM 4500-S2 D", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Distillation (Cyanide/Sulfide)", "standards": 0.00, "consumables": 5.50, "gases_utilities": 0.00, "labor": 25.52, "depreciation": 1.00, "subtotal": 32.02, "qc_oh": 6.40, "facility_oh": 11.21, "total_cost": 49.63, "price": 200.00, "margin_percent": 75.18, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 52, "name": "Sulfite (as SO3)", "method": "SM 4500-SO3", "water_type": "Potable", "category": "NUTRIENTS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 120.00, "margin_percent": 46.58, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 53, "name": "Sulfite (as SO3)", "method": "SM 4500-SO3", "water_type": "Non-Potable", "category": "NUTRIENTS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 120.00, "margin_percent": 46.58, "tat": "Standard (5-7 Day)", "active": True},
+    
+    # ORGANICS
+    {"id": 54, "name": "Surfactants (MBAS)", "method": "SM 5540 C", "water_type": "Potable", "category": "ORGANICS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 280.00, "margin_percent": 77.11, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 55, "name": "Surfactants (MBAS)", "method": "SM 5540 C", "water_type": "Non-Potable", "category": "ORGANICS", "method_group": "Specialized Colorimetry", "standards": 0.00, "consumables": 3.00, "gases_utilities": 0.00, "labor": 37.46, "depreciation": 0.90, "subtotal": 41.36, "qc_oh": 8.27, "facility_oh": 14.47, "total_cost": 64.10, "price": 280.00, "margin_percent": 77.11, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 56, "name": "Dissolved Organic Carbon", "method": "EPA 415.3", "water_type": "Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 57, "name": "Dissolved Organic Carbon", "method": "EPA 415.3", "water_type": "Non-Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 130.00, "margin_percent": 74.37, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 58, "name": "Total Organic Carbon", "method": "EPA 415.3", "water_type": "Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 160.00, "margin_percent": 79.17, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 59, "name": "Total Organic Carbon", "method": "EPA 415.1", "water_type": "Non-Potable", "category": "ORGANICS", "method_group": "Spectrophotometry - Nutrients", "standards": 0.00, "consumables": 3.75, "gases_utilities": 0.00, "labor": 16.50, "depreciation": 1.25, "subtotal": 21.50, "qc_oh": 4.30, "facility_oh": 7.53, "total_cost": 33.33, "price": 160.00, "margin_percent": 79.17, "tat": "Standard (5-7 Day)", "active": True},
+    
+    # DISINFECTION PARAMETERS
+    {"id": 60, "name": "Chlorine, Free", "method": "SM 4500-Cl G", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 61, "name": "Chlorine, Free - DPD", "method": "SM 4500-Cl F", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 62, "name": "Chlorine, Total - DPD", "method": "SM 4500-Cl F", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 63, "name": "Chlorine, Total - DPD", "method": "SM 4500-Cl F", "water_type": "Non-Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 64, "name": "Chlorine, Combined", "method": "SM 4500-Cl G", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 65, "name": "Chloramines (Monochloramine)", "method": "SM 4500-Cl G", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 66, "name": "Chlorine Dioxide", "method": "SM 4500-ClO2 E", "water_type": "Potable", "category": "DISINFECTION PARAMETERS", "method_group": "Chlorine Methods (DPD)", "standards": 0.00, "consumables": 1.50, "gases_utilities": 0.00, "labor": 14.05, "depreciation": 0.18, "subtotal": 15.73, "qc_oh": 3.15, "facility_oh": 5.51, "total_cost": 24.38, "price": 35.00, "margin_percent": 30.33, "tat": "Standard (5-7 Day)", "active": True},
+    
+    # METALS
+    {"id": 67, "name": "Calcium - Total", "method": "SM 3500-Ca B", "water_type": "Potable", "category": "METALS", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 70.00, "margin_percent": 65.43, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 68, "name": "Calcium - Total", "method": "EPA 6020B", "water_type": "Non-Potable", "category": "METALS", "method_group": "EPA 200.8 / EPA 6020B (ICP-MS)", "standards": 2.03, "consumables": 1.20, "gases_utilities": 0.90, "labor": 10.81, "depreciation": 14.58, "subtotal": 29.53, "qc_oh": 5.91, "facility_oh": 10.33, "total_cost": 45.77, "price": 70.00, "margin_percent": 34.62, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 69, "name": "Magnesium - Total", "method": "SM 3500-Mg B", "water_type": "Potable", "category": "METALS", "method_group": "Titrimetry (Alkalinity/Hardness)", "standards": 0.00, "consumables": 1.80, "gases_utilities": 0.00, "labor": 13.06, "depreciation": 0.75, "subtotal": 15.61, "qc_oh": 3.12, "facility_oh": 5.46, "total_cost": 24.20, "price": 70.00, "margin_percent": 65.43, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 70, "name": "Magnesium - Total", "method": "EPA 6020B", "water_type": "Non-Potable", "category": "METALS", "method_group": "EPA 200.8 / EPA 6020B (ICP-MS)", "standards": 2.03, "consumables": 1.20, "gases_utilities": 0.90, "labor": 10.81, "depreciation": 14.58, "subtotal": 29.53, "qc_oh": 5.91, "facility_oh": 10.33, "total_cost": 45.77, "price": 70.00, "margin_percent": 34.62, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 71, "name": "Chromium (VI)", "method": "EPA 218.6", "water_type": "Potable", "category": "METALS", "method_group": "Chromium(VI) IC-Postcolumn", "standards": 1.42, "consumables": 3.50, "gases_utilities": 0.00, "labor": 11.00, "depreciation": 5.00, "subtotal": 20.92, "qc_oh": 4.18, "facility_oh": 7.32, "total_cost": 32.42, "price": 230.00, "margin_percent": 85.90, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 72, "name": "Chromium (VI)", "method": "EPA 218.6", "water_type": "Non-Potable", "category": "METALS", "method_group": "Chromium(VI) IC-Postcolumn", "standards": 1.42, "consumables": 3.50, "gases_utilities": 0.00, "labor": 11.00, "depreciation": 5.00, "subtotal": 20.92, "qc_oh": 4.18, "facility_oh": 7.32, "total_cost": 32.42, "price": 230.00, "margin_percent": 85.90, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 73, "name": "RCRA 8 Metals Panel (Ag, As, Ba, Cd, Cr, Hg, Pb, Se)", "method": "EPA 6020B", "water_type": "Non-Potable", "category": "METALS", "method_group": "EPA 200.8 / EPA 6020B (ICP-MS)", "standards": 2.03, "consumables": 1.20, "gases_utilities": 0.90, "labor": 10.81, "depreciation": 14.58, "subtotal": 29.53, "qc_oh": 5.91, "facility_oh": 10.33, "total_cost": 45.77, "price": 540.00, "margin_percent": 91.52, "tat": "Standard (5-7 Day)", "active": True},
+    
+    # PFAS Testing
+    {"id": 74, "name": "PFAS 3-Compound (PFNA, PFOA, PFOS)", "method": "EPA 537.1", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 425.00, "margin_percent": 66.00, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 75, "name": "PFAS 3-Compound (PFNA, PFOA, PFOS)", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 425.00, "margin_percent": 66.00, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 76, "name": "PFAS 14-Compound", "method": "EPA 537.1", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 595.00, "margin_percent": 75.71, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 77, "name": "PFAS 18-Compound", "method": "EPA 537.1", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 625.00, "margin_percent": 76.88, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 78, "name": "PFAS 18-Compound", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 625.00, "margin_percent": 76.88, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 79, "name": "PFAS 25-Compound", "method": "EPA 533", "water_type": "Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 710.00, "margin_percent": 79.65, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 80, "name": "PFAS 25-Compound", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 25.00, "consumables": 18.95, "gases_utilities": 0.63, "labor": 23.65, "depreciation": 25.00, "subtotal": 93.23, "qc_oh": 18.65, "facility_oh": 32.63, "total_cost": 144.51, "price": 710.00, "margin_percent": 79.65, "tat": "Standard (5-7 Day)", "active": True},
+    {"id": 81, "name": "PFAS 40-Compound", "method": "EPA 1633", "water_type": "Non-Potable", "category": "PFAS TESTING", "method_group": "EPA 537/1633A (PFAS LC-MS/MS)", "standards": 65.00, "consumables": 35.00, "gases_utilities": 0.63, "labor": 30.00, "depreciation": 25.00, "subtotal": 155.63, "qc_oh": 50.00, "facility_oh": 54.47, "total_cost": 260.10, "price": 1190.00, "margin_percent": 78.14, "tat": "Standard (5-7 Day)", "active": True},
+    
+    # SERVICES
+    {"id": 82, "name": "Field Service", "method": "-", "water_type": "All", "category": "SERVICES", "method_group": "Field Services", "standards": 0.00, "consumables": 0.00, "gases_utilities": 0.00, "labor": 200.00, "depreciation": 0.00, "subtotal": 200.00, "qc_oh": 0.00, "facility_oh": 0.00, "total_cost": 200.00, "price": 330.00, "margin_percent": 39.39, "tat": "-", "active": True},
+    {"id": 83, "name": "Sample Pickup", "method": "-", "water_type": "All", "category": "SERVICES", "method_group": "Field Services", "standards": 0.00, "consumables": 0.00, "gases_utilities": 0.00, "labor": 50.00, "depreciation": 0.00, "subtotal": 50.00, "qc_oh": 0.00, "facility_oh": 0.00, "total_cost": 50.00, "price": 75.00, "margin_percent": 33.33, "tat": "-", "active": True},
+    {"id": 84, "name": "Rush Fee (per sample)", "method": "-", "water_type": "All", "category": "SERVICES", "method_group": "Rush Services", "standards": 0.00, "consumables": 0.00, "gases_utilities": 0.00, "labor": 0.00, "depreciation": 0.00, "subtotal": 0.00, "qc_oh": 0.00, "facility_oh": 0.00, "total_cost": 0.00, "price": 100.00, "margin_percent": 100.00, "tat": "-", "active": True},
+]
@@ -0,0 +1,216 @@
+"""
+KELP Laboratory Services - Exports
+Catalog, audit log and other tables exported to CSV, Excel or Parquet. Data is
+pulled in fixed-size chunks and streamed to disk, so memory stays flat however
+large the source; finished files are cached by the versions of their sections.
+
+An export is a list of ExportSections. One section in CSV or Parquet is a plain
+file; several become a ZIP with one file per section. Excel puts each section
+on its own sheet.
+"""
+
+import collections
+import hashlib
+import io
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from kelp_config import data_path
+
+CHUNK_ROWS = 10_000
+CACHE_FILES = 20
+
+# name: file/sheet name; version: anything that changes when the data does;
+# chunks: zero-argument callable returning an iterator of DataFrames
+ExportSection = collections.namedtuple('ExportSection', ['name', 'version', 'chunks'])
+
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+ZIP_MIME = 'application/zip'
+
+# ============================================================================
+# SECTIONS
+# ============================================================================
+
+def frame_section(name, df, version, chunk_rows=CHUNK_ROWS):
+    """An in-memory DataFrame, handed out as row slices (views, not copies)"""
+    return ExportSection(name, version, lambda: (df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows)))
+
+
+def parquet_section(name, path, chunk_rows=CHUNK_ROWS):
+    """A catalog file written by kelp_catalog.write_catalog, read batch by batch"""
+    from kelp_catalog import MONEY_COLUMNS
+
+    path = Path(path)
+    stat = path.stat()
+
+    def chunks():
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(str(path), memory_map=True)
+        cents = (pf.schema_arrow.metadata or {}).get(b'kelp_money') == b'cents'
+        for batch in pf.iter_batches(batch_size=chunk_rows):
+            df = batch.to_pandas()
+            if cents:
+                for c in MONEY_COLUMNS:
+                    if c in df.columns:
+                        df[c] = df[c] / 100
+            yield df
+
+    return ExportSection(name, (str(path.resolve()), stat.st_size, stat.st_mtime_ns), chunks)
+
+
+def audit_section(store, chunk_rows=CHUNK_ROWS):
+    """The whole audit log, oldest entry first"""
+    from kelp_audit import COLUMNS
+
+    def chunks():
+        for rows in store.iter_batches(chunk_rows):
+            yield pd.DataFrame(rows, columns=COLUMNS)
+
+    return ExportSection("audit_log", store.last_seq(), chunks)
+
+
+def quote_sections(store, chunk_rows=CHUNK_ROWS):
+    """Saved quotes and their line items, as two sections"""
+    version = store.last_id()
+
+    def chunks(table):
+        return lambda: (pd.DataFrame(rows) for rows in store.iter_batches(table, chunk_rows))
+
+    return [ExportSection("quotes", version, chunks('quotes')), ExportSection("quote_lines", version, chunks('lines'))]
+
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+
+def _plain(chunk):
+    """Categoricals as plain values, so chunks agree on one schema"""
+    cats = [c for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype)]
+    return chunk.astype({c: chunk[c].cat.categories.dtype for c in cats}) if cats else chunk
+
+
+def write_csv(section, fh):
+    text = io.TextIOWrapper(fh, encoding='utf-8', newline='')
+    header = True
+    for chunk in section.chunks():
+        chunk.to_csv(text, header=header, index=False)
+        header = False
+    text.flush()
+    text.detach()
+
+
+def write_parquet(section, fh):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    for chunk in section.chunks():
+        table = pa.Table.from_pandas(_plain(chunk), preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(fh, table.schema)
+        writer.write_table(table.cast(writer.schema))
+    if writer is not None:
+        writer.close()
+
+
+def write_xlsx(sections, fh):
+    """Workbook in openpyxl write-only mode: rows go straight to the sheet XML"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for section in sections:
+        ws = wb.create_sheet(section.name[:31])
+        header = False
+        for chunk in section.chunks():
+            if not header:
+                ws.append([str(c) for c in chunk.columns])
+                header = True
+            values = _plain(chunk).astype(object)
+            values = values.where(values.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                ws.append([v.item() if isinstance(v, np.generic) else v for v in row])
+    wb.save(fh)
+
+
+_WRITERS = {'csv': write_csv, 'parquet': write_parquet}
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def export_name(fmt, n_sections=1, stem="kelp_export"):
+    """(file name, mime type) of an export with n_sections sections"""
+    ext, mime = EXPORT_FORMATS[fmt]
+    if ext != 'xlsx' and n_sections > 1:
+        return f"{stem}.zip", ZIP_MIME
+    return f"{stem}.{ext}", mime
+
+
+def write_export(sections, fmt, path):
+    """Write an export to path, one chunk at a time"""
+    ext, _ = EXPORT_FORMATS[fmt]
+    with open(path, 'wb') as fh:
+        if ext == 'xlsx':
+            write_xlsx(sections, fh)
+        elif len(sections) == 1:
+            _WRITERS[ext](sections[0], fh)
+        else:
+            with zipfile.ZipFile(fh, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for section in sections:
+                    # Parquet wants a seekable file, so each member is staged on disk
+                    with tempfile.TemporaryFile() as part:
+                        _WRITERS[ext](section, part)
+                        part.seek(0)
+                        with zf.open(f"{section.name}.{ext}", 'w', force_zip64=True) as member:
+                            while block := part.read(1 << 20):
+                                member.write(block)
+
+
+class ExportCache:
+    """Finished exports on disk, keyed by format and section versions"""
+
+    def __init__(self, root, max_files=CACHE_FILES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_files = max_files
+
+    def key(self, sections, fmt):
+        parts = [fmt] + [f"{s.name}={s.version!r}" for s in sections]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+
+    def get(self, sections, fmt):
+        """Path of the export, writing it only if this exact version isn't cached"""
+        suffix = Path(export_name(fmt, len(sections))[0]).suffix
+        path = self.root / f"{self.key(sections, fmt)}{suffix}"
+        if path.exists():
+            os.utime(path)
+            return path
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.part')
+        os.close(fd)
+        try:
+            write_export(sections, fmt, tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._prune()
+        return path
+
+    def _prune(self):
+        files = sorted((p for p in self.root.iterdir() if p.suffix != '.part'), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in files[self.max_files:]:
+            old.unlink(missing_ok=True)
+
+
+def get_export_cache():
+    return ExportCache(data_path("exports"))
@@ -0,0 +1,370 @@
+"""
+KELP Laboratory Services - Lab Site Catalogs
+One catalog per lab site, stored as a memory-mapped Parquet file under
+<KELP_DATA_DIR>/labs. Catalogs load on first use, and the most recently used
+stay in a bounded LRU together with their search index, metrics and cost
+model, so switching back to a warm site is a dictionary lookup.
+
+The built-in catalog (or KELP_CATALOG) is always available as DEFAULT_LAB and
+shares the process-wide singletons of kelp_search, kelp_metrics and
+kelp_costmodel. Tests are matched across sites by TEST_KEY, since sites may
+run different methods for the same analyte.
+
+Usage:  python -m kelp_labs add SITE catalog.parquet|.csv|.xlsx
+        python -m kelp_labs list
+"""
+
+import argparse
+import collections
+import functools
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from kelp_catalog import MONEY_COLUMNS, apply_price_overlay, get_base_catalog, read_catalog, write_catalog
+from kelp_config import DEFAULT_LAB, data_path
+from kelp_prices import get_price_store
+
+MAX_LABS = 8                # catalogs kept loaded besides DEFAULT_LAB
+MAX_BYTES = 512 << 20       # ... and their combined catalog size
+PRICED_VERSIONS = 4         # shared priced catalogs kept per lab, newest price versions
+TEST_KEY = ['name', 'water_type']
+REQUIRED_COLUMNS = ['id', 'name', 'method', 'water_type', 'category', 'method_group', *MONEY_COLUMNS, 'margin_percent', 'tat', 'active']
+SITE_COLUMNS = ['lab', 'tests_offered', 'tests_missing', 'total', 'complete']
+OFFER_COLUMNS = ['name', 'water_type', 'lab', 'id', 'method', 'price']
+_LAB_CODE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,31}$')
+
+# ============================================================================
+# LAB CATALOGS
+# ============================================================================
+
+class LabCatalog:
+    """A site's catalog, plus the structures built from it on first use"""
+
+    def __init__(self, code, catalog):
+        self.code = code
+        self.catalog = catalog
+        self.nbytes = int(catalog.memory_usage(index=False).sum())
+        self._priced = collections.OrderedDict()   # price version -> (overlay, catalog, metrics)
+        self._priced_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        """True for the process-wide base catalog, whose structures are already singletons"""
+        return self.catalog is get_base_catalog()
+
+    @functools.cached_property
+    def ids(self):
+        return pd.Index(self.catalog['id'])
+
+    def positions(self, ids):
+        """Row positions of test ids in this catalog (-1 if missing)"""
+        return self.ids.get_indexer(list(ids))
+
+    @functools.cached_property
+    def search(self):
+        from kelp_search import CatalogSearchIndex, get_search_index
+        return get_search_index() if self.shared else CatalogSearchIndex(self.catalog)
+
+    @functools.cached_property
+    def metrics(self):
+        from kelp_metrics import CatalogMetrics, get_base_metrics
+        return get_base_metrics() if self.shared else CatalogMetrics(self.catalog)
+
+    def priced(self, overlay, version):
+        """(catalog, metrics) with the price store's {test id: price} edits as of
+        `version` applied. Built once and shared by every session at that
+        version, so sessions hold no catalog copy of their own; never mutate
+        either.
+        """
+        if not overlay:
+            return self.catalog, self.metrics
+        with self._priced_lock:
+            hit = self._priced.get(version)
+            if hit is None and self._priced:
+                # The same prices reached at another store version (saves in other labs move it too)
+                newest = next(reversed(self._priced.values()))
+                hit = newest if newest[0] == overlay else None
+            if hit is not None:
+                self._priced[version] = hit
+                self._priced.move_to_end(version)
+                return hit[1], hit[2]
+
+        df = apply_price_overlay(self.catalog, overlay)
+        pos = self.positions(overlay)
+        pos = pos[pos >= 0]
+        metrics = self.metrics.copy()
+        metrics.apply_price_changes(pos, self.catalog['price'].to_numpy()[pos], df['price'].to_numpy()[pos],
+                                    self.catalog['margin_percent'].to_numpy()[pos], df['margin_percent'].to_numpy()[pos])
+        with self._priced_lock:
+            self._priced[version] = (dict(overlay), df, metrics)
+            self._priced.move_to_end(version)
+            while len(self._priced) > PRICED_VERSIONS:
+                self._priced.popitem(last=False)
+        return df, metrics
+
+    @functools.cached_property
+    def cost_model(self):
+        from kelp_costmodel import CostModel, get_cost_model
+        return get_cost_model() if self.shared else CostModel(self.catalog)
+
+
+@functools.lru_cache(maxsize=1)
+def default_lab():
+    return LabCatalog(DEFAULT_LAB, get_base_catalog())
+
+
+def validate_lab_catalog(df):
+    """Raise ValueError unless df has every catalog column and unique test ids"""
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Lab catalog is missing columns: {missing}")
+    if df['id'].duplicated().any():
+        raise ValueError(f"Lab catalog has duplicate test ids: {df.loc[df['id'].duplicated(), 'id'].head(5).tolist()}")
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class CatalogRegistry:
+    """Lab catalogs on disk, loaded lazily into a bounded LRU"""
+
+    def __init__(self, root, max_labs=MAX_LABS, max_bytes=MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_labs, self.max_bytes = max_labs, max_bytes
+        self._loaded = collections.OrderedDict()   # code -> (file mtime, LabCatalog)
+        self._lock = threading.Lock()
+        self._counts = collections.Counter()
+        self._vocab = {}        # (name, water_type) -> registry-wide key code
+        self._indexes = {}      # code -> (file mtime, price version, price edits, price index), see _price_index
+
+    def path(self, code):
+        if not _LAB_CODE.match(code or ''):
+            raise ValueError(f"Invalid lab code {code!r}: use up to 32 letters, digits, '-' or '_'")
+        return self.root / f"{code}.parquet"
+
+    def labs(self):
+        """DEFAULT_LAB first, then every site on disk"""
+        return [DEFAULT_LAB] + sorted(p.stem for p in self.root.glob('*.parquet') if p.stem != DEFAULT_LAB)
+
+    def add(self, code, df):
+        """Write (or replace) a site's catalog, sorted by test id like the base catalog"""
+        if code == DEFAULT_LAB:
+            raise ValueError(f"{DEFAULT_LAB} is the built-in catalog and cannot be replaced")
+        path = self.path(code)
+        validate_lab_catalog(df)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.part')
+        os.close(fd)
+        try:
+            write_catalog(df.sort_values('id', kind='stable', ignore_index=True), tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock:
+            self._loaded.pop(code, None)
+            self._indexes.pop(code, None)
+
+    def remove(self, code):
+        self.path(code).unlink(missing_ok=True)
+        with self._lock:
+            self._loaded.pop(code, None)
+            self._indexes.pop(code, None)
+
+    def get(self, code=DEFAULT_LAB):
+        """A site's LabCatalog, loaded from disk only if it isn't warm (or the file changed)"""
+        if code == DEFAULT_LAB:
+            return default_lab()
+        path = self.path(code)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise ValueError(f"Unknown lab {code!r}; known labs: {self.labs()}") from None
+        with self._lock:
+            hit = self._loaded.get(code)
+            if hit is not None and hit[0] == mtime:
+                self._loaded.move_to_end(code)
+                self._counts['hits'] += 1
+                return hit[1]
+
+        catalog = read_catalog(path)
+        catalog.attrs['version'] = f"{code}:{mtime}"
+        lab = LabCatalog(code, catalog)
+        with self._lock:
+            self._counts['loads'] += 1
+            self._loaded[code] = (mtime, lab)
+            self._loaded.move_to_end(code)
+            used = sum(l.nbytes for _, l in self._loaded.values())
+            while len(self._loaded) > 1 and (len(self._loaded) > self.max_labs or used > self.max_bytes):
+                _, (_, old) = self._loaded.popitem(last=False)
+                used -= old.nbytes
+                self._counts['evictions'] += 1
+        return lab
+
+    def stats(self):
+        with self._lock:
+            loaded = list(self._loaded)
+            return {'labs': len(self.labs()), 'loaded': loaded, 'loaded_bytes': sum(l.nbytes for _, l in self._loaded.values()),
+                    'hits': self._counts['hits'], 'loads': self._counts['loads'], 'evictions': self._counts['evictions']}
+
+    # ------------------------------------------------------------- cross-lab
+
+    def _key_codes(self, keys):
+        """Registry-wide integer code for each (name, water_type) key, -1 if no site has it"""
+        return np.fromiter((self._vocab.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+
+    def _price_index(self, code, price_version):
+        """A site's active tests as (sorted key codes, prices, row positions) at the
+        site's shared prices, built once per file version and set of saved price edits.
+        price_version is the price store's version, read once per query.
+
+        About 16 bytes per test, so cross-site queries never load catalogs.
+        """
+        if code == DEFAULT_LAB:
+            version, df = 0, default_lab().catalog
+        else:
+            version, df = self.path(code).stat().st_mtime_ns, None
+        with self._lock:
+            cached = self._indexes.get(code)
+        if cached is not None and cached[:2] == (version, price_version):
+            return cached[3]
+        overlay, price_version = get_price_store().snapshot(code)
+        if cached is not None and cached[0] == version and cached[2] == overlay:
+            # the store moved on for another site's edits
+            with self._lock:
+                self._indexes[code] = (version, price_version, overlay, cached[3])
+            return cached[3]
+
+        if df is None:
+            import pyarrow.parquet as pq
+            df = pq.read_table(str(self.path(code)), columns=['id', *TEST_KEY, 'price', 'active'], memory_map=True).to_pandas()
+            df['price'] = df['price'] / 100
+        rows = np.flatnonzero(df['active'].to_numpy(dtype=bool))
+        keys = zip(df['name'].astype(str).to_numpy()[rows].tolist(), df['water_type'].astype(str).to_numpy()[rows].tolist())
+        with self._lock:
+            codes = np.fromiter((self._vocab.setdefault(k, len(self._vocab)) for k in keys), dtype=np.int64, count=len(rows))
+        prices = df['price'].to_numpy(dtype=float, copy=True)
+        if overlay:
+            pos = pd.Index(df['id']).get_indexer(list(overlay))
+            keep = pos >= 0
+            prices[pos[keep]] = np.fromiter(overlay.values(), dtype=float, count=len(overlay))[keep]
+        prices = prices[rows]
+        # a site listing a test twice (e.g. two methods) offers its cheaper one
+        order = np.lexsort((prices, codes))
+        codes, prices, rows = codes[order], prices[order], rows[order]
+        first = np.r_[True, codes[1:] != codes[:-1]]
+        index = (codes[first].astype(np.int32), prices[first], rows[first].astype(np.int32))
+        with self._lock:
+            self._indexes[code] = (version, price_version, overlay, index)
+        return index
+
+    def _hits(self, keys, labs):
+        """Distinct keys, and per offer: key position, site position in labs, price, row"""
+        keys = list(dict.fromkeys(keys))
+        price_version = get_price_store().version()
+        indexes = [self._price_index(code, price_version) for code in labs]
+        wanted = self._key_codes(keys)
+        key_pos, site, price, row = [np.zeros(0, dtype=np.intp)], [np.zeros(0, dtype=np.intp)], [np.zeros(0)], [np.zeros(0, dtype=np.int32)]
+        for k, (codes, prices, rows) in enumerate(indexes):
+            if not len(codes):
+                continue
+            pos = np.searchsorted(codes, wanted).clip(0, len(codes) - 1)
+            hit = np.flatnonzero((wanted >= 0) & (codes[pos] == wanted))
+            key_pos.append(hit)
+            site.append(np.full(len(hit), k, dtype=np.intp))
+            price.append(prices[pos[hit]])
+            row.append(rows[pos[hit]])
+        return keys, np.concatenate(key_pos), np.concatenate(site), np.concatenate(price), np.concatenate(row)
+
+    def offers(self, keys, labs=None):
+        """Each site's price for each (name, water_type) key: name, water_type, lab, price, row"""
+        labs = labs or self.labs()
+        keys, key_pos, site, price, row = self._hits([tuple(map(str, k)) for k in keys], labs)
+        out = pd.DataFrame([keys[k] for k in key_pos.tolist()], columns=TEST_KEY, dtype=object)
+        return out.assign(lab=np.array(labs, dtype=object)[site], price=price, row=row)
+
+    def cheapest_per_test(self, keys, labs=None):
+        """The cheapest site for each test, with that site's test id and method"""
+        best = self.offers(keys, labs).sort_values(['price', 'lab'], kind='stable').drop_duplicates(TEST_KEY)
+        ids, methods = np.zeros(len(best), dtype=np.int64), np.empty(len(best), dtype=object)
+        for code, rows in best.groupby('lab', sort=False).indices.items():
+            detail = self._rows(code, best['row'].to_numpy()[rows])
+            ids[rows], methods[rows] = detail['id'].to_numpy(), detail['method'].astype(str).to_numpy()
+        best = best.assign(id=ids, method=methods)
+        return best.sort_values(TEST_KEY, ignore_index=True)[OFFER_COLUMNS]
+
+    def _rows(self, code, rows):
+        """id and method of a few rows of a site, without loading the site into the LRU"""
+        with self._lock:
+            hit = self._loaded.get(code)
+        if code == DEFAULT_LAB or hit is not None:
+            return (default_lab() if code == DEFAULT_LAB else hit[1]).catalog[['id', 'method']].take(rows)
+        import pyarrow.parquet as pq
+        return pq.read_table(str(self.path(code)), columns=['id', 'method'], memory_map=True).take(rows).to_pandas()
+
+    def cheapest_sites(self, keys, qty=None, labs=None):
+        """Sites ranked for a whole test list: those offering every test first, then by total price"""
+        labs = labs or self.labs()
+        keys = [tuple(map(str, k)) for k in keys]
+        distinct, key_pos, site, price, _ = self._hits(keys, labs)
+        # quantities of repeated keys add up
+        lookup = {k: i for i, k in enumerate(distinct)}
+        qty = np.bincount([lookup[k] for k in keys], np.broadcast_to(1.0 if qty is None else np.asarray(qty, dtype=float), len(keys)),
+                          minlength=len(distinct))
+        offered = np.bincount(site, minlength=len(labs))
+        total = np.bincount(site, price * qty[key_pos], minlength=len(labs)).astype(float).round(2)
+        sites = pd.DataFrame({'lab': labs, 'tests_offered': offered, 'tests_missing': len(distinct) - offered, 'total': total})
+        sites['complete'] = sites['tests_missing'] == 0
+        return sites.sort_values(['complete', 'total'], ascending=[False, True], ignore_index=True)[SITE_COLUMNS]
+
+
+@functools.lru_cache(maxsize=1)
+def get_registry():
+    return CatalogRegistry(data_path("labs"))
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def read_lab_file(src):
+    """A site catalog from CSV or Excel (a path or an uploaded file), or a Parquet path in write_catalog layout"""
+    name = str(getattr(src, 'name', src)).lower()
+    if name.endswith('.parquet'):
+        return read_catalog(src)
+    if name.endswith(('.xlsx', '.xlsm', '.xls')):
+        return pd.read_excel(src)
+    return pd.read_csv(src)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage lab site catalogs")
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add', help="add or replace a site's catalog")
+    add.add_argument('code', help="site code, e.g. SJ-01")
+    add.add_argument('file', help="Parquet, CSV or XLSX catalog")
+    rm = sub.add_parser('remove', help="remove a site")
+    rm.add_argument('code')
+    sub.add_parser('list', help="list sites")
+    args = parser.parse_args(argv)
+
+    registry = get_registry()
+    if args.command == 'add':
+        df = read_lab_file(args.file)
+        registry.add(args.code, df)
+        print(f"Added {args.code}: {len(df):,} tests")
+    elif args.command == 'remove':
+        registry.remove(args.code)
+        print(f"Removed {args.code}")
+    else:
+        for code in registry.labs():
+            print(f"{code:<12} {len(registry.get(code).catalog):>9,} tests")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+KELP Laboratory Services - Metals Panel Pricing
+Per-method tier tables for the ICP-MS individual-element panels. Tables are
+validated once per process and every (method, elements, qty) price is
+memoized, so the calculator and quote pages never recompute a panel.
+"""
+
+import functools
+from collections import namedtuple
+
+POTABLE_METALS = ["Aluminum", "Antimony", "Arsenic", "Barium", "Beryllium", "Cadmium", "Chromium", "Cobalt", "Copper", "Lead", "Manganese", "Mercury", "Molybdenum", "Nickel", "Selenium", "Silver", "Thallium", "Thorium", "Uranium", "Vanadium", "Zinc"]
+NONPOTABLE_METALS = ["Aluminum", "Antimony", "Arsenic", "Barium", "Beryllium", "Boron", "Cadmium", "Calcium", "Chromium", "Cobalt", "Copper", "Iron", "Lead", "Magnesium", "Manganese", "Mercury", "Nickel", "Potassium", "Selenium", "Silicon", "Silver", "Sodium", "Thallium", "Vanadium", "Uranium", "Zinc"]
+
+# first:       price of the first element
+# additional:  (from element count, price per element) volume breaks
+# surcharges:  extra charge per element, e.g. {"Mercury": 15.00}
+# qty_breaks:  (min samples, discount %) on the line total
+METALS_PANELS = {
+    "EPA 200.8": {'water_type': "Potable", 'label': "Potable Water - EPA 200.8", 'elements': POTABLE_METALS, 'first': 70.00, 'additional': [(2, 12.00)], 'surcharges': {}, 'qty_breaks': []},
+    "EPA 6020B": {'water_type': "Non-Potable", 'label': "Non-Potable - EPA 6020B", 'elements': NONPOTABLE_METALS, 'first': 130.00, 'additional': [(2, 45.00)], 'surcharges': {}, 'qty_breaks': []},
+}
+WATER_TYPE_METHODS = {panel['water_type']: method for method, panel in METALS_PANELS.items()}
+
+MetalsPrice = namedtuple('MetalsPrice', ['method', 'count', 'unit_price', 'qty', 'discount_percent', 'total'])
+
+
+@functools.lru_cache(maxsize=1)
+def get_metals_tables():
+    """Validated, sorted copies of METALS_PANELS, built once"""
+    tables = {}
+    for method, panel in METALS_PANELS.items():
+        elements = frozenset(panel['elements'])
+        unknown = set(panel['surcharges']) - elements
+        if unknown:
+            raise ValueError(f"{method}: surcharges for elements not on the panel: {sorted(unknown)}")
+        tiers = sorted(panel['additional'])
+        if not tiers or tiers[0][0] != 2:
+            raise ValueError(f"{method}: additional-element tiers must start at the 2nd element")
+        # per-element price for the 1st..Nth element, so a count prices with one sum
+        steps = [panel['first']]
+        for k in range(2, len(elements) + 1):
+            steps.append(next(p for start, p in reversed(tiers) if start <= k))
+        cumulative = [0.0]
+        for p in steps:
+            cumulative.append(cumulative[-1] + p)
+        tables[method] = {**panel, 'elements': elements, 'additional': tiers, 'cumulative': cumulative, 'qty_breaks': sorted(panel['qty_breaks'])}
+    return tables
+
+
+def schedule_label(method):
+    """Short price schedule caption generated from the tier table"""
+    t = get_metals_tables()[method]
+    extra = " then ".join(f"${p:.0f}/additional" if start == 2 else f"${p:.0f} from #{start}" for start, p in t['additional'])
+    return f"${t['first']:.0f} first + {extra}"
+
+
+@functools.lru_cache(maxsize=None)
+def _count_price(method, count):
+    return get_metals_tables()[method]['cumulative'][count]
+
+
+@functools.lru_cache(maxsize=8192)
+def price_metals_panel(method, elements, qty=1):
+    """Memoized panel price; elements must be a frozenset of names on the panel"""
+    t = get_metals_tables()[method]
+    unknown = elements - t['elements']
+    if unknown:
+        raise ValueError(f"{method} does not offer: {', '.join(sorted(unknown))}")
+    count = len(elements)
+    unit = _count_price(method, count) + sum(t['surcharges'].get(e, 0.0) for e in elements)
+    discount = next((pct for min_qty, pct in reversed(t['qty_breaks']) if qty >= min_qty), 0.0)
+    return MetalsPrice(method, count, unit, qty, discount, unit * qty * (1 - discount / 100))
+
+
+def calculate_metals_price(num_metals, water_type):
+    """Unit price for a panel of num_metals elements (no element surcharges)"""
+    if num_metals <= 0:
+        return 0.0
+    method = WATER_TYPE_METHODS["Potable" if water_type == "Potable" else "Non-Potable"]
+    return _count_price(method, min(num_metals, len(get_metals_tables()[method]['elements'])))
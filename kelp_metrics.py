@@ -0,0 +1,110 @@
+"""
+KELP Laboratory Services - Dashboard Metrics
+Running per-category counts and sums, a fixed-bin margin histogram and the
+low-margin set, updated in O(changed rows) on each price edit. Finished
+figures are cached on the metrics object until the next update.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from kelp_catalog import get_base_catalog
+
+LOW_MARGIN_THRESHOLD = 40.0
+# Fixed 5-point margin bins; values outside the range land in the edge bins
+HIST_EDGES = np.arange(-100.0, 105.0, 5.0)
+
+
+def _bins(margins):
+    return np.clip(np.searchsorted(HIST_EDGES, margins, side='right') - 1, 0, len(HIST_EDGES) - 2)
+
+
+class CatalogMetrics:
+    """Aggregates over the active rows of a catalog, addressed by row position"""
+
+    def __init__(self, df, low_margin=LOW_MARGIN_THRESHOLD):
+        self.low_margin = low_margin
+        codes, uniques = pd.factorize(df['category'])
+        self.categories = list(uniques)
+        self.codes = codes
+        self.active = df['active'].to_numpy(dtype=bool)
+        n = len(self.categories)
+        price = df['price'].to_numpy(dtype=float)
+        margin = df['margin_percent'].to_numpy(dtype=float)
+        w = self.active.astype(float)
+        self.count = np.bincount(codes, weights=w, minlength=n)
+        self.price_sum = np.bincount(codes, weights=price * w, minlength=n)
+        self.cost_sum = np.bincount(codes, weights=df['total_cost'].to_numpy(dtype=float) * w, minlength=n)
+        self.margin_sum = np.bincount(codes, weights=margin * w, minlength=n)
+        self.hist = np.bincount(_bins(margin[self.active]), minlength=len(HIST_EDGES) - 1)
+        self.low = self.active & (margin < low_margin)
+        self.revision = 0
+        self._figures = {}
+
+    def copy(self):
+        other = object.__new__(CatalogMetrics)
+        other.__dict__.update(self.__dict__)
+        for attr in ['count', 'price_sum', 'cost_sum', 'margin_sum', 'hist', 'low']:
+            setattr(other, attr, getattr(self, attr).copy())
+        other._figures = {}
+        return other
+
+    def apply_price_changes(self, positions, old_price, new_price, old_margin, new_margin):
+        """Fold a batch of price edits into the running aggregates"""
+        positions = np.asarray(positions)
+        keep = self.active[positions]
+        positions = positions[keep]
+        codes = self.codes[positions]
+        old_margin, new_margin = np.asarray(old_margin)[keep], np.asarray(new_margin)[keep]
+        np.add.at(self.price_sum, codes, np.asarray(new_price)[keep] - np.asarray(old_price)[keep])
+        np.add.at(self.margin_sum, codes, new_margin - old_margin)
+        np.subtract.at(self.hist, _bins(old_margin), 1)
+        np.add.at(self.hist, _bins(new_margin), 1)
+        self.low[positions] = new_margin < self.low_margin
+        self.revision += 1
+        self._figures.clear()
+
+    def totals(self):
+        n = self.count.sum()
+        return {
+            'count': int(n),
+            'avg_price': self.price_sum.sum() / n if n else 0.0,
+            'avg_cost': self.cost_sum.sum() / n if n else 0.0,
+            'avg_margin': self.margin_sum.sum() / n if n else 0.0,
+        }
+
+    def category_summary(self):
+        """Per-category Count / Avg Price / Avg Margin %, like groupby('category').agg"""
+        has = self.count > 0
+        count = self.count[has]
+        summary = pd.DataFrame({
+            'Count': count.astype(int),
+            'Avg Price': self.price_sum[has] / count,
+            'Avg Margin %': self.margin_sum[has] / count,
+        }, index=pd.Index(np.asarray(self.categories, dtype=object)[has], name='category'))
+        return summary.sort_index().round(2)
+
+    def margin_histogram(self):
+        """(bin start, bin end, count) for the occupied span of the histogram"""
+        nz = np.flatnonzero(self.hist)
+        if not len(nz):
+            return pd.DataFrame(columns=['start', 'end', 'count'])
+        lo, hi = nz[0], nz[-1] + 1
+        return pd.DataFrame({'start': HIST_EDGES[lo:hi], 'end': HIST_EDGES[lo + 1:hi + 1], 'count': self.hist[lo:hi]})
+
+    def low_margin_positions(self):
+        return np.flatnonzero(self.low)
+
+    def figure(self, name, build):
+        """Cached build(self) result, discarded on the next price change"""
+        if name not in self._figures:
+            self._figures[name] = build(self)
+        return self._figures[name]
+
+
+@functools.lru_cache(maxsize=1)
+def get_base_metrics():
+    """Metrics for the shared base catalog; sessions copy them on their first edit"""
+    return CatalogMetrics(get_base_catalog())
@@ -0,0 +1,95 @@
+"""
+KELP Laboratory Services - PDF Quote Renderer
+ReportLab imports, styles, colors and static table styles are built once per
+process by get_pdf_template(); each quote then only lays out its own rows.
+"""
+
+import functools
+import io
+from types import SimpleNamespace
+
+from kelp_core import quote_totals
+from kelp_tat import rush_footer
+
+RUSH_FOOTER = rush_footer()
+LOGO_HTML = '<b>KETOS</b><br/><font size="8">ENVIRONMENTAL LAB SERVICES</font><br/><font size="7">520 Mercury Dr, Sunnyvale, CA 94085<br/>Email: info@ketoslab.com</font>'
+
+
+@functools.lru_cache(maxsize=1)
+def get_pdf_template():
+    """ReportLab classes plus the shared styles every quote uses"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.enums import TA_CENTER
+
+    header_blue = colors.HexColor('#4A90A4')
+    light_blue = colors.HexColor('#E8F4F8')
+    dark_blue = colors.HexColor('#1B3B6F')
+    return SimpleNamespace(
+        letter=letter, inch=inch, colors=colors,
+        SimpleDocTemplate=SimpleDocTemplate, Table=Table, TableStyle=TableStyle, Paragraph=Paragraph, Spacer=Spacer,
+        header_blue=header_blue, light_blue=light_blue, dark_blue=dark_blue,
+        normal=ParagraphStyle('Normal', fontSize=10),
+        bold=ParagraphStyle('Bold', fontSize=10, fontName='Helvetica-Bold'),
+        small=ParagraphStyle('Small', fontSize=8, textColor=colors.HexColor('#666666')),
+        logo=ParagraphStyle('Logo', fontSize=12, textColor=dark_blue),
+        centered=ParagraphStyle('C', alignment=TA_CENTER, fontSize=10),
+        header_style=TableStyle([('VALIGN', (0,0), (-1,-1), 'MIDDLE'), ('BOX', (2,0), (3,0), 1, header_blue), ('BACKGROUND', (2,0), (3,0), light_blue)]),
+        item_style=[('BACKGROUND', (0,0), (-1,0), header_blue), ('TEXTCOLOR', (0,0), (-1,0), colors.white), ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'), ('ALIGN', (2,1), (-1,-1), 'CENTER'), ('BOX', (0,0), (-1,-1), 1, header_blue), ('LINEBELOW', (0,0), (-1,0), 1, header_blue)],
+        totals_style=TableStyle([('ALIGN', (4,0), (-1,-1), 'RIGHT'), ('FONTNAME', (4,2), (-1,2), 'Helvetica-Bold'), ('BOX', (4,2), (-1,2), 2, dark_blue), ('BACKGROUND', (4,2), (-1,2), light_blue)]),
+        item_widths=[2.5*inch, 1*inch, 0.5*inch, 0.9*inch, 1.3*inch, 0.8*inch],
+    )
+
+
+def generate_pdf_quote(quote_data):
+    t = get_pdf_template()
+    inch, Paragraph, Table, Spacer = t.inch, t.Paragraph, t.Table, t.Spacer
+    normal = t.normal
+
+    buffer = io.BytesIO()
+    doc = t.SimpleDocTemplate(buffer, pagesize=t.letter, topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.5*inch, rightMargin=0.5*inch)
+    elements = []
+
+    # Header
+    header = [[Paragraph(LOGO_HTML, t.logo), '', Paragraph(f'<b>DATE</b><br/>{quote_data["date"]}', t.centered), Paragraph(f'<b>QUOTE NO.</b><br/>{quote_data["quote_number"]}', t.centered)]]
+    ht = Table(header, colWidths=[3*inch, 1.5*inch, 1.25*inch, 1.75*inch])
+    ht.setStyle(t.header_style)
+    elements.append(ht)
+    elements.append(Spacer(1, 20))
+
+    # Customer Info
+    info = [[Paragraph('<b>Prepared By</b>', normal), quote_data.get('prepared_by', '')], [Paragraph('<b>Account Name</b>', normal), quote_data.get('account_name', 'NA')], [Paragraph('<b>Contact Name</b>', normal), quote_data.get('contact_name', '')], [Paragraph('<b>KELP Contact</b>', normal), 'info@ketoslab.com']]
+    it = Table(info, colWidths=[1.5*inch, 6*inch])
+    elements.append(it)
+    elements.append(Spacer(1, 20))
+
+    # Items
+    items = [['DESCRIPTION', 'METHOD', 'QTY', 'LIST PRICE', 'TAT', 'TOTAL']]
+    for item in quote_data['items']:
+        items.append([Paragraph(item['description'], normal), item['method'], str(item['qty']), f"${item['price']:.2f}", item['tat'], f"${item['total']:.2f}"])
+
+    imt = Table(items, colWidths=t.item_widths)
+    style = list(t.item_style)
+    for i in range(2, len(items), 2):
+        style.append(('BACKGROUND', (0,i), (-1,i), t.light_blue))
+    imt.setStyle(t.TableStyle(style))
+    elements.append(imt)
+    elements.append(Spacer(1, 10))
+
+    # Totals
+    totals = quote_totals(quote_data['subtotal'], quote_data.get('discount_percent', 0))
+    tots = [['', '', '', '', 'Subtotal:', f"${totals['subtotal']:,.2f}"], ['', '', '', '', f"Discount ({totals['discount_percent']:.1f}%):", f"-${totals['discount_amount']:,.2f}"], ['', '', '', '', 'TOTAL:', f"${totals['total']:,.2f}"]]
+    tt = Table(tots, colWidths=t.item_widths)
+    tt.setStyle(t.totals_style)
+    elements.append(tt)
+
+    # Rush info
+    elements.append(Spacer(1, 30))
+    elements.append(Paragraph('<b>Rush Surcharges:</b>', t.bold))
+    elements.append(Paragraph(f'<font size="8">{RUSH_FOOTER}</font>', t.small))
+
+    doc.build(elements)
+    return buffer.getvalue()
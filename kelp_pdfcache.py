@@ -0,0 +1,157 @@
+"""
+KELP Laboratory Services - Quote PDF Cache
+Rendered quote PDFs keyed by a canonical hash of what the PDF shows. A bounded
+in-memory LRU sits in front of a directory of PDFs, so an unchanged quote is
+rendered once, however many times it is generated or downloaded.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from kelp_config import data_path
+from kelp_core import generate_pdf_quote
+
+# Bump whenever kelp_pdf's layout changes, so old files stop matching
+RENDER_VERSION = 1
+HEADER_FIELDS = ('quote_number', 'date', 'prepared_by', 'account_name', 'contact_name', 'subtotal', 'discount_percent')
+ITEM_FIELDS = ('description', 'method', 'qty', 'price', 'tat', 'total')
+MEMORY_BYTES = 32 << 20
+DISK_BYTES = 256 << 20
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def _canonical(value):
+    """One spelling per value: 30, 30.0 and np.float64(30) hash alike"""
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return repr(float(value))
+    if isinstance(value, date):
+        return value.isoformat()
+    return value if value is None else str(value)
+
+
+def quote_key(quote_data):
+    """SHA-256 of the fields the PDF renders; other keys (test_id, elements, ...) don't count"""
+    header = [_canonical(quote_data.get(f)) for f in HEADER_FIELDS]
+    items = [[_canonical(item.get(f)) for f in ITEM_FIELDS] for item in quote_data['items']]
+    payload = json.dumps([RENDER_VERSION, header, items], separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class PdfCache:
+    """Quote PDFs in memory (LRU, bounded by bytes) over a directory (bounded by bytes, oldest use evicted)"""
+
+    def __init__(self, root, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES, render=generate_pdf_quote):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.memory_bytes, self.disk_bytes = memory_bytes, disk_bytes
+        self._render = render
+        self._memory = collections.OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._counts = collections.Counter()
+        self._render_seconds = 0.0
+        self._disk_used = None
+
+    def get(self, quote_data):
+        """PDF bytes for a quote, rendering only if this exact content was never cached"""
+        key = quote_key(quote_data)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counts['memory_hits'] += 1
+                return data
+
+        path = self.root / f"{key}.pdf"
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            tier = 'disk_hits'
+        except FileNotFoundError:
+            t0 = time.perf_counter()
+            data = self._render(quote_data)
+            elapsed = time.perf_counter() - t0
+            self._write(path, data)
+            tier = 'misses'
+            with self._lock:
+                self._render_seconds += elapsed
+
+        with self._lock:
+            self._counts[tier] += 1
+            self._remember(key, data)
+        return data
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_bytes or key in self._memory:
+            return
+        self._memory[key] = data
+        self._memory_used += len(data)
+        while self._memory_used > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_used -= len(old)
+
+    def _write(self, path, data):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock:
+            if self._disk_used is None:
+                self._disk_used = sum(p.stat().st_size for p in self.root.glob('*.pdf'))
+            else:
+                self._disk_used += len(data)
+            if self._disk_used > self.disk_bytes:
+                self._prune()
+
+    def _prune(self):
+        """Drop least recently used files down to 90% of the budget (the directory is only listed here)"""
+        files = sorted(((p, p.stat()) for p in self.root.glob('*.pdf')), key=lambda f: f[1].st_mtime, reverse=True)
+        used, full = 0, False
+        for path, stat in files:
+            full = full or used + stat.st_size > self.disk_bytes * 0.9
+            if full:
+                path.unlink(missing_ok=True)
+            else:
+                used += stat.st_size
+        self._disk_used = used
+
+    def stats(self):
+        """Hit counts, hit rate and render time since start-up"""
+        with self._lock:
+            counts, render_seconds = dict(self._counts), self._render_seconds
+            entries, used = len(self._memory), self._memory_used
+        memory_hits, disk_hits, misses = (counts.get(k, 0) for k in ('memory_hits', 'disk_hits', 'misses'))
+        requests = memory_hits + disk_hits + misses
+        return {
+            'requests': requests, 'memory_hits': memory_hits, 'disk_hits': disk_hits, 'misses': misses,
+            'hit_rate': (memory_hits + disk_hits) / requests if requests else 0.0,
+            'render_seconds': render_seconds,
+            'avg_render_ms': render_seconds / misses * 1000 if misses else 0.0,
+            'memory_entries': entries, 'memory_bytes': used,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_pdf_cache():
+    return PdfCache(data_path("pdf_cache"))
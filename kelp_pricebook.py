@@ -0,0 +1,196 @@
+"""
+KELP Laboratory Services - Versioned Price Books
+A price book is an immutable delta against a lab's catalog: sorted test ids
+and their prices. Snapshot, diff, rollback and what-if all cost O(changed
+rows) and never copy the catalog. Books are saved as .npz files, in one
+directory per lab.
+"""
+
+import functools
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from kelp_catalog import get_base_catalog
+from kelp_config import data_path
+from kelp_labs import DEFAULT_LAB, get_registry
+from kelp_pricing import adjust_prices, compute_margins
+
+DIFF_COLUMNS = ['id', 'name', 'method', 'category', 'old_price', 'new_price', 'change', 'change_pct', 'old_margin', 'new_margin']
+
+
+class PriceBook:
+    """Read-only {test id: price} delta over a lab's catalog version"""
+
+    def __init__(self, name, ids, prices, base_version=None, created=None, note="", lab=DEFAULT_LAB):
+        ids = np.asarray(ids, dtype=np.int64)
+        prices = np.asarray(prices, dtype=float)
+        order = np.argsort(ids, kind='stable')
+        self.ids, self.prices = ids[order], prices[order]
+        self.ids.flags.writeable = False
+        self.prices.flags.writeable = False
+        self.name = name
+        # By default the version of the lab's catalog the book is taken against
+        self.base_version = base_version or get_registry().get(lab).catalog.attrs['version']
+        self.created = created or datetime.now().isoformat(timespec='seconds')
+        self.note = note
+        self.lab = lab
+
+    @classmethod
+    def from_overlay(cls, name, overlay, note="", lab=DEFAULT_LAB):
+        return cls(name, np.fromiter(overlay.keys(), dtype=np.int64, count=len(overlay)), np.fromiter(overlay.values(), dtype=float, count=len(overlay)), note=note, lab=lab)
+
+    def to_overlay(self):
+        return dict(zip(self.ids.tolist(), self.prices.tolist()))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def lookup(self, ids, base_prices):
+        """Effective prices for ids: this book's price where set, else the base price"""
+        ids = np.asarray(ids, dtype=np.int64)
+        out = np.broadcast_to(np.asarray(base_prices, dtype=float), ids.shape).copy()
+        if len(self.ids):
+            pos = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+            hit = self.ids[pos] == ids
+            out[hit] = self.prices[pos[hit]]
+        return out
+
+    def with_changes(self, name, ids, prices, note=""):
+        """New book = this book with ids overridden; this book is left untouched"""
+        ids = np.asarray(ids, dtype=np.int64)
+        keep = ~np.isin(self.ids, ids, assume_unique=True)
+        return PriceBook(name, np.concatenate([self.ids[keep], ids]), np.concatenate([self.prices[keep], prices]), self.base_version, note=note, lab=self.lab)
+
+
+def _sorted_union(a, b):
+    """Union of two sorted id arrays (a merge, cheaper than np.union1d's hashing)"""
+    merged = np.concatenate([a, b])
+    merged.sort(kind='stable')
+    if not len(merged):
+        return merged
+    keep = np.empty(len(merged), dtype=bool)
+    keep[0] = True
+    np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+    return merged[keep]
+
+
+def _base_rows(base, ids):
+    """Positions of ids in a base catalog, -1 for ids it does not have"""
+    base_ids = base['id'].to_numpy()
+    if not len(base_ids) or not (base_ids[1:] > base_ids[:-1]).all():
+        return pd.Index(base_ids).get_indexer(ids)
+    # Catalogs are normally sorted by id: a binary search, no index to build
+    pos = np.minimum(np.searchsorted(base_ids, ids), len(base_ids) - 1)
+    return np.where(base_ids[pos] == ids, pos, -1)
+
+
+def diff_books(old, new, base=None):
+    """Rows whose effective price differs between two books, as a DataFrame.
+
+    Ids in either book that base does not have (a book saved against another
+    catalog version) are left out and listed in the result's attrs['missing'].
+    """
+    base = base if base is not None else get_base_catalog()
+    ids = _sorted_union(old.ids, new.ids)
+    rows = _base_rows(base, ids)
+    missing = ids[rows < 0]
+    ids, rows = ids[rows >= 0], rows[rows >= 0]
+    base_prices = base['price'].to_numpy()[rows]
+    old_p, new_p = old.lookup(ids, base_prices), new.lookup(ids, base_prices)
+    changed = old_p != new_p
+    ids, rows, old_p, new_p = ids[changed], rows[changed], old_p[changed], new_p[changed]
+    costs = base['total_cost'].to_numpy()[rows]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_pct = np.where(old_p > 0, (new_p - old_p) / old_p * 100, np.nan)
+    out = pd.DataFrame({
+        'id': ids,
+        'name': base['name'].take(rows).to_numpy(),
+        'method': base['method'].take(rows).to_numpy(),
+        'category': base['category'].take(rows).to_numpy(),
+        'old_price': old_p,
+        'new_price': new_p,
+        'change': new_p - old_p,
+        'change_pct': change_pct,
+        'old_margin': compute_margins(old_p, costs),
+        'new_margin': compute_margins(new_p, costs),
+    }, columns=DIFF_COLUMNS)
+    out.attrs['missing'] = missing.tolist()
+    return out
+
+
+def what_if(book, ids, adjustment, value, price_point=None, base=None):
+    """Evaluate a bulk rule on a book for the given test ids without applying it.
+
+    Returns (proposed book, diff against the original book). Only the targeted
+    rows are read; the catalog itself is never copied. Ids base does not have
+    are skipped.
+    """
+    base = base if base is not None else get_base_catalog()
+    ids = np.asarray(ids, dtype=np.int64)
+    rows = _base_rows(base, ids)
+    ids, rows = ids[rows >= 0], rows[rows >= 0]
+    current = book.lookup(ids, base['price'].to_numpy()[rows])
+    costs = base['total_cost'].to_numpy()[rows]
+    proposed = adjust_prices(current, costs, np.ones(len(ids), dtype=bool), adjustment, value, price_point)
+    new_book = book.with_changes(f"{book.name} (what-if)", ids, proposed, note=f"{adjustment} {value}")
+    return new_book, diff_books(book, new_book, base)
+
+
+class PriceBookStore:
+    """Directory of saved price books: a subdirectory per lab, one .npz per book"""
+
+    def __init__(self, root):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Books saved before they were kept per lab were all DEFAULT_LAB's
+        loose = list(self.root.glob("*.npz"))
+        if loose:
+            self._dir(DEFAULT_LAB).mkdir(exist_ok=True)
+            for path in loose:
+                os.replace(path, self._dir(DEFAULT_LAB) / path.name)
+
+    def _dir(self, lab):
+        return self.root / lab
+
+    def _path(self, name, lab):
+        return self._dir(lab) / (re.sub(r"[^A-Za-z0-9_.-]+", "_", name) + ".npz")
+
+    def save(self, book):
+        """Write book, replacing a saved book of the same name.
+
+        File names keep only letters, digits, '_', '.' and '-', so "Q1 2026" and
+        "Q1/2026" would share a file; saving one while the other exists raises
+        ValueError instead of overwriting it.
+        """
+        path = self._path(book.name, book.lab)
+        if path.exists():
+            with np.load(path) as f:
+                saved = str(f['name'])
+            if saved != book.name:
+                raise ValueError(f"Price book name {book.name!r} clashes with the saved book {saved!r}; choose another name")
+        self._dir(book.lab).mkdir(exist_ok=True)
+        np.savez(path, ids=book.ids, prices=book.prices, name=book.name, base_version=book.base_version,
+                 created=book.created, note=book.note, lab=book.lab)
+
+    def load(self, name, lab=DEFAULT_LAB):
+        with np.load(self._path(name, lab)) as f:
+            if str(f['name']) != name:
+                raise ValueError(f"No price book named {name!r} for {lab}")
+            return PriceBook(str(f['name']), f['ids'], f['prices'], str(f['base_version']), str(f['created']), str(f['note']), lab)
+
+    def list(self, lab=DEFAULT_LAB):
+        """(name, created, rows, note) for every book saved for lab, newest first"""
+        books = []
+        for path in self._dir(lab).glob("*.npz"):
+            with np.load(path) as f:
+                books.append((str(f['name']), str(f['created']), len(f['ids']), str(f['note'])))
+        return sorted(books, key=lambda b: b[1], reverse=True)
+
+
+@functools.lru_cache(maxsize=1)
+def get_pricebook_store():
+    return PriceBookStore(data_path("pricebooks"))
@@ -0,0 +1,195 @@
+"""
+KELP Laboratory Services - Shared Price Store
+Price edits every session (and process) sees, in one SQLite file. Each saved
+batch advances a store-wide version and stamps its rows with it. Saves name
+the version the editor last synced, and are refused if another session has
+changed any of the same tests since (optimistic concurrency, row by row).
+Sessions catch up by reading only the rows stamped after their version; the
+version itself is checked without touching any table, so an idle store costs
+nothing to watch. numpy is imported only for changes_since, so kelp_core can
+read the store without it.
+"""
+
+import functools
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from kelp_config import PRICES_FILE, data_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_version (
+    id      INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO price_version (id, version) VALUES (0, 0);
+-- Current price per test; price NULL = back to the catalog price. seq is the
+-- version of the batch that last changed the row.
+CREATE TABLE IF NOT EXISTS prices (
+    lab     TEXT NOT NULL,
+    test_id INTEGER NOT NULL,
+    price   REAL,
+    seq     INTEGER NOT NULL,
+    changed TEXT NOT NULL,
+    editor  TEXT,
+    PRIMARY KEY (lab, test_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_prices_seq ON prices (lab, seq);
+"""
+
+
+class PriceConflict(ValueError):
+    """Another session changed some of the same tests after the editor's version.
+
+    conflicts maps test id -> (current price or None for the catalog price, version).
+    """
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        ids = sorted(conflicts)
+        super().__init__(f"{len(ids)} price(s) were changed by another user since you loaded them (test ids {ids[:10]}{'...' if len(ids) > 10 else ''}); review and save again")
+
+
+class PriceStore:
+    """Shared {test id: price} edits per lab, with per-row versions"""
+
+    def __init__(self, path, readonly=False):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        if readonly:
+            # For readers such as kelp_core: never creates, migrates or writes the file
+            self._conn = sqlite3.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False, isolation_level=None, timeout=30)
+        else:
+            # Autocommit; writes open their own BEGIN IMMEDIATE transaction
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        self._data_version = None
+        self._version = 0
+        self.saves = self.conflicts = 0
+
+    # ----------------------------------------------------------------- version
+
+    def _version_locked(self):
+        # data_version moves only when another connection commits; our own saves update _version directly
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._version = self._conn.execute("SELECT version FROM price_version").fetchone()[0]
+        return self._version
+
+    def version(self):
+        """Store version; changes with every saved batch, from any session or process"""
+        with self._lock:
+            return self._version_locked()
+
+    def wait(self, version, timeout=None, poll=0.25):
+        """Block until the store is past `version` or timeout seconds pass; returns the store version.
+
+        Saves through this store object wake waiters at once; saves from other
+        processes are noticed within `poll` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while (current := self._version_locked()) <= version:
+                left = poll if deadline is None else min(poll, deadline - time.monotonic())
+                if left <= 0:
+                    break
+                self._changed.wait(left)
+            return current
+
+    # ------------------------------------------------------------------- reads
+
+    def snapshot(self, lab):
+        """({test id: price} of every edited test, version) for a session starting in lab"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                version = self._conn.execute("SELECT version FROM price_version").fetchone()[0]
+                rows = self._conn.execute("SELECT test_id, price FROM prices WHERE lab = ? AND price IS NOT NULL", (lab,)).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+        return dict(rows), version
+
+    def changed_rows(self, lab, version):
+        """([(test id, price or None for the catalog price)], new version) for rows of lab
+        changed after version. Returns no rows, without a query, while the store is
+        still at version.
+        """
+        with self._lock:
+            if self._version_locked() == version:
+                return [], version
+            self._conn.execute("BEGIN")
+            try:
+                current = self._conn.execute("SELECT version FROM price_version").fetchone()[0]
+                rows = self._conn.execute("SELECT test_id, price FROM prices WHERE lab = ? AND seq > ?", (lab, version)).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+        return rows, current
+
+    def changes_since(self, lab, version):
+        """changed_rows as (test ids, prices, new version) arrays; a price of NaN
+        means the test is back at its catalog price"""
+        import numpy as np
+        rows, current = self.changed_rows(lab, version)
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        prices = np.fromiter((np.nan if r[1] is None else r[1] for r in rows), dtype=float, count=len(rows))
+        return ids, prices, current
+
+    # ------------------------------------------------------------------ writes
+
+    def save(self, lab, prices, base_version, editor=None):
+        """Save {test id: price or None} as one batch and return the new store version.
+
+        base_version is the version the editor last synced. If another session
+        has since set any of these tests to a different price, nothing is saved
+        and PriceConflict is raised.
+        """
+        prices = {int(i): None if p is None else float(p) for i, p in prices.items()}
+        if not prices:
+            return self.version()
+        changed = datetime.now().isoformat(timespec='seconds')
+        with self._changed:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Rows changed since base_version are few (only other sessions' recent edits)
+                newer = self._conn.execute("SELECT test_id, price, seq FROM prices WHERE lab = ? AND seq > ?", (lab, int(base_version))).fetchall()
+                conflicts = {i: (p, seq) for i, p, seq in newer if i in prices and prices[i] != p}
+                if conflicts:
+                    raise PriceConflict(conflicts)
+                version = self._conn.execute("UPDATE price_version SET version = version + 1 RETURNING version").fetchone()[0]
+                self._conn.executemany(
+                    "INSERT INTO prices (lab, test_id, price, seq, changed, editor) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (lab, test_id) DO UPDATE SET price = excluded.price, seq = excluded.seq, changed = excluded.changed, editor = excluded.editor",
+                    [(lab, i, p, version, changed, editor) for i, p in prices.items()])
+                self._conn.execute("COMMIT")
+            except BaseException as e:
+                self._conn.execute("ROLLBACK")
+                if isinstance(e, PriceConflict):
+                    self.conflicts += 1
+                raise
+            # Another process may have saved after us; never move the cached version back
+            self._version = max(version, self._version_locked())
+            self.saves += 1
+            self._changed.notify_all()
+        return version
+
+    def reset(self, lab, base_version, editor=None):
+        """Every edited test of lab back to its catalog price; returns the new version"""
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute("SELECT test_id FROM prices WHERE lab = ? AND price IS NOT NULL", (lab,))]
+        return self.save(lab, dict.fromkeys(ids), base_version, editor)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@functools.lru_cache(maxsize=1)
+def get_price_store():
+    """Process-wide price store"""
+    return PriceStore(data_path(PRICES_FILE))
@@ -0,0 +1,77 @@
+"""
+KELP Laboratory Services - Pricing Engine
+Vectorized whole-column price rules applied over arbitrary row masks.
+"""
+
+import numpy as np
+
+ADJUSTMENT_TYPES = ["Percentage", "Fixed Amount", "Target Margin"]
+
+# ============================================================================
+# MARGINS
+# ============================================================================
+
+def compute_margins(prices, costs):
+    """Margin % for each price/cost pair; 0 where the price is not positive"""
+    prices = np.asarray(prices, dtype=float)
+    costs = np.asarray(costs, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(prices > 0, (prices - costs) / prices * 100, 0.0)
+
+# ============================================================================
+# PRICE RULES
+# ============================================================================
+
+def round_to_price_point(prices, step, mode="nearest"):
+    """Snap prices to multiples of `step` (e.g. 5.0 -> $5 price points)"""
+    prices = np.asarray(prices, dtype=float)
+    if not step:
+        return prices
+    if mode == "up":
+        return np.ceil(prices / step) * step
+    if mode == "down":
+        return np.floor(prices / step) * step
+    if mode == "nearest":
+        return np.round(prices / step) * step
+    raise ValueError(f"Unknown rounding mode: {mode}")
+
+
+def adjust_prices(prices, costs, mask, adjustment, value, price_point=None):
+    """Return a copy of `prices` with one bulk rule applied to the rows in `mask`.
+
+    adjustment is one of ADJUSTMENT_TYPES: a percentage change, a fixed dollar
+    amount, or a target margin % priced off each row's total cost. Results are
+    floored at $0 and optionally rounded to a price point.
+    """
+    prices = np.asarray(prices, dtype=float)
+    costs = np.asarray(costs, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    selected = prices[mask]
+
+    if adjustment == "Percentage":
+        selected = selected * (1 + value / 100)
+    elif adjustment == "Fixed Amount":
+        selected = selected + value
+    elif adjustment == "Target Margin":
+        if value >= 100:
+            raise ValueError("Target margin must be below 100%")
+        selected = costs[mask] / (1 - value / 100)
+    else:
+        raise ValueError(f"Unknown adjustment type: {adjustment}")
+
+    if price_point:
+        selected = round_to_price_point(selected, price_point)
+
+    out = prices.copy()
+    out[mask] = np.maximum(selected, 0)
+    return out
+
+
+def reprice(df, mask, adjustment, value, price_point=None):
+    """Apply a bulk rule to a catalog frame; returns {test id: new price} for masked rows whose price changes"""
+    mask = np.asarray(mask, dtype=bool)
+    prices = df['price'].to_numpy(dtype=float)
+    new_prices = adjust_prices(prices, df['total_cost'].to_numpy(dtype=float), mask, adjustment, value, price_point)
+    changed = mask & (new_prices != prices)
+    ids = df['id'].to_numpy()[changed]
+    return dict(zip(ids.tolist(), new_prices[changed].tolist()))
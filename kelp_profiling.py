@@ -0,0 +1,191 @@
+"""
+KELP Laboratory Services - Instrumentation
+Per-page and per-stage timers and rerun counters, kept in memory for the
+Settings page and written as JSON lines when profiling is switched on:
+
+    KELP_PROFILE=timing         structured log of every rerun with stage timings
+    KELP_PROFILE=cprofile       ... plus a cProfile .prof file per rerun
+    KELP_PROFILE=tracemalloc    ... plus peak traced memory per rerun
+    KELP_PROFILE_LOG=path       log file (default <KELP_DATA_DIR>/profile.jsonl)
+
+Modes combine with commas, e.g. KELP_PROFILE=cprofile,tracemalloc.
+"""
+
+import collections
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from kelp_config import data_path
+
+PROFILE_MODES = ('timing', 'cprofile', 'tracemalloc')
+SAMPLES = 1000          # recent timings kept per stage, for percentiles
+LOG_BYTES = 10 << 20    # the log rotates at this size, keeping LOG_BACKUPS old files
+LOG_BACKUPS = 3
+STAT_COLUMNS = ['stage', 'calls', 'total_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms']
+
+
+def profile_modes(value=None):
+    """Modes named by KELP_PROFILE (or value); any mode implies timing"""
+    value = os.environ.get("KELP_PROFILE", "") if value is None else value
+    modes = {m.strip().lower() for m in value.split(',') if m.strip()}
+    unknown = modes - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown KELP_PROFILE mode(s) {sorted(unknown)}; choose from {list(PROFILE_MODES)}")
+    return frozenset(modes | {'timing'}) if modes else frozenset()
+
+
+def _json_logger(path):
+    """A logger writing bare JSON lines to a rotating file"""
+    # logging.handlers pulls in socket and more; kelp_core's cold start only pays for it when profiling is on
+    import logging
+    import logging.handlers
+    path = os.path.abspath(path)
+    logger = logging.getLogger(f"kelp.profile.{path}")
+    if not logger.handlers:
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+# ============================================================================
+# PROFILER
+# ============================================================================
+
+class Profiler:
+    """Stage timers and rerun counters for one process.
+
+    Timers always run (a stage costs a couple of microseconds); the log,
+    cProfile and tracemalloc only when modes are given. Each Streamlit session
+    runs on its own thread, so the current rerun is tracked per thread.
+    """
+
+    def __init__(self, modes=frozenset(), log_path=None):
+        self.modes = frozenset(modes)
+        self.log_path = (log_path or data_path("profile.jsonl")) if self.modes else None
+        self._log = _json_logger(self.log_path) if self.modes else None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._calls = collections.Counter()
+        self._seconds = collections.Counter()
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=SAMPLES))
+        self._reruns = collections.Counter()
+        if 'tracemalloc' in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _record(self, name, seconds):
+        with self._lock:
+            self._calls[name] += 1
+            self._seconds[name] += seconds
+            self._samples[name].append(seconds)
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run['stages'][name] = run['stages'].get(name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block; nested stages are counted in their parents too"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - t0)
+
+    @contextlib.contextmanager
+    def rerun(self, page=None):
+        """Time one script run. Yields the run record; set run['page'] once the page is known."""
+        run = {'page': page, 'stages': {}}
+        self._local.run = run
+        profile = None
+        if 'cprofile' in self.modes:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                profile = None      # another session's rerun is being profiled
+        if 'tracemalloc' in self.modes:
+            tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield run
+        finally:
+            elapsed = time.perf_counter() - t0
+            if profile is not None:
+                profile.disable()
+            self._local.run = None
+            page = run['page'] or 'unknown'
+            with self._lock:
+                self._reruns[page] += 1
+                count = self._reruns[page]
+            self._record(f"page: {page}", elapsed)
+            if self._log is not None:
+                now = datetime.now()
+                record = {'ts': now.isoformat(timespec='milliseconds'), 'event': 'rerun', 'pid': os.getpid(), 'page': page, 'rerun': count,
+                          'ms': round(elapsed * 1000, 3), 'stages': {k: round(v * 1000, 3) for k, v in run['stages'].items()}}
+                if 'tracemalloc' in self.modes:
+                    record['peak_kib'] = round((tracemalloc.get_traced_memory()[1] - start_bytes) / 1024, 1)
+                if profile is not None:
+                    path = data_path("profiles")
+                    path.mkdir(exist_ok=True)
+                    path = path / f"{now:%Y%m%dT%H%M%S%f}_{re.sub(r'[^A-Za-z0-9]+', '_', page).strip('_')}.prof"
+                    profile.dump_stats(str(path))
+                    record['profile'] = str(path)
+                self._log.info(json.dumps(record))
+
+    def rerun_counts(self):
+        with self._lock:
+            return dict(self._reruns)
+
+    def stats(self):
+        """One row per stage: call count, total and recent percentiles in ms, slowest first"""
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            rows = [(name, self._calls[name], self._seconds[name], np.array(self._samples[name])) for name in self._calls]
+        data = [(name, calls, total * 1000, total / calls * 1000, *(np.percentile(s, [50, 95]) * 1000), s.max() * 1000)
+                for name, calls, total, s in rows]
+        return pd.DataFrame(data, columns=STAT_COLUMNS).sort_values('total_ms', ascending=False, ignore_index=True)
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._seconds.clear()
+            self._samples.clear()
+            self._reruns.clear()
+
+
+@functools.lru_cache(maxsize=1)
+def get_profiler():
+    return Profiler(profile_modes(), os.environ.get("KELP_PROFILE_LOG"))
+
+# ============================================================================
+# DECORATORS
+# ============================================================================
+
+def stage(name):
+    """with stage("..."): time a block on the process profiler"""
+    return get_profiler().stage(name)
+
+
+def timed(name=None):
+    """Decorator timing every call of a function as a stage (default: its name)"""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with get_profiler().stage(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
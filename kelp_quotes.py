@@ -0,0 +1,388 @@
+"""
+KELP Laboratory Services - Quote Repository
+Every generated quote is stored with its line items and totals in a local
+SQLite database shared by all sessions, with the lab site it was priced at.
+Quote numbers come from a per-day counter advanced inside the insert
+transaction, so concurrent sessions (or processes) can never hand out the
+same number.
+"""
+
+import collections
+import functools
+import sqlite3
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from kelp_config import data_path
+from kelp_core import quote_totals
+from kelp_labs import DEFAULT_LAB
+
+QUOTE_COLUMNS = ['quote_number', 'quote_date', 'created', 'lab', 'account_name', 'contact_name', 'prepared_by',
+                 'subtotal', 'discount_percent', 'discount_amount', 'total', 'catalog_version']
+LINE_COLUMNS = ['line', 'test_id', 'description', 'method', 'qty', 'price', 'tat', 'total', 'elements']
+SUMMARY_COLUMNS = ['quote_number', 'quote_date', 'account_name', 'contact_name', 'items', 'total']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS quote_counter (
+    day  TEXT PRIMARY KEY,
+    last INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    id               INTEGER PRIMARY KEY,
+    quote_number     TEXT NOT NULL UNIQUE,
+    quote_date       TEXT NOT NULL,
+    created          TEXT NOT NULL,
+    lab              TEXT NOT NULL DEFAULT '{DEFAULT_LAB}',
+    account_name     TEXT COLLATE NOCASE,
+    contact_name     TEXT COLLATE NOCASE,
+    prepared_by      TEXT,
+    subtotal         REAL NOT NULL,
+    discount_percent REAL NOT NULL,
+    discount_amount  REAL NOT NULL,
+    total            REAL NOT NULL,
+    catalog_version  TEXT,
+    items            INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quote_lines (
+    quote_id    INTEGER NOT NULL REFERENCES quotes (id),
+    line        INTEGER NOT NULL,
+    test_id     INTEGER,
+    description TEXT NOT NULL,
+    method      TEXT,
+    qty         INTEGER NOT NULL,
+    price       REAL NOT NULL,
+    tat         TEXT,
+    total       REAL NOT NULL,
+    elements    TEXT,
+    PRIMARY KEY (quote_id, line)
+) WITHOUT ROWID;
+-- Distinct tests per quote, newest first per test, with the quote's lab and
+-- the test's total qty on it: drives test id searches and quote volumes
+CREATE TABLE IF NOT EXISTS quote_tests (
+    test_id    INTEGER NOT NULL,
+    quote_date TEXT NOT NULL,
+    quote_id   INTEGER NOT NULL REFERENCES quotes (id),
+    lab        TEXT NOT NULL DEFAULT '{DEFAULT_LAB}',
+    qty        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (test_id, quote_date, quote_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_quotes_date ON quotes (quote_date);
+CREATE INDEX IF NOT EXISTS ix_quotes_account ON quotes (account_name, quote_date);
+CREATE INDEX IF NOT EXISTS ix_quotes_contact ON quotes (contact_name, quote_date);
+CREATE INDEX IF NOT EXISTS ix_quotes_lab ON quotes (lab, quote_date);
+"""
+
+
+def _iso_date(value):
+    """Quote dates arrive as date objects, ISO strings or the PDF's MM/DD/YYYY"""
+    if value is None:
+        return date.today().isoformat()
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y'):
+        try:
+            return datetime.strptime(str(value), fmt).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"Unrecognised quote date: {value}")
+
+
+class QuoteStore:
+    """Persistent quotes with collision-free numbering and indexed search"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        # Autocommit; writes open their own BEGIN IMMEDIATE transaction
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        """Bring a database from before quotes had a lab up to SCHEMA"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {r[1] for r in self._conn.execute("PRAGMA table_info(quotes)")}
+            if columns and 'lab' not in columns:
+                # Quotes saved before there were sites were all priced at DEFAULT_LAB
+                self._conn.execute(f"ALTER TABLE quotes ADD COLUMN lab TEXT NOT NULL DEFAULT '{DEFAULT_LAB}'")
+                self._conn.execute(f"ALTER TABLE quote_tests ADD COLUMN lab TEXT NOT NULL DEFAULT '{DEFAULT_LAB}'")
+                self._conn.execute("ALTER TABLE quote_tests ADD COLUMN qty INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute("UPDATE quote_tests SET qty = (SELECT SUM(l.qty) FROM quote_lines l "
+                                   "WHERE l.quote_id = quote_tests.quote_id AND l.test_id = quote_tests.test_id)")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------ writes
+
+    def save(self, quote_data):
+        """Store a quote and return its new quote number.
+
+        quote_data is the dict handed to generate_pdf_quote, plus the 'lab' it
+        was priced at (default DEFAULT_LAB). Lines may carry a test_id (catalog
+        tests) or elements (metals panels) so they can be re-priced later.
+        Totals are recomputed from the lines.
+        """
+        return self.save_many([quote_data])[0]
+
+    def save_many(self, quotes):
+        """Store several quotes in one transaction; returns their numbers in order"""
+        created = datetime.now()
+        day = created.strftime('%Y%m%d')
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                last = self._conn.execute(
+                    "INSERT INTO quote_counter (day, last) VALUES (?, ?) "
+                    "ON CONFLICT (day) DO UPDATE SET last = last + excluded.last RETURNING last",
+                    (day, len(quotes))).fetchone()[0]
+                numbers = [f"{day}-{n:03d}" for n in range(last - len(quotes) + 1, last + 1)]
+                for number, q in zip(numbers, quotes):
+                    self._insert(number, q, created.isoformat(timespec='seconds'))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return numbers
+
+    def _insert(self, number, q, created):
+        items = q['items']
+        totals = quote_totals(sum(i['total'] for i in items), q.get('discount_percent', 0) or 0)
+        quote_date = _iso_date(q.get('date'))
+        lab = q.get('lab') or DEFAULT_LAB
+        quote_id = self._conn.execute(
+            "INSERT INTO quotes (quote_number, quote_date, created, lab, account_name, contact_name, prepared_by, "
+            "subtotal, discount_percent, discount_amount, total, catalog_version, items) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (number, quote_date, created, lab, q.get('account_name'), q.get('contact_name'), q.get('prepared_by'),
+             totals['subtotal'], totals['discount_percent'], totals['discount_amount'], totals['total'],
+             q.get('catalog_version'), len(items))).lastrowid
+        self._conn.executemany(
+            "INSERT INTO quote_lines (quote_id, line, test_id, description, method, qty, price, tat, total, elements) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(quote_id, n, i.get('test_id'), i['description'], i.get('method'), int(i['qty']), float(i['price']),
+              i.get('tat'), float(i['total']), ','.join(i['elements']) if i.get('elements') else None)
+             for n, i in enumerate(items)])
+        qty = collections.Counter()
+        for i in items:
+            if i.get('test_id') is not None:
+                qty[int(i['test_id'])] += int(i['qty'])
+        self._conn.executemany("INSERT INTO quote_tests (test_id, quote_date, quote_id, lab, qty) VALUES (?, ?, ?, ?, ?)",
+                               [(t, quote_date, quote_id, lab, n) for t, n in qty.items()])
+
+    # ------------------------------------------------------------------- reads
+
+    def get(self, quote_number):
+        """The stored quote as a quote_data dict, or None"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT id, {', '.join(QUOTE_COLUMNS)} FROM quotes WHERE quote_number = ?", (quote_number,)).fetchone()
+            if row is None:
+                return None
+            lines = self._conn.execute(f"SELECT {', '.join(LINE_COLUMNS)} FROM quote_lines WHERE quote_id = ? ORDER BY line", (row[0],)).fetchall()
+        quote = dict(zip(QUOTE_COLUMNS, row[1:]))
+        quote['date'] = datetime.strptime(quote['quote_date'], '%Y-%m-%d').strftime('%m/%d/%Y')
+        quote['items'] = []
+        for line in lines:
+            item = dict(zip(LINE_COLUMNS[1:], line[1:]))
+            item['elements'] = item['elements'].split(',') if item['elements'] else None
+            quote['items'].append(item)
+        return quote
+
+    def _query(self, account, contact, test_id, since, until, by_test=False, count=False, lab=None):
+        """FROM ... WHERE clause, parameters and newest-first ORDER BY for a search.
+
+        With by_test the search is driven from quote_tests, which is already in
+        date order per test, so a page is read without sorting every match.
+        """
+        clauses, params = [], []
+        date_column = "t.quote_date" if by_test else "q.quote_date"
+        for column, text in (('q.account_name', account), ('q.contact_name', contact)):
+            if text:
+                clauses.append(f"{column} >= ? AND {column} < ?")
+                params.extend(_prefix_range(text))
+        if lab is not None:
+            # quote_tests carries the lab, so a test-driven search needs no join for it
+            clauses.append("t.lab = ?" if by_test else "q.lab = ?")
+            params.append(lab)
+        if by_test:
+            source = "quote_tests t" if count and not (account or contact) else "quote_tests t JOIN quotes q ON q.id = t.quote_id"
+            clauses.append("t.test_id = ?")
+            params.append(int(test_id))
+        else:
+            source = "quotes q"
+            if test_id is not None:
+                clauses.append("EXISTS (SELECT 1 FROM quote_tests t WHERE t.test_id = ? AND t.quote_date = q.quote_date AND t.quote_id = q.id)")
+                params.append(int(test_id))
+        if since:
+            clauses.append(f"{date_column} >= ?")
+            params.append(_iso_date(since))
+        if until:
+            clauses.append(f"{date_column} <= ?")
+            params.append(_iso_date(until))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        order = " ORDER BY t.quote_date DESC, t.quote_id DESC" if by_test else " ORDER BY q.quote_date DESC, q.id DESC"
+        return f" FROM {source}{where}", params, order
+
+    def _drive_by_test(self, account, contact, test_id, limit, lab=None):
+        """Whether walking the test's quotes newest-first beats sorting the name matches.
+
+        Walking reads about limit / (share of quotes matching the names) rows,
+        capped at the test's quote count; the name-driven plan sorts every name
+        match. Both counts come from covering indexes.
+        """
+        if test_id is None:
+            return False
+        if not (account or contact):
+            return True
+        n_test = self._count(None, None, test_id, None, None, by_test=True, lab=lab)
+        n_names = self._count(account, contact, None, None, None, lab=lab)
+        with self._lock:
+            n_all = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM quotes").fetchone()[0]
+        return min(n_test, limit * n_all / max(n_names, 1)) < n_names
+
+    def search(self, account=None, contact=None, test_id=None, since=None, until=None, limit=50, offset=0, lab=None):
+        """Newest-first quote summaries; account and contact match by case-insensitive prefix, lab exactly"""
+        by_test = self._drive_by_test(account, contact, test_id, limit + offset, lab)
+        source, params, order = self._query(account, contact, test_id, since, until, by_test, lab=lab)
+        sql = f"SELECT {', '.join('q.' + c for c in SUMMARY_COLUMNS)}{source}{order} LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit, offset]).fetchall()
+        return [dict(zip(SUMMARY_COLUMNS, r)) for r in rows]
+
+    def count(self, account=None, contact=None, test_id=None, since=None, until=None, lab=None):
+        return self._count(account, contact, test_id, since, until, by_test=test_id is not None and not (account or contact), lab=lab)
+
+    def _count(self, account, contact, test_id, since, until, by_test=False, lab=None):
+        source, params, _ = self._query(account, contact, test_id, since, until, by_test, count=True, lab=lab)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*){source}", params).fetchone()[0]
+
+    def last_id(self):
+        """Id of the newest quote; changes whenever a quote is added"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM quotes").fetchone()[0]
+
+    def iter_batches(self, table='quotes', batch_size=5000):
+        """All quotes (or all quote lines) oldest-first in lists of dicts, paged by key"""
+        if table == 'quotes':
+            sql = f"SELECT id, {', '.join(QUOTE_COLUMNS)} FROM quotes WHERE id > ? ORDER BY id LIMIT ?"
+            columns, key = QUOTE_COLUMNS, (0,)
+        else:
+            sql = (f"SELECT l.quote_id, l.line, q.quote_number, {', '.join('l.' + c for c in LINE_COLUMNS)} "
+                   "FROM quote_lines l JOIN quotes q ON q.id = l.quote_id "
+                   "WHERE (l.quote_id, l.line) > (?, ?) ORDER BY l.quote_id, l.line LIMIT ?")
+            columns, key = ['quote_number'] + LINE_COLUMNS, (0, -1)
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, key + (batch_size,)).fetchall()
+            if not rows:
+                return
+            key = rows[-1][:len(key)]
+            yield [dict(zip(columns, r[len(key):])) for r in rows]
+
+    def test_volumes(self, since=None, until=None, lab=None):
+        """(test ids, total qty quoted) over catalog lines, optionally within a quote date range.
+
+        Test ids are per site, so pass lab to count only that site's quotes.
+        Reads quote_tests alone, in test id order, so there is no join or sort.
+        """
+        clauses, params = [], []
+        if lab is not None:
+            clauses.append("lab = ?")
+            params.append(lab)
+        if since:
+            clauses.append("quote_date >= ?")
+            params.append(_iso_date(since))
+        if until:
+            clauses.append("quote_date <= ?")
+            params.append(_iso_date(until))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql = f"SELECT test_id, SUM(qty) FROM quote_tests{where} GROUP BY test_id ORDER BY test_id"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        return ids, np.fromiter((r[1] for r in rows), dtype=float, count=len(rows))
+
+    # ----------------------------------------------------------------- requote
+
+    def requote(self, quote_number, catalog=None):
+        """A stored quote re-priced at today's prices.
+
+        Catalog tests take their price from `catalog`, which must be the
+        catalog of the lab the quote was priced at (default: that lab's catalog
+        from the registry), and metals panels from the current schedule,
+        surcharged for the turnaround they were quoted at; any other line keeps
+        its stored price. Returns a new quote_data dict for the same lab without
+        a quote number; each item carries its previous_price.
+        """
+        from kelp_metals import price_metals_panel
+        from kelp_tat import EXEMPT_TAT, price_tat
+
+        quote = self.get(quote_number)
+        if quote is None:
+            raise KeyError(quote_number)
+        if catalog is None:
+            from kelp_labs import get_registry
+            catalog = get_registry().get(quote['lab']).catalog
+
+        items = quote['items']
+        test_ids = [i['test_id'] for i in items if i['test_id'] is not None]
+        pos = pd.Index(catalog['id']).get_indexer(test_ids)
+        prices = iter(np.where(pos >= 0, catalog['price'].to_numpy()[pos], np.nan).tolist())
+
+        new_items, repriced = [], []
+        for item in items:
+            price, total = item['price'], item['total']
+            if item['test_id'] is not None:
+                current = next(prices)
+                if current == current:
+                    price, total = current, current * item['qty']
+                    repriced.append(len(new_items))
+            elif item['elements']:
+                panel = price_metals_panel(item['method'], frozenset(item['elements']), item['qty'])
+                price, total = panel.unit_price, panel.total
+                repriced.append(len(new_items))
+            new_items.append({**item, 'price': price, 'total': total, 'previous_price': item['price']})
+
+        # Re-priced lines keep the turnaround they were quoted at, and a panel its quantity-break discount
+        if repriced:
+            lines = [new_items[n] for n in repriced]
+            priced = price_tat([i['price'] for i in lines], [i['qty'] for i in lines], [i['tat'] or EXEMPT_TAT for i in lines], [i['total'] for i in lines])
+            for item, price, total in zip(lines, priced.unit_price.tolist(), priced.total.tolist()):
+                item.update(base_price=item['price'], base_total=item['total'], price=price, total=total)
+
+        totals = quote_totals(sum(i['total'] for i in new_items), quote['discount_percent'])
+        return {
+            'date': date.today().strftime('%m/%d/%Y'),
+            'lab': quote['lab'],
+            'account_name': quote['account_name'],
+            'contact_name': quote['contact_name'],
+            'prepared_by': quote['prepared_by'],
+            'items': new_items,
+            'subtotal': totals['subtotal'],
+            'discount_percent': totals['discount_percent'],
+            'requoted_from': quote_number,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _prefix_range(text):
+    """[low, high) bounds matching every NOCASE string that starts with text"""
+    low = str(text).lower()
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+@functools.lru_cache(maxsize=1)
+def get_quote_store():
+    """Process-wide quote store"""
+    return QuoteStore(data_path("quotes.sqlite3"))
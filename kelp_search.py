@@ -0,0 +1,175 @@
+"""
+KELP Laboratory Services - Catalog Search Index
+Precomputed n-gram and method-number lookups over name, method,
+method_group and category, plus categorical codes for the dropdown
+filters. A query touches only the postings it needs, not every row.
+"""
+
+import bisect
+import difflib
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+from kelp_catalog import get_base_catalog
+
+SEARCH_FIELDS = ['name', 'method', 'method_group', 'category']
+FILTER_FIELDS = ['category', 'water_type']
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _short_grams(text):
+    """Every 1- and 2-character substring, for terms too short for trigrams"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _digits(text):
+    return re.sub(r"[^0-9]", "", text)
+
+
+def _union(arrays, size=None):
+    """Sorted union of position arrays; with size (the number of rows), by a mask rather than a sort"""
+    arrays = [a for a in arrays if len(a)]
+    if not arrays:
+        return _EMPTY
+    if len(arrays) == 1:
+        return arrays[0]
+    if size is None:
+        return np.unique(np.concatenate(arrays))
+    hit = np.zeros(size, dtype=bool)
+    for a in arrays:
+        hit[a] = True
+    return np.flatnonzero(hit)
+
+
+class _FieldIndex:
+    """Index over the distinct values of one column; each value maps to its rows"""
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(values.astype(str).str.lower())
+        self.codes = codes
+        self.uniques = list(uniques)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.rows = [order[bounds[k]:bounds[k + 1]] for k in range(len(uniques))]
+
+        trigrams, short = {}, {}
+        for code, value in enumerate(self.uniques):
+            for tri in _trigrams(value):
+                trigrams.setdefault(tri, []).append(code)
+            for gram in _short_grams(value):
+                short.setdefault(gram, []).append(code)
+        self.trigrams = {t: np.array(c) for t, c in trigrams.items()}
+        self.short = {g: np.array(c) for g, c in short.items()}
+
+    def substring_codes(self, term):
+        if len(term) < 3:
+            # Postings of a 1- or 2-character gram are exactly the values containing it
+            return self.short.get(term, _EMPTY)
+        postings = [self.trigrams.get(t, _EMPTY) for t in _trigrams(term)]
+        postings.sort(key=len)
+        candidates = postings[0]
+        for p in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, p, assume_unique=True)
+        return np.array([c for c in candidates if term in self.uniques[c]], dtype=np.int64)
+
+    def rows_for(self, codes):
+        if len(codes) <= 8:
+            return _union([self.rows[c] for c in codes], len(self.codes))
+        # Many values (a short term): one pass over the row codes beats merging their postings
+        hit = np.zeros(len(self.uniques), dtype=bool)
+        hit[codes] = True
+        return np.flatnonzero(hit[self.codes])
+
+
+class CatalogSearchIndex:
+    """Search index over one catalog frame, addressed by row position"""
+
+    def __init__(self, df, version=None):
+        self.version = version if version is not None else df.attrs.get('version')
+        self.size = len(df)
+        self.ids = pd.Index(df['id'])
+        self.fields = {f: _FieldIndex(df[f]) for f in SEARCH_FIELDS}
+        self.filters = {}
+        for f in FILTER_FIELDS:
+            codes, uniques = pd.factorize(df[f])
+            self.filters[f] = (codes, list(uniques), {u: np.flatnonzero(codes == k) for k, u in enumerate(uniques)})
+        self.active = np.flatnonzero(df['active'].to_numpy(dtype=bool)) if 'active' in df else np.arange(self.size)
+
+        # method numbers with punctuation stripped, for "2008" -> "EPA 200.8"
+        self.method_digits = {}
+        for field in ['method', 'method_group']:
+            for code, value in enumerate(self.fields[field].uniques):
+                for tok in _tokens(value):
+                    d = _digits(tok)
+                    if d:
+                        self.method_digits.setdefault(d, set()).add((field, code))
+        self.sorted_method_digits = sorted(self.method_digits)
+
+    def positions(self, ids):
+        """Row positions for a list of test ids"""
+        return self.ids.get_indexer(list(ids))
+
+    def values(self, field):
+        """Distinct values of a filter field in catalog order"""
+        return self.filters[field][1]
+
+    def _method_number_rows(self, term, fuzzy):
+        digits = _digits(term)
+        if not digits:
+            return _EMPTY
+        keys = self.sorted_method_digits
+        lo = bisect.bisect_left(keys, digits)
+        hi = bisect.bisect_left(keys, digits + "￿")
+        matched = keys[lo:hi]
+        if not matched and fuzzy:
+            matched = difflib.get_close_matches(digits, keys, n=5, cutoff=0.75)
+        hits = {pair for k in matched for pair in self.method_digits[k]}
+        return _union([self.fields[field].rows[code] for field, code in hits], self.size)
+
+    def _term_rows(self, term, fuzzy):
+        hits = [idx.rows_for(idx.substring_codes(term)) for idx in self.fields.values()]
+        if any(ch.isdigit() for ch in term):
+            hits.append(self._method_number_rows(term, fuzzy))
+        return _union(hits, self.size)
+
+    def search(self, query="", category=None, water_type=None, active_only=True, fuzzy=True):
+        """Sorted row positions matching every query term and the given filters"""
+        sets = []
+        if active_only:
+            sets.append(self.active)
+        if category is not None:
+            sets.append(self.filters['category'][2].get(category, _EMPTY))
+        if water_type is not None:
+            sets.append(self.filters['water_type'][2].get(water_type, _EMPTY))
+        for term in (query or "").lower().split():
+            sets.append(self._term_rows(term, fuzzy))
+        if not sets:
+            return np.arange(self.size)
+        sets.sort(key=len)
+        result = sets[0]
+        for s in sets[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, s, assume_unique=True)
+        return result
+
+
+@functools.lru_cache(maxsize=1)
+def get_search_index():
+    """Index for the shared base catalog; price edits never change indexed fields"""
+    return CatalogSearchIndex(get_base_catalog())
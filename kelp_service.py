@@ -0,0 +1,237 @@
+"""
+KELP Laboratory Services - Local JSON Quoting Service
+Small asyncio HTTP/1.1 server for the CRM and web store. Catalog lookups and
+quote pricing run in-process on kelp_core; PDF rendering goes to a bounded
+process pool, with identical in-flight quotes coalesced onto one render.
+
+Endpoints (lab defaults to DEFAULT_LAB):
+    GET  /health
+    GET  /catalog?lab=&category=&water_type=&q=     active analytes (records)
+    GET  /catalog/<id>?lab=                          one analyte
+    POST /quote/price   {"lab", "lines": [{"test_id", "qty"}], "metals": [{"method", "elements", "qty"}], "discount_percent"}
+    POST /quote/pdf     same body plus quote_number, date, contact_name, account_name, prepared_by
+
+Usage:  python -m kelp_service --port 8765 --pdf-workers 2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import signal
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from kelp_config import DEFAULT_LAB
+from kelp_core import generate_pdf_quote, get_analyte, list_analytes, price_quote
+
+HEADER_FIELDS = ['quote_number', 'date', 'contact_name', 'account_name', 'prepared_by']
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _warm_pdf_worker():
+    from kelp_pdf import get_pdf_template
+    get_pdf_template()
+
+
+def site(lab):
+    """lab if it is DEFAULT_LAB or a site in the catalog registry, else 404"""
+    if lab != DEFAULT_LAB:
+        from kelp_labs import get_registry
+        if lab not in get_registry().labs():
+            raise HTTPError(404, f"unknown lab: {lab}")
+    return lab
+
+
+def quote_from_body(body):
+    """Price a /quote request body with kelp_core"""
+    if not isinstance(body, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    try:
+        lines = [(int(l['test_id']), int(l.get('qty', 1))) for l in body.get('lines', [])]
+        metals = [(m['method'], m['elements'], int(m.get('qty', 1))) for m in body.get('metals', [])]
+        return price_quote(lines, float(body.get('discount_percent', 0)), metals, lab=site(body.get('lab', DEFAULT_LAB)))
+    except KeyError as e:
+        raise HTTPError(400, f"unknown test id or missing field: {e}")
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, str(e))
+
+
+class QuoteService:
+    """Request routing, PDF pool, backpressure and coalescing"""
+
+    def __init__(self, pdf_workers=2, max_pending_pdfs=16):
+        self.pdf_workers = pdf_workers
+        self.max_pending_pdfs = max_pending_pdfs
+        self.pool = None
+        self._pdf_slots = None
+        self._inflight = {}
+        self.stats = {'requests': 0, 'errors': 0, 'pdf_renders': 0, 'pdf_coalesced': 0, 'pdf_rejected': 0}
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.pool = ProcessPoolExecutor(max_workers=self.pdf_workers, initializer=_warm_pdf_worker)
+        self._pdf_slots = asyncio.Semaphore(self.max_pending_pdfs)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+
+    # ------------------------------------------------------------------ HTTP
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = line.decode('latin-1').partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {'error': "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                self.stats['requests'] += 1
+                try:
+                    status, payload, content_type = await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload, content_type = e.status, {'error': str(e)}, None
+                except Exception as e:
+                    # e.g. a BrokenProcessPool: answer 500 and keep the connection usable
+                    traceback.print_exc()
+                    self.stats['errors'] += 1
+                    status, payload, content_type = 500, {'error': f"internal error ({type(e).__name__})"}, None
+                await self._respond(writer, status, payload, content_type, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, content_type=None, keep_alive=True):
+        if isinstance(payload, bytes):
+            data, content_type = payload, content_type or "application/octet-stream"
+        else:
+            data, content_type = json.dumps(payload).encode(), "application/json"
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode() + b"\r\n" + data)
+        await writer.drain()
+
+    # --------------------------------------------------------------- routing
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        if path == "/health":
+            return 200, {'status': "ok", **self.stats}, None
+        if path == "/catalog" or path.startswith("/catalog/"):
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            query = parse_qs(url.query)
+            lab = site(query.get('lab', [DEFAULT_LAB])[0])
+            if path == "/catalog":
+                return 200, self.catalog(query, lab), None
+            try:
+                return 200, get_analyte(path.rsplit("/", 1)[1], lab), None
+            except (KeyError, ValueError):
+                raise HTTPError(404, "unknown test id")
+        if path in ("/quote/price", "/quote/pdf"):
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                raise HTTPError(400, "body must be JSON")
+            if path == "/quote/price":
+                return 200, quote_from_body(data), None
+            return 200, await self.render_pdf(data), "application/pdf"
+        raise HTTPError(404, f"no route for {path}")
+
+    def catalog(self, query, lab=DEFAULT_LAB):
+        category = query.get('category', [None])[0]
+        water_type = query.get('water_type', [None])[0]
+        q = query.get('q', [""])[0].lower()
+        return [a for a in list_analytes(lab) if a['active']
+                and (category is None or a['category'] == category)
+                and (water_type is None or a['water_type'] == water_type)
+                and (not q or q in a['name'].lower() or q in a['method'].lower())]
+
+    async def render_pdf(self, body):
+        """Render in the pool; identical quotes already in flight share one render"""
+        quote = quote_from_body(body)
+        quote_data = {**quote, 'quote_number': body.get('quote_number', "DRAFT"), 'date': body.get('date', date.today().strftime('%m/%d/%Y')),
+                      'contact_name': body.get('contact_name', ''), 'account_name': body.get('account_name', 'NA'), 'prepared_by': body.get('prepared_by', 'KELP Lab')}
+        key = hashlib.sha256(json.dumps(quote_data, sort_keys=True, default=str).encode()).hexdigest()
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats['pdf_coalesced'] += 1
+            return await asyncio.shield(pending)
+        if self._pdf_slots.locked():
+            self.stats['pdf_rejected'] += 1
+            raise HTTPError(503, "PDF queue is full, retry shortly")
+
+        async with self._pdf_slots:
+            future = asyncio.get_running_loop().run_in_executor(self.pool, generate_pdf_quote, quote_data)
+            self._inflight[key] = future
+            try:
+                pdf = await asyncio.shield(future)
+                self.stats['pdf_renders'] += 1
+                return pdf
+            finally:
+                self._inflight.pop(key, None)
+
+
+async def serve(host, port, pdf_workers, max_pending_pdfs):
+    service = QuoteService(pdf_workers, max_pending_pdfs)
+    server = await service.start(host, port)
+    print(f"KELP quoting service on http://{host}:{port}")
+    # SIGTERM (Popen.terminate, service managers) stops serving like Ctrl-C does, so
+    # close() shuts the PDF workers down instead of leaving them orphaned
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON quoting service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pdf-workers", type=int, default=2)
+    parser.add_argument("--max-pending-pdfs", type=int, default=16, help="PDF renders queued before answering 503")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.pdf_workers, args.max_pending_pdfs))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+KELP Laboratory Services - Turnaround (TAT) Surcharge Pricing
+Rush and weekend surcharges from one tier table: a percentage on every
+analytical line plus a flat fee per sample batch. Tables are validated once
+per process and lines are priced as numpy arrays, so repricing a large quote
+when the TAT selector changes is a handful of vector operations.
+"""
+
+import functools
+from collections import namedtuple
+
+import numpy as np
+
+from kelp_catalog import round_cents
+from kelp_core import DEFAULT_TAT
+
+# Service rows (field service, pickup, the rush fee itself) carry this TAT and are never surcharged
+EXEMPT_TAT = '-'
+
+# label:      how the tier reads on the PDF footer
+# percent:    surcharge on the line total of every analytical line
+# batch_fee:  flat fee, once per sample batch with any line at this TAT
+TAT_TIERS = {
+    DEFAULT_TAT: {'label': "Standard", 'percent': 0.0, 'batch_fee': 0.0},
+    "1 Day":     {'label': "1 Day", 'percent': 150.0, 'batch_fee': 0.0},
+    "2 Day":     {'label': "2 Days", 'percent': 75.0, 'batch_fee': 0.0},
+    "3 Day":     {'label': "3 Days", 'percent': 50.0, 'batch_fee': 0.0},
+    "4 Day":     {'label': "4 Days", 'percent': 25.0, 'batch_fee': 0.0},
+    "Weekend":   {'label': "Weekend", 'percent': 250.0, 'batch_fee': 700.0},
+}
+TAT_OPTIONS = list(TAT_TIERS)
+BATCH_FEE_DESCRIPTION = "{} Surcharge (per sample batch)"
+
+TatTables = namedtuple('TatTables', ['names', 'percent', 'batch_fee'])
+TatPrice = namedtuple('TatPrice', ['unit_price', 'total', 'surcharge', 'batch_fee'])
+
+
+@functools.lru_cache(maxsize=1)
+def get_tat_tables():
+    """Tier names sorted for searchsorted, with percent and batch fee arrays aligned to them"""
+    for tat, tier in TAT_TIERS.items():
+        if tier['percent'] < 0 or tier['batch_fee'] < 0:
+            raise ValueError(f"{tat}: surcharges must not be negative")
+    tiers = {**TAT_TIERS, EXEMPT_TAT: {'percent': 0.0, 'batch_fee': 0.0}}
+    names = sorted(tiers)
+    return TatTables(np.array(names), np.array([tiers[n]['percent'] for n in names]), np.array([tiers[n]['batch_fee'] for n in names]))
+
+
+def rush_footer():
+    """'1 Day 150% | ... | Weekend $700 + 250%', in TAT_TIERS order"""
+    parts = []
+    for tier in TAT_TIERS.values():
+        if tier['percent'] or tier['batch_fee']:
+            fee = f"${tier['batch_fee']:,.0f} + " if tier['batch_fee'] else ""
+            parts.append(f"{tier['label']} {fee}{tier['percent']:g}%")
+    return ' | '.join(parts)
+
+# ============================================================================
+# PRICING
+# ============================================================================
+
+def tat_codes(tat):
+    """Row of each line's TAT in get_tat_tables(); unknown TATs raise ValueError"""
+    names = get_tat_tables().names
+    tat = np.asarray(tat).astype(str)
+    codes = np.searchsorted(names, tat).clip(0, len(names) - 1)
+    bad = names[codes] != tat
+    if bad.any():
+        raise ValueError(f"Unknown TAT(s) {sorted(set(np.atleast_1d(tat)[np.atleast_1d(bad)].tolist()))}; choose from {TAT_OPTIONS}")
+    return codes
+
+
+def line_tats(catalog_tat, tat):
+    """The quote-level TAT for every line, except service lines that stay exempt"""
+    catalog_tat = np.asarray(catalog_tat, dtype=object)
+    return np.where(catalog_tat == EXEMPT_TAT, EXEMPT_TAT, tat)
+
+
+def price_tat(price, qty, tat, total=None):
+    """Surcharged unit prices and line totals, vectorized over quote lines.
+
+    price and qty are per-line arrays and tat is a TAT per line (or one for
+    all). total is the un-surcharged line total when it is not price x qty,
+    e.g. after a quantity-break discount; the surcharged total keeps the same
+    discount. Returns per-line unit_price, total and surcharge (total over the
+    un-surcharged total), rounded to cents, and the batch_fee each line's
+    TAT carries (see batch_fees).
+    """
+    tables = get_tat_tables()
+    codes = tat_codes(tat)
+    price, qty = np.asarray(price, dtype=float), np.asarray(qty, dtype=float)
+    unit = round_cents(price * (1 + tables.percent[codes] / 100))
+    gross = price * qty
+    if total is None:
+        base_total = round_cents(gross)
+        new_total = round_cents(unit * qty)
+    else:
+        base_total = round_cents(np.asarray(total, dtype=float))
+        # Share of price x qty the line is charged at; 1 unless a discount is already in its total
+        kept = np.divide(total, gross, out=np.ones_like(gross), where=gross != 0)
+        new_total = round_cents(unit * qty * kept)
+    return TatPrice(unit, new_total, new_total - base_total, np.broadcast_to(tables.batch_fee[codes], np.shape(new_total)))
+
+
+def batch_fees(batch_fee, batch=None):
+    """Flat fee per sample batch: the largest fee among its lines.
+
+    batch gives each line's batch number (0, 1, ...); by default every line
+    is in one batch.
+    """
+    batch_fee = np.asarray(batch_fee, dtype=float)
+    if batch is None:
+        return np.array([batch_fee.max()]) if batch_fee.size else np.zeros(0)
+    batch = np.asarray(batch, dtype=np.intp)
+    fees = np.zeros(batch.max() + 1 if batch.size else 0)
+    np.maximum.at(fees, batch, batch_fee)
+    return fees
+
+
+def batch_fee_item(tat, batches=1):
+    """Quote item for the flat fee of `batches` sample batches at tat, or None if the tier has none.
+    The fee line itself is exempt, so it is never surcharged.
+    """
+    fee = TAT_TIERS[tat]['batch_fee']
+    if not fee or batches < 1:
+        return None
+    return {'test_id': None, 'description': BATCH_FEE_DESCRIPTION.format(tat), 'method': EXEMPT_TAT, 'qty': batches, 'price': fee, 'tat': EXEMPT_TAT, 'total': fee * batches, 'batch_fee': True}
+
+
+def apply_tat(items, tat, batches=1):
+    """Quote items repriced at a quote-level TAT, plus the batch fee line if the tier has one.
+
+    Lines whose 'tat' is EXEMPT_TAT keep their price. Each repriced line
+    keeps its un-surcharged price and total as 'base_price' and 'base_total',
+    so items can be repriced again at another TAT and a discount already in
+    a line's total (a metals quantity break) carries over; an earlier batch
+    fee line is replaced.
+    """
+    items = [i for i in items if not i.get('batch_fee')]
+    if not items:
+        return []
+    base = np.fromiter((i.get('base_price', i['price']) for i in items), dtype=float, count=len(items))
+    base_total = np.fromiter((i.get('base_total', i['total']) for i in items), dtype=float, count=len(items))
+    qty = np.fromiter((i['qty'] for i in items), dtype=float, count=len(items))
+    tats = line_tats([i['tat'] for i in items], tat)
+    priced = price_tat(base, qty, tats, base_total)
+    out = [{**item, 'base_price': b, 'base_total': bt, 'price': p, 'tat': t, 'total': total}
+           for item, b, bt, p, t, total in zip(items, base.tolist(), base_total.tolist(), priced.unit_price.tolist(), tats.tolist(), priced.total.tolist())]
+    fee = batch_fee_item(tat, batches) if (tats != EXEMPT_TAT).any() else None
+    return out + [fee] if fee else out